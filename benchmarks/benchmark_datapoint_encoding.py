@@ -0,0 +1,54 @@
+"""Benchmark of the encoding of datapoint insert request bodies.
+
+Compares the encoder used for DatapointBatch bodies with the previous path, which serialized a dict per datapoint with
+json.dumps and compressed the result with gzip.compress.
+
+Run from the root directory::
+
+    python -m benchmarks.benchmark_datapoint_encoding
+"""
+
+import gzip
+import json
+import timeit
+
+import numpy as np
+
+from cognite.client import _encoding
+from cognite.client.stable.datapoints import DatapointBatch
+
+START = 1514764800000
+
+
+def previous_encode_body(datapoints, use_gzip):
+    data = json.dumps({"items": [dp.__dict__ for dp in datapoints]})
+    return gzip.compress(data.encode("utf-8")) if use_gzip else data
+
+
+class DictDatapoint:
+    """A Datapoint as it was before it got __slots__, with a __dict__ to serialize."""
+
+    def __init__(self, timestamp, value):
+        self.timestamp = timestamp
+        self.value = value
+
+
+def main():
+    print("{:>10} {:>6} {:>12} {:>12} {:>8}".format("datapoints", "gzip", "previous (s)", "current (s)", "speedup"))
+    for num_of_datapoints in [100000, 1000000]:
+        timestamps = START + np.arange(num_of_datapoints) * 1000
+        values = np.random.randn(num_of_datapoints)
+        batch = DatapointBatch(timestamps, values)
+        datapoints = [DictDatapoint(t, v) for t, v in zip(timestamps.tolist(), values.tolist())]
+        for use_gzip in [False, True]:
+            previous = min(timeit.repeat(lambda: previous_encode_body(datapoints, use_gzip), number=1, repeat=3))
+            current = min(timeit.repeat(lambda: _encoding.encode_body({"items": batch}, use_gzip), number=1, repeat=3))
+            print(
+                "{:>10} {:>6} {:>12.3f} {:>12.3f} {:>7.1f}x".format(
+                    num_of_datapoints, str(use_gzip), previous, current, previous / current
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
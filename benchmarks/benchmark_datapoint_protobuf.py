@@ -0,0 +1,47 @@
+"""Benchmark of protobuf against JSON request bodies for inserting datapoints.
+
+Compares the time to encode a body and its size on the wire, with and without gzip.
+
+Run from the root directory::
+
+    python -m benchmarks.benchmark_datapoint_protobuf
+"""
+
+import timeit
+
+import numpy as np
+
+from cognite.client import _encoding
+from cognite.client.stable.datapoints import DatapointBatch
+
+START = 1514764800000
+
+
+def main():
+    print(
+        "{:>10} {:>6} {:>10} {:>10} {:>12} {:>12}".format(
+            "datapoints", "gzip", "json (s)", "proto (s)", "json (MB)", "proto (MB)"
+        )
+    )
+    for num_of_datapoints in [100000, 1000000]:
+        body = {
+            "items": DatapointBatch(START + np.arange(num_of_datapoints) * 1000, np.random.randn(num_of_datapoints))
+        }
+        for use_gzip in [False, True]:
+            results = []
+            for protobuf in [False, True]:
+                seconds = min(
+                    timeit.repeat(lambda: _encoding.encode_body(body, use_gzip, protobuf=protobuf), number=1, repeat=3)
+                )
+                size = len(_encoding.encode_body(body, use_gzip, protobuf=protobuf)) / 1e6
+                results.append((seconds, size))
+            (json_seconds, json_size), (proto_seconds, proto_size) = results
+            print(
+                "{:>10} {:>6} {:>10.3f} {:>10.3f} {:>12.2f} {:>12.2f}".format(
+                    num_of_datapoints, str(use_gzip), json_seconds, proto_seconds, json_size, proto_size
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark of converting events to a dataframe.
+
+Compares EventListResponse.to_pandas() with the previous path, which deep copied the events and moved the metadata
+fields of each event into it before building the dataframe. Peak memory is measured with tracemalloc.
+
+Run from the root directory::
+
+    python -m benchmarks.benchmark_events_to_pandas
+"""
+
+import time
+import tracemalloc
+from copy import deepcopy
+
+import pandas as pd
+
+from cognite.client.stable.events import EventListResponse
+
+
+def previous_to_pandas(items):
+    items = deepcopy(items)
+    for d in items:
+        if d.get("metadata"):
+            d.update(d.pop("metadata"))
+    return pd.DataFrame(items)
+
+
+def make_events(num_of_events):
+    return [
+        {
+            "id": i,
+            "startTime": 1514764800000 + i * 1000,
+            "endTime": 1514764800000 + i * 1000 + 500,
+            "type": "alarm",
+            "subtype": ["high", "low", "critical"][i % 3],
+            "description": "Alarm {}".format(i),
+            "assetIds": [i % 1000],
+            "metadata": {"severity": str(i % 5), "source": "plc_{}".format(i % 20), "ack": "true"},
+        }
+        for i in range(num_of_events)
+    ]
+
+
+def measure(fn):
+    start = time.perf_counter()
+    frame = fn()
+    seconds = time.perf_counter() - start
+    # Memory is measured in a separate run, as tracing allocations slows everything down
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 1e6, frame.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    print("{:>8} {:>12} {:>10} {:>15} {:>12}".format("events", "method", "time (s)", "peak mem (MB)", "frame (MB)"))
+    for num_of_events in [100000, 1000000]:
+        events = make_events(num_of_events)
+        response = EventListResponse({"data": {"items": events}})
+        methods = [
+            ("previous", lambda: previous_to_pandas(events)),
+            ("to_pandas", lambda: response.to_pandas()),
+            ("categorical", lambda: response.to_pandas(categorical=True)),
+        ]
+        for name, fn in methods:
+            print("{:>8} {:>12} {:>10.2f} {:>15.0f} {:>12.0f}".format(num_of_events, name, *measure(fn)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark of the startup cost of the SDK.
+
+Measures the time to import the SDK and to construct a client in fresh interpreters, as paid by short-lived scripts and
+jobs. Heavy dependencies such as pandas and protobuf are imported on first use, so they should not show up here. That
+they are not imported on startup is checked by TestStartup in tests/test_client/test_cognite_client.py.
+
+Run from the root directory::
+
+    python -m benchmarks.benchmark_import_time
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+NUM_OF_RUNS = 10
+
+STATEMENTS = [
+    ("import cognite", "import cognite"),
+    ("construct client", "from cognite import CogniteClient; CogniteClient(api_key='key', project='project')"),
+]
+
+TIMED = """
+import time
+start = time.perf_counter()
+{}
+print(time.perf_counter() - start)
+"""
+
+
+def measure(statement):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    durations = []
+    for _ in range(NUM_OF_RUNS):
+        output = subprocess.check_output([sys.executable, "-c", TIMED.format(statement)], env=env)
+        durations.append(float(output))
+    return durations
+
+
+def main():
+    print("{:>20} {:>12} {:>12}".format("", "median (ms)", "min (ms)"))
+    for name, statement in STATEMENTS:
+        durations = measure(statement)
+        print("{:>20} {:>12.1f} {:>12.1f}".format(name, statistics.median(durations) * 1000, min(durations) * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark of the missing data strategies applied by the data transfer service.
+
+Compares the current implementation with the previous one, which grew the output frame one time series at a time.
+
+Run from the root directory::
+
+    python -m benchmarks.benchmark_missing_data_strategies
+"""
+
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from cognite.data_transfer_service import DataTransferService
+
+NUM_OF_ROWS = 1000
+STRATEGIES = ["ffill", "linearInterpolation", None]
+
+
+def previous_apply_missing_data_strategies(df, ts_list, global_missing_data_strategy):
+    new_df = df["timestamp"]
+    for ts in ts_list:
+        name = ts["name"]
+        colnames = [colname for colname in df.columns.values if colname.startswith(name)]
+
+        missing_data_strategy = ts.get("missingDataStrategy", global_missing_data_strategy)
+        partial_df = df[colnames]
+
+        if missing_data_strategy == "ffill":
+            partial_df = df[colnames].ffill()
+        elif missing_data_strategy and missing_data_strategy.endswith("Interpolation"):
+            method = missing_data_strategy[:-13].lower()
+            partial_df = df[colnames].interpolate(method=method, axis=0)
+        new_df = pd.concat([new_df, partial_df], axis=1)
+        new_df = new_df.iloc[:, ~new_df.columns.duplicated()]
+    return new_df
+
+
+def make_frame(num_of_series):
+    values = np.random.rand(NUM_OF_ROWS, num_of_series)
+    values[np.random.rand(NUM_OF_ROWS, num_of_series) < 0.2] = np.nan
+    names = ["ts_{:05d}".format(i) for i in range(num_of_series)]
+    df = pd.DataFrame(values, columns=[name + "|average" for name in names])
+    df.insert(0, "timestamp", np.arange(NUM_OF_ROWS) * 60000)
+    ts_list = [
+        {"name": name, "aggregates": ["avg"], "missingDataStrategy": STRATEGIES[i % len(STRATEGIES)]}
+        for i, name in enumerate(names)
+    ]
+    return df, ts_list
+
+
+def main():
+    apply_missing_data_strategies = DataTransferService._DataTransferService__apply_missing_data_strategies
+    print("{:>8} {:>12} {:>12} {:>8}".format("series", "previous (s)", "current (s)", "speedup"))
+    for num_of_series in [100, 1000, 3000]:
+        df, ts_list = make_frame(num_of_series)
+        previous = min(
+            timeit.repeat(lambda: previous_apply_missing_data_strategies(df, ts_list, None), number=1, repeat=3)
+        )
+        current = min(timeit.repeat(lambda: apply_missing_data_strategies(None, df, ts_list, None), number=1, repeat=3))
+        print("{:>8} {:>12.3f} {:>12.3f} {:>7.1f}x".format(num_of_series, previous, current, previous / current))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Computes time series aggregates locally from raw datapoints, with the same semantics as the API."""
+
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+
+from cognite.client import _utils
+
+
+def _granularity_unit_to_ms(granularity: str) -> int:
+    return _utils.granularity_to_ms("1" + "".join(c for c in granularity if c.isalpha()))
+
+
+def get_bucket_starts(timestamps: np.ndarray, granularity: str, start: int = None) -> np.ndarray:
+    """Returns the start of the aggregate bucket of each timestamp.
+
+    As in the API, the query start is rounded down to a whole granularity unit, e.g. a whole hour for '12h', and buckets
+    of the granularity are laid out from there.
+
+    Args:
+        timestamps (np.ndarray):    Timestamps in ms since epoch.
+        granularity (str):          The granularity of the aggregates, e.g. '1h' or '12hour'.
+        start (int):                Start of the query in ms since epoch. Defaults to the first timestamp.
+    """
+    granularity_ms = _utils.granularity_to_ms(granularity)
+    if start is None:
+        start = int(timestamps[0]) if len(timestamps) else 0
+    origin = start - start % _granularity_unit_to_ms(granularity)
+    return origin + (timestamps - origin) // granularity_ms * granularity_ms
+
+
+def _continuous_variance(timestamps, values, first, last):
+    """Variance of the linearly interpolated curve through the datapoints of each bucket, weighted by time."""
+    dt = np.diff(timestamps).astype(np.float64)
+    v0, v1 = values[:-1], values[1:]
+    # Integrals of v and v^2 over each linear segment
+    integral = (v0 + v1) / 2 * dt
+    integral_sq = (v0 * v0 + v0 * v1 + v1 * v1) / 3 * dt
+    # Segments are only counted within a bucket, so the segment ending at the first point of a bucket is excluded.
+    cumulative = np.concatenate([[0.0], np.cumsum(integral)])
+    cumulative_sq = np.concatenate([[0.0], np.cumsum(integral_sq)])
+    duration = (timestamps[last] - timestamps[first]).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (cumulative[last] - cumulative[first]) / duration
+        mean_sq = (cumulative_sq[last] - cumulative_sq[first]) / duration
+        variance = np.maximum(mean_sq - mean * mean, 0.0)
+    return np.where(duration > 0, variance, 0.0)
+
+
+def aggregate(
+    timestamps, values, aggregates: List[str], granularity: str, start: int = None, end: int = None
+) -> Dict[str, np.ndarray]:
+    """Computes aggregates of raw datapoints locally.
+
+    Only buckets which contain datapoints are returned, as by the API. Interpolation and step interpolation are the
+    values at the start of each bucket, using the datapoints on either side of it, so datapoints before a bucket should
+    be included for these to be defined (e.g. by fetching the raw data with include_outside_points).
+
+    Args:
+        timestamps (array-like):    Timestamps of the datapoints in ms since epoch.
+        values (array-like):        Numeric values of the datapoints.
+        aggregates (List[str]):     The aggregate functions to compute. Any name accepted by the API, such as 'avg' or
+                                    'tv', is accepted.
+        granularity (str):          The granularity of the aggregates, e.g. '1h' or '12hour'.
+        start (int):                Start of the query in ms since epoch. Buckets are aligned to this and datapoints
+                                    before it are only used for interpolation. Defaults to the first timestamp.
+        end (int):                  End of the query in ms since epoch. Datapoints at or after it are only used for
+                                    interpolation.
+
+    Returns:
+        Dict[str, np.ndarray]: The bucket start timestamps under 'timestamp', followed by the values of each aggregate
+        under its return name, e.g. 'average'.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(timestamps, kind="stable")
+    all_timestamps, all_values = timestamps[order], values[order]
+
+    in_range = np.ones(len(all_timestamps), dtype=bool)
+    if start is not None:
+        in_range &= all_timestamps >= start
+    if end is not None:
+        in_range &= all_timestamps < end
+    ts, vals = all_timestamps[in_range], all_values[in_range]
+
+    names = []
+    for agg in aggregates:
+        name = _utils.get_aggregate_func_return_name(agg)
+        if name is None:
+            raise ValueError("Unknown aggregate function '{}'".format(agg))
+        if name not in names:
+            names.append(name)
+
+    result = OrderedDict()
+    if len(ts) == 0:
+        result["timestamp"] = np.array([], dtype=np.int64)
+        for name in names:
+            result[name] = np.array([], dtype=np.float64)
+        return result
+
+    bucket_starts = get_bucket_starts(ts, granularity, start)
+    first = np.flatnonzero(np.concatenate([[True], bucket_starts[1:] != bucket_starts[:-1]]))
+    last = np.concatenate([first[1:], [len(ts)]]) - 1
+    count = last - first + 1
+    result["timestamp"] = bucket_starts[first]
+
+    for name in names:
+        if name == "count":
+            result[name] = count
+        elif name == "sum":
+            result[name] = np.add.reduceat(vals, first)
+        elif name == "average":
+            result[name] = np.add.reduceat(vals, first) / count
+        elif name == "max":
+            result[name] = np.maximum.reduceat(vals, first)
+        elif name == "min":
+            result[name] = np.minimum.reduceat(vals, first)
+        elif name == "discretevariance":
+            mean = np.add.reduceat(vals, first) / count
+            result[name] = np.add.reduceat((vals - np.repeat(mean, count)) ** 2, first) / count
+        elif name == "continuousvariance":
+            result[name] = _continuous_variance(ts, vals, first, last)
+        elif name == "totalvariation":
+            diffs = np.concatenate([[0.0], np.abs(np.diff(vals))])
+            # The difference to the last datapoint of the previous bucket does not belong to the bucket
+            diffs[first] = 0.0
+            result[name] = np.add.reduceat(diffs, first)
+        elif name == "interpolation":
+            result[name] = np.interp(result["timestamp"], all_timestamps, all_values, left=np.nan, right=np.nan)
+        elif name == "stepinterpolation":
+            index = np.searchsorted(all_timestamps, result["timestamp"], side="right") - 1
+            result[name] = np.where(index >= 0, all_values[np.maximum(index, 0)], np.nan)
+    return result
+
+
+# The aggregates which can be computed exactly from coarser buckets, with the aggregates of the finer buckets needed.
+ROLLUP_INPUTS = OrderedDict(
+    [
+        ("count", ["count"]),
+        ("sum", ["sum"]),
+        ("min", ["min"]),
+        ("max", ["max"]),
+        ("average", ["sum", "count"]),
+        ("discretevariance", ["discretevariance", "sum", "count"]),
+    ]
+)
+
+
+def rollup(fine: Dict[str, np.ndarray], aggregates: List[str], granularity: str, origin: int) -> Dict[str, np.ndarray]:
+    """Combines aggregates of fine buckets into aggregates of coarser buckets.
+
+    Count, sum, min and max are combined directly, average is computed from sum and count, and discrete variance by
+    merging the count, mean and sum of squared deviations of each fine bucket.
+
+    Args:
+        fine (Dict[str, np.ndarray]):   Bucket start timestamps under 'timestamp', sorted, and the aggregates named in
+                                        ROLLUP_INPUTS needed for the requested aggregates.
+        aggregates (List[str]):     The aggregate functions to compute. Must be among those in ROLLUP_INPUTS.
+        granularity (str):          The granularity of the coarse buckets. Must be a multiple of the fine granularity.
+        origin (int):               The start of any coarse bucket in ms since epoch.
+
+    Returns:
+        Dict[str, np.ndarray]: The coarse bucket start timestamps under 'timestamp', followed by each aggregate.
+    """
+    names = []
+    for agg in aggregates:
+        name = _utils.get_aggregate_func_return_name(agg)
+        if name not in ROLLUP_INPUTS:
+            raise ValueError("Aggregate function '{}' cannot be rolled up".format(agg))
+        if name not in names:
+            names.append(name)
+
+    timestamps = np.asarray(fine["timestamp"], dtype=np.int64)
+    result = OrderedDict()
+    if len(timestamps) == 0:
+        result["timestamp"] = timestamps
+        for name in names:
+            result[name] = np.array([], dtype=np.float64)
+        return result
+
+    granularity_ms = _utils.granularity_to_ms(granularity)
+    bucket_starts = origin + (timestamps - origin) // granularity_ms * granularity_ms
+    first = np.flatnonzero(np.concatenate([[True], bucket_starts[1:] != bucket_starts[:-1]]))
+    result["timestamp"] = bucket_starts[first]
+    columns = {key: np.asarray(value, dtype=np.float64) for key, value in fine.items() if key != "timestamp"}
+
+    for name in names:
+        if name in ("count", "sum"):
+            result[name] = np.add.reduceat(columns[name], first)
+        elif name == "min":
+            result[name] = np.minimum.reduceat(columns[name], first)
+        elif name == "max":
+            result[name] = np.maximum.reduceat(columns[name], first)
+        elif name == "average":
+            result[name] = np.add.reduceat(columns["sum"], first) / np.add.reduceat(columns["count"], first)
+        elif name == "discretevariance":
+            count = columns["count"]
+            mean = columns["sum"] / count
+            total_count = np.add.reduceat(count, first)
+            total_mean = np.add.reduceat(columns["sum"], first) / total_count
+            deviation = mean - np.repeat(total_mean, np.diff(np.concatenate([first, [len(timestamps)]])))
+            squared_deviations = columns["discretevariance"] * count + count * deviation ** 2
+            result[name] = np.add.reduceat(squared_deviations, first) / total_count
+    return result
@@ -0,0 +1,88 @@
+"""Aligns raw datapoints of several time series onto common timestamps."""
+
+from collections import OrderedDict
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cognite.client import _utils
+
+FILL_METHODS = [None, "last", "step", "linear"]
+
+
+def union_grid(series: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+    """Returns the sorted union of the timestamps of all series."""
+    timestamps = [np.asarray(ts, dtype=np.int64) for ts, _ in series.values()]
+    if not timestamps:
+        return np.array([], dtype=np.int64)
+    return np.unique(np.concatenate(timestamps))
+
+
+def fixed_grid(start: int, end: int, granularity: str) -> np.ndarray:
+    """Returns evenly spaced timestamps from start up to, but not including, end."""
+    return np.arange(start, end, _utils.granularity_to_ms(granularity), dtype=np.int64)
+
+
+def _align_series(timestamps: np.ndarray, values: np.ndarray, grid: np.ndarray, fill: str) -> np.ndarray:
+    if len(timestamps) == 0:
+        return np.full(len(grid), np.nan)
+    if fill == "linear":
+        return np.interp(grid, timestamps, values, left=np.nan, right=np.nan)
+
+    # Index of the last datapoint at or before each grid timestamp
+    index = np.searchsorted(timestamps, grid, side="right") - 1
+    defined = index >= 0
+    index = np.maximum(index, 0)
+    if fill is None:
+        defined &= timestamps[index] == grid
+    elif fill == "step":
+        defined &= grid <= timestamps[-1]
+    return np.where(defined, values[index], np.nan)
+
+
+def iter_align(
+    series: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    grid: np.ndarray = None,
+    fill: str = None,
+    chunk_size: int = 100000,
+) -> Iterator[pd.DataFrame]:
+    """Aligns several time series onto common timestamps, yielding the result in chunks of rows.
+
+    Each series is looked up on the grid with binary search, so aligning is O(n log n) in the total number of
+    datapoints and only one chunk of the output is held in memory at a time.
+
+    Args:
+        series (Dict[str, Tuple[np.ndarray, np.ndarray]]):  Sorted timestamps and values of each series, by name.
+        grid (np.ndarray):  Sorted timestamps to align the series onto. Defaults to the union of their timestamps.
+        fill (str):         How to fill in values at timestamps a series has no datapoint at. None leaves them
+                            missing, 'last' carries the last value forward, 'step' does the same but only up to the
+                            last datapoint of the series, and 'linear' interpolates linearly between datapoints.
+        chunk_size (int):   Max number of rows in each chunk.
+
+    Yields:
+        pandas.DataFrame: A timestamp column followed by a column of values for each series.
+    """
+    if fill not in FILL_METHODS:
+        raise ValueError("fill must be one of {}".format(FILL_METHODS))
+    series = OrderedDict(
+        (name, (np.asarray(ts, dtype=np.int64), np.asarray(values, dtype=np.float64)))
+        for name, (ts, values) in series.items()
+    )
+    if grid is None:
+        grid = union_grid(series)
+    grid = np.asarray(grid, dtype=np.int64)
+
+    for i in range(0, max(len(grid), 1), chunk_size):
+        chunk = grid[i : i + chunk_size]
+        columns = OrderedDict([("timestamp", chunk)])
+        for name, (timestamps, values) in series.items():
+            columns[name] = _align_series(timestamps, values, chunk, fill)
+        yield pd.DataFrame(columns)
+
+
+def align(series: Dict[str, Tuple[np.ndarray, np.ndarray]], grid: np.ndarray = None, fill: str = None) -> pd.DataFrame:
+    """Aligns several time series onto common timestamps in one dataframe. See iter_align() for the arguments."""
+    if grid is None:
+        grid = union_grid(series)
+    return next(iter_align(series, grid, fill, chunk_size=max(len(grid), 1)))
@@ -1,17 +1,49 @@
 import functools
-import gzip
+import io
 import json
 import logging
+import os
+import re
 from copy import deepcopy
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List
 
 from requests import Response, Session
+from urllib3.exceptions import MaxRetryError
 
+from cognite.client import _encoding
+from cognite.client._executor import WorkerExecutor
+from cognite.client._governor import THROTTLE_STATUS_CODES, _parse_retry_after
 from cognite.client.exceptions import APIError
 
 log = logging.getLogger("cognite-sdk")
 
 
+# POST endpoints which can safely be sent more than once, as they only read data or overwrite it by key. The retry
+# policy of the session never retries POST requests, so requests to these are retried by APIClient._post instead.
+_IDEMPOTENT_POST_ENDPOINTS = [
+    ("timeseries/data", re.compile(r"/timeseries/data(/[^/]+)?$")),
+    ("timeseries/dataquery", re.compile(r"/timeseries/dataquery$")),
+    ("timeseries/byids", re.compile(r"/timeseries/byids$")),
+    ("timeseries/dataframe", re.compile(r"/timeseries/dataframe$")),
+    ("raw/rows/create", re.compile(r"/raw/[^/]+/[^/]+/create$")),
+    ("sequences/postdata", re.compile(r"/sequences/[^/]+/postdata$")),
+    ("sequences/getdata", re.compile(r"/sequences/[^/]+/getdata$")),
+]
+
+
+def _get_idempotent_post_endpoint(url: str):
+    for endpoint, pattern in _IDEMPOTENT_POST_ENDPOINTS:
+        if pattern.search(url):
+            return endpoint
+    return None
+
+
+def _to_json_serializable(obj):
+    if hasattr(obj, "to_json"):
+        return obj.to_json()
+    return obj.__dict__
+
+
 def _status_is_valid(status_code: int):
     return status_code < 400
 
@@ -58,7 +90,19 @@ def request_method(method=None):
         default_headers = deepcopy(client_instance._headers)
         default_headers.update(kwargs.get("headers") or {})
         kwargs["headers"] = default_headers
-        res = method(client_instance, full_url, *args, **kwargs)
+        governor = client_instance._governor
+        if governor is None:
+            res = method(client_instance, full_url, *args, **kwargs)
+        else:
+            governor.acquire()
+            try:
+                res = method(client_instance, full_url, *args, **kwargs)
+            finally:
+                governor.release()
+            if res.status_code in THROTTLE_STATUS_CODES:
+                governor.on_throttle(_parse_retry_after(res.headers.get("Retry-After")))
+            elif _status_is_valid(res.status_code):
+                governor.on_success()
         if _status_is_valid(res.status_code):
             return res
         _raise_API_error(res)
@@ -66,9 +110,48 @@ def request_method(method=None):
     return wrapper
 
 
+class _FileChunkReader:
+    """Streams a file in chunks as a request body, reporting progress after each chunk.
+
+    The reader supports tell() and seek() so that the retry policy of the session can rewind it before resending the
+    body. It does not expose its length, so requests will use chunked transfer encoding.
+    """
+
+    def __init__(self, file_handle, file_size: int, chunk_size: int, progress_callback=None):
+        self._file_handle = file_handle
+        self._file_size = file_size
+        self._chunk_size = chunk_size
+        self._progress_callback = progress_callback
+
+    def __iter__(self):
+        while True:
+            chunk = self._file_handle.read(self._chunk_size)
+            if not chunk:
+                break
+            if self._progress_callback:
+                self._progress_callback(self._file_handle.tell(), self._file_size)
+            yield chunk
+
+    def tell(self):
+        return self._file_handle.tell()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("Can only seek from the start of the body")
+        return self._file_handle.seek(offset)
+
+
+class _SizedFileChunkReader(_FileChunkReader):
+    """A _FileChunkReader which exposes its length, so requests will send it with a Content-Length header."""
+
+    def __len__(self):
+        return self._file_size
+
+
 class APIClient:
     _LIMIT = 100000
     _LIMIT_AGG = 10000
+    _UPLOAD_CHUNK_SIZE = 1024 * 1024
 
     def __init__(
         self,
@@ -80,6 +163,8 @@ class APIClient:
         cookies: Dict = None,
         headers: Dict = None,
         timeout: int = None,
+        governor=None,
+        executor: WorkerExecutor = None,
     ):
         self._request_session = request_session
         self._project = project
@@ -89,6 +174,8 @@ class APIClient:
         self._cookies = cookies
         self._headers = headers
         self._timeout = timeout
+        self._governor = governor
+        self._executor = executor if executor is not None else WorkerExecutor(num_of_workers or 1)
 
     @request_method
     def _delete(self, url: str, params: Dict[str, Any] = None, headers: Dict[str, Any] = None):
@@ -114,18 +201,100 @@ class APIClient:
         params: Dict[str, Any] = None,
         use_gzip: bool = True,
         headers: Dict[str, Any] = None,
+        protobuf: bool = False,
     ):
-        data = json.dumps(body, default=lambda x: x.__dict__)
+        data = _encoding.encode_body(body, use_gzip=use_gzip, default=_to_json_serializable, protobuf=protobuf)
         headers = headers or {}
         if use_gzip:
             headers["Content-Encoding"] = "gzip"
-            data = gzip.compress(json.dumps(body, default=lambda x: x.__dict__).encode("utf-8"))
+        if protobuf:
+            headers["content-type"] = "application/protobuf"
         res = self._request_session.post(
             url, data=data, headers=headers, params=params, cookies=self._cookies, timeout=self._timeout
         )
+        endpoint = _get_idempotent_post_endpoint(url)
+        if endpoint is not None:
+            res = self._retry_idempotent_post(endpoint, res, url, data, headers, params)
         _log_request(res, body=body)
         return res
 
+    def _retry_idempotent_post(self, endpoint, res, url, data, headers, params):
+        """Retries a POST request to an idempotent endpoint according to the retry policy of the session.
+
+        The already encoded body is sent again as is. Retries are limited by the retry budget of the endpoint.
+        """
+        retry = self._request_session.get_adapter(url).max_retries
+        budget = self._governor.retry_budget(endpoint) if self._governor is not None else None
+        if budget is not None:
+            budget.deposit()
+        while res.status_code in (retry.status_forcelist or []):
+            if budget is not None and not budget.withdraw():
+                log.info("Retry budget of {} exhausted".format(endpoint))
+                break
+            try:
+                retry = retry.increment("POST", url, response=res.raw)
+            except MaxRetryError:
+                break
+            retry.sleep(res.raw)
+            res = self._request_session.post(
+                url, data=data, headers=headers, params=params, cookies=self._cookies, timeout=self._timeout
+            )
+        return res
+
+    def _post_in_chunks(
+        self, url: str, items: List, chunk_size: int, max_workers: int = None, on_chunk_posted: Callable = None
+    ) -> List:
+        """Posts items in chunks of at most chunk_size items, sending the chunks in parallel.
+
+        All chunks are posted even if some of them fail.
+
+        Args:
+            url (str):          The url to post to.
+            items (List):       The items to post. Each chunk is sent as {"items": chunk}.
+            chunk_size (int):   Max number of items per request.
+            max_workers (int):  Max number of requests to send at once. Defaults to the number of workers of the client.
+            on_chunk_posted (Callable): Called with each chunk and the items returned for it as soon as it has been
+                                        posted, from the thread which posted it.
+
+        Returns:
+            List: The items returned by the API for each chunk, in the order they were posted.
+
+        Raises:
+            APIError: If any chunk fails, whether with an API error or e.g. a connection error. extra["succeeded"] holds
+            the items returned for the chunks which succeeded, extra["failed"] the items of the chunks which failed and
+            extra["errors"] the exception raised for each failed chunk.
+        """
+        chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+        def post_chunk(chunk):
+            try:
+                res = self._post(url, body={"items": chunk})
+            except Exception as e:
+                return None, e
+            returned_items = res.json().get("data", {}).get("items", []) if res.content else []
+            if on_chunk_posted is not None:
+                on_chunk_posted(chunk, returned_items)
+            return returned_items, None
+
+        results = self._executor.map(post_chunk, chunks, max_workers=max_workers)
+        succeeded, failed, errors = [], [], []
+        for chunk, (returned_items, error) in zip(chunks, results):
+            if error is None:
+                succeeded.extend(returned_items)
+            else:
+                failed.extend(chunk)
+                errors.append(error)
+        if errors:
+            raise APIError(
+                "{} of {} chunks failed. First error: {}".format(
+                    len(errors), len(chunks), getattr(errors[0], "message", errors[0])
+                ),
+                code=getattr(errors[0], "code", None),
+                x_request_id=getattr(errors[0], "x_request_id", None),
+                extra={"succeeded": succeeded, "failed": failed, "errors": errors},
+            )
+        return succeeded
+
     @request_method
     def _put(self, url: str, body: Dict[str, Any] = None, headers: Dict[str, Any] = None):
         res = self._request_session.put(
@@ -134,6 +303,36 @@ class APIClient:
         _log_request(res, body=body)
         return res
 
+    def _upload(
+        self, url: str, file_path: str, headers: Dict[str, Any] = None, chunked: bool = False, progress_callback=None
+    ):
+        """Stream a file to an upload url using the request session of this client.
+
+        The file is never read into memory as a whole. Since the body can be rewound, failed uploads are retried
+        according to the retry policy of the session. The url is used as is and the default headers of the client
+        are not sent, as the url is typically a signed url to an external storage service.
+
+        Args:
+            url (str):          Absolute url to PUT the file to.
+            file_path (str):    Path of the file to upload.
+            headers (Dict[str, Any]):   Headers to send with the upload.
+            chunked (bool):     Use chunked transfer encoding instead of sending a Content-Length header.
+            progress_callback (Callable[[int, int], None]): Called with the number of bytes sent so far and the total
+                                number of bytes after each chunk.
+
+        Returns:
+            requests.Response: The response of the upload request.
+        """
+        file_size = os.path.getsize(file_path)
+        reader_class = _FileChunkReader if chunked else _SizedFileChunkReader
+        with open(file_path, "rb") as fh:
+            body = reader_class(fh, file_size, self._UPLOAD_CHUNK_SIZE, progress_callback)
+            res = self._request_session.put(url, data=body, headers=headers, timeout=self._timeout)
+        _log_request(res)
+        if not _status_is_valid(res.status_code):
+            _raise_API_error(res)
+        return res
+
 
 class CogniteResponse:
     """Cognite Response class
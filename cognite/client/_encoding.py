@@ -0,0 +1,194 @@
+"""Encoding of request bodies.
+
+Bodies for inserting datapoints are written directly from the arrays of DatapointBatch objects, without creating a
+dict or protobuf message per datapoint, and are compressed in chunks as they are written.
+"""
+
+import json
+import zlib
+from typing import Any, Callable, Dict, Iterator
+
+from cognite.client import _utils
+
+np = _utils.lazy_import("numpy")
+_api_timeseries_data_v2_pb2 = _utils.lazy_import("cognite._auxiliary._protobuf_descriptors._api_timeseries_data_v2_pb2")
+
+GZIP_COMPRESS_LEVEL = 6
+
+_CHUNK_SIZE = 10000
+_NUMERIC_DATAPOINT = '{"timestamp":%d,"value":%r}'
+_DATAPOINT = '{"timestamp":%d,"value":%s}'
+
+_WIRE_TYPE_VARINT = 0
+_WIRE_TYPE_FIXED64 = 1
+_WIRE_TYPE_LENGTH_DELIMITED = 2
+
+
+def _is_datapoint_batch(obj):
+    return hasattr(obj, "timestamps") and hasattr(obj, "values") and not isinstance(obj, dict)
+
+
+def is_datapoints_body(body) -> bool:
+    """Returns True if body is a datapoint insert body holding DatapointBatch objects.
+
+    That is either {"items": batch} for a single time series, or {"items": [{"name": name, "datapoints": batch}, ...]}
+    for several.
+    """
+    if not isinstance(body, dict) or list(body) != ["items"]:
+        return False
+    items = body["items"]
+    if _is_datapoint_batch(items):
+        return True
+    return (
+        isinstance(items, list)
+        and len(items) > 0
+        and all(
+            isinstance(item, dict)
+            and sorted(item) == ["datapoints", "name"]
+            and _is_datapoint_batch(item["datapoints"])
+            for item in items
+        )
+    )
+
+
+def _iter_encode_datapoints(batch) -> Iterator[str]:
+    for i in range(0, len(batch.timestamps), _CHUNK_SIZE):
+        timestamps = batch.timestamps[i : i + _CHUNK_SIZE].tolist()
+        values = batch.values[i : i + _CHUNK_SIZE]
+        if values.dtype.kind == "f" and np.isfinite(values).all():
+            # The repr of a float is the shortest string which parses back to the same float
+            datapoints = [_NUMERIC_DATAPOINT % datapoint for datapoint in zip(timestamps, values.tolist())]
+        else:
+            datapoints = [_DATAPOINT % (t, json.dumps(v)) for t, v in zip(timestamps, values.tolist())]
+        yield ("," if i else "") + ",".join(datapoints)
+
+
+def iter_encode_datapoints_body(body) -> Iterator[str]:
+    """Yields the JSON encoding of a datapoint insert body in chunks. See is_datapoints_body() for the format."""
+    yield '{"items":['
+    items = body["items"]
+    if _is_datapoint_batch(items):
+        yield from _iter_encode_datapoints(items)
+    else:
+        for i, item in enumerate(items):
+            yield '%s{"name":%s,"datapoints":[' % ("," if i else "", json.dumps(item["name"]))
+            yield from _iter_encode_datapoints(item["datapoints"])
+            yield "]}"
+    yield "]}"
+
+
+def _encode_varint(value: int) -> bytes:
+    value &= (1 << 64) - 1  # Negative numbers are encoded as their 64 bit two's complement
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append(value & 0x7F | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _encode_tag(message, field: str, wire_type: int) -> bytes:
+    return _encode_varint(message.DESCRIPTOR.fields_by_name[field].number << 3 | wire_type)
+
+
+def _encode_length_delimited(message, field: str, payload: bytes) -> bytes:
+    return _encode_tag(message, field, _WIRE_TYPE_LENGTH_DELIMITED) + _encode_varint(len(payload)) + payload
+
+
+def _encode_numeric_points(timestamps, values) -> bytes:
+    """Encodes the repeated points field of a NumericTimeseriesData message, vectorized over the datapoints."""
+    pb2 = _api_timeseries_data_v2_pb2
+    timestamp_tag = _encode_tag(pb2.NumericDatapoint, "timestamp", _WIRE_TYPE_VARINT)
+    value_tag = _encode_tag(pb2.NumericDatapoint, "value", _WIRE_TYPE_FIXED64)
+    points_tag = _encode_tag(pb2.NumericTimeseriesData, "points", _WIRE_TYPE_LENGTH_DELIMITED)
+
+    # Varints of up to 10 groups of 7 bits, least significant first, with the high bit set on all but the last
+    unsigned = timestamps.astype(np.int64).view(np.uint64)
+    groups = (unsigned[:, None] >> np.arange(0, 70, 7, dtype=np.uint64)) & np.uint64(0x7F)
+    nonzero = groups != 0
+    num_of_groups = np.where(nonzero.any(axis=1), 10 - np.argmax(nonzero[:, ::-1], axis=1), 1)
+    group_index = np.arange(10)
+    varints = groups.astype(np.uint8) | np.where(group_index < num_of_groups[:, None] - 1, 0x80, 0).astype(np.uint8)
+
+    # Each point is at most 20 bytes, so its length fits in a single byte varint
+    point_lengths = len(timestamp_tag) + num_of_groups + len(value_tag) + 8
+    columns = [
+        np.broadcast_to(np.frombuffer(points_tag, dtype=np.uint8), (len(timestamps), len(points_tag))),
+        point_lengths.astype(np.uint8)[:, None],
+        np.broadcast_to(np.frombuffer(timestamp_tag, dtype=np.uint8), (len(timestamps), len(timestamp_tag))),
+        varints,
+        np.broadcast_to(np.frombuffer(value_tag, dtype=np.uint8), (len(timestamps), len(value_tag))),
+        values.astype("<f8").view(np.uint8).reshape(-1, 8),
+    ]
+    matrix = np.concatenate(columns, axis=1)
+    mask = np.ones(matrix.shape, dtype=bool)
+    varint_start = len(points_tag) + 1 + len(timestamp_tag)
+    mask[:, varint_start : varint_start + 10] = group_index < num_of_groups[:, None]
+    return matrix[mask].tobytes()
+
+
+def _encode_string_points(timestamps, values) -> bytes:
+    """Encodes the repeated points field of a StringTimeseriesData message."""
+    pb2 = _api_timeseries_data_v2_pb2
+    timestamp_tag = _encode_tag(pb2.StringDatapoint, "timestamp", _WIRE_TYPE_VARINT)
+    value_tag = _encode_tag(pb2.StringDatapoint, "value", _WIRE_TYPE_LENGTH_DELIMITED)
+    points_tag = _encode_tag(pb2.StringTimeseriesData, "points", _WIRE_TYPE_LENGTH_DELIMITED)
+    encoded = bytearray()
+    for timestamp, value in zip(timestamps.tolist(), values.tolist()):
+        value = value.encode("utf-8")
+        point = timestamp_tag + _encode_varint(timestamp) + value_tag + _encode_varint(len(value)) + value
+        encoded += points_tag + _encode_varint(len(point)) + point
+    return bytes(encoded)
+
+
+def _encode_timeseries_data(message, batch) -> bytes:
+    """Encodes the stringData or numericData field of a TimeseriesData or NamedTimeseriesData message."""
+    if batch.values.dtype.kind == "f":
+        return _encode_length_delimited(message, "numericData", _encode_numeric_points(batch.timestamps, batch.values))
+    if not all(isinstance(value, str) for value in batch.values.tolist()):
+        raise ValueError("Datapoint values must be either all numeric or all strings to be encoded as protobuf")
+    return _encode_length_delimited(message, "stringData", _encode_string_points(batch.timestamps, batch.values))
+
+
+def iter_encode_datapoints_body_protobuf(body) -> Iterator[bytes]:
+    """Yields the protobuf encoding of a datapoint insert body in chunks. See is_datapoints_body() for the format.
+
+    A single time series is encoded as a TimeseriesData message and several as a MultiNamedTimeseriesData message.
+    """
+    pb2 = _api_timeseries_data_v2_pb2
+    items = body["items"]
+    if _is_datapoint_batch(items):
+        yield _encode_timeseries_data(pb2.TimeseriesData, items)
+        return
+    for item in items:
+        named_data = _encode_length_delimited(pb2.NamedTimeseriesData, "name", item["name"].encode("utf-8"))
+        named_data += _encode_timeseries_data(pb2.NamedTimeseriesData, item["datapoints"])
+        yield _encode_length_delimited(pb2.MultiNamedTimeseriesData, "namedTimeseriesData", named_data)
+
+
+def encode_body(body: Dict[str, Any], use_gzip: bool, default: Callable = None, protobuf: bool = False) -> bytes:
+    """Encodes a request body as JSON, using the fast encoder for datapoint insert bodies.
+
+    Args:
+        body (Dict[str, Any]):  The body to encode.
+        use_gzip (bool):        Compress the encoded body with gzip.
+        default (Callable):     Returns a serializable version of objects json cannot serialize, as for json.dumps().
+        protobuf (bool):        Encode the body as protobuf rather than JSON. Only supported for datapoint insert
+                                bodies.
+
+    Returns:
+        bytes: The encoded body.
+    """
+    if protobuf:
+        if not is_datapoints_body(body):
+            raise ValueError("Only datapoint insert bodies can be encoded as protobuf")
+        chunks = iter_encode_datapoints_body_protobuf(body)
+    elif is_datapoints_body(body):
+        chunks = (chunk.encode("utf-8") for chunk in iter_encode_datapoints_body(body))
+    else:
+        chunks = [json.dumps(body, default=default).encode("utf-8")]
+    if not use_gzip:
+        return b"".join(chunks)
+    # wbits=31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(GZIP_COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    return b"".join([compressor.compress(chunk) for chunk in chunks] + [compressor.flush()])
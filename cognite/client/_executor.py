@@ -0,0 +1,117 @@
+import os
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor as Pool
+from typing import Callable, List
+
+_EXECUTORS = weakref.WeakSet()
+
+
+class WorkerExecutor:
+    """Thread pool shared by all API clients of a CogniteClient, so that parallel calls reuse the same threads.
+
+    The number of threads is a global limit on the number of tasks running at once across all simultaneous calls. The
+    threads are started on first use. Tasks submitted from one of the threads are run inline, so that a task which
+    makes a parallel call itself cannot deadlock waiting for threads held by its caller. After a fork, the child
+    starts new threads on first use, as threads do not survive a fork.
+
+    Args:
+        max_workers (int):  Number of threads.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, int(max_workers))
+        self._init_state()
+        _EXECUTORS.add(self)
+
+    def _init_state(self):
+        self._pool = None
+        self._is_shutdown = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._is_shutdown:
+                raise RuntimeError("Cannot schedule new tasks after the client has been closed")
+            if self._pool is None:
+                self._pool = Pool(self.max_workers)
+            return self._pool
+
+    def _run_in_worker(self, fn, args, kwargs):
+        self._local.is_worker = True
+        return fn(*args, **kwargs)
+
+    def _in_worker(self):
+        return getattr(self._local, "is_worker", False)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Schedules fn(*args, **kwargs) to run on one of the threads and returns its future."""
+        if self._in_worker():
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        return self._get_pool().submit(self._run_in_worker, fn, args, kwargs)
+
+    def map(self, fn: Callable, *iterables, max_workers: int = None) -> List:
+        """Calls fn on each set of arguments in parallel and returns the results in order.
+
+        Args:
+            fn (Callable):      The function to call.
+            iterables:          Iterables of arguments to fn, as for the builtin map().
+            max_workers (int):  Max number of calls to run at once for this map, in addition to the limit of the
+                                executor. Defaults to no additional limit.
+
+        Returns:
+            List: The return values of fn. If a call raises, the remaining calls are skipped and the exception is
+            raised.
+        """
+        tasks = deque(enumerate(zip(*iterables)))
+        results = [None] * len(tasks)
+        num_of_workers = min(len(tasks), max_workers or len(tasks), self.max_workers)
+        if num_of_workers <= 1 or self._in_worker():
+            return [fn(*args) for _, args in tasks]
+
+        failed = threading.Event()
+
+        def worker():
+            while not failed.is_set():
+                try:
+                    i, args = tasks.popleft()
+                except IndexError:
+                    return
+                try:
+                    results[i] = fn(*args)
+                except BaseException:
+                    failed.set()
+                    raise
+
+        futures = [self.submit(worker) for _ in range(num_of_workers)]
+        for future in futures:
+            future.result()
+        return results
+
+    def shutdown(self, wait: bool = True):
+        """Stops the threads once the tasks already submitted are done. New tasks are refused afterwards."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._is_shutdown = True
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+def _reset_executors_after_fork():
+    # The threads of the parent do not exist in the child, so the pools are dropped and recreated on first use.
+    for executor in list(_EXECUTORS):
+        is_shutdown = executor._is_shutdown
+        executor._init_state()
+        executor._is_shutdown = is_shutdown
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executors_after_fork)
@@ -0,0 +1,231 @@
+import random
+import threading
+import time
+from email.utils import mktime_tz, parsedate_tz
+
+from urllib3 import Retry
+
+THROTTLE_STATUS_CODES = [429, 503]
+
+
+def _parse_retry_after(retry_after):
+    """Returns the number of seconds to wait from a Retry-After header value, or None if it is missing or invalid."""
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        parsed = parsedate_tz(retry_after)
+        if parsed is None:
+            return None
+        return max(0.0, mktime_tz(parsed) - time.time())
+
+
+class _TokenBucket:
+    """Limits the rate at which tokens can be acquired, allowing bursts of up to one second worth of tokens."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._capacity = max(1.0, rate)
+        self._tokens = self._capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RetryBudget:
+    """Limits retries to a fraction of the requests made, so that retries cannot multiply the load during an outage.
+
+    Each request deposits a fraction of a token and each retry withdraws a whole one. Tokens also trickle in at a fixed
+    rate, so that endpoints with few requests can still retry.
+
+    Args:
+        ratio (float):  Number of retries allowed per request.
+        min_retries_per_second (float):    Rate at which tokens are added regardless of the number of requests.
+        max_tokens (float): Max number of tokens which can be saved up.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 1, max_tokens: float = 50):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+        self._tokens = float(max_tokens)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _add(self, tokens):
+        now = time.monotonic()
+        tokens += (now - self._last_refill) * self.min_retries_per_second
+        self._tokens = min(float(self.max_tokens), self._tokens + tokens)
+        self._last_refill = now
+
+    def deposit(self):
+        """Registers a request."""
+        with self._lock:
+            self._add(self.ratio)
+
+    def withdraw(self):
+        """Returns True and registers a retry if the budget allows one."""
+        with self._lock:
+            self._add(0)
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._add(0)
+            return self._tokens
+
+
+class ConcurrencyGovernor:
+    """Limits the number of concurrent requests and the request rate of all API clients of a CogniteClient.
+
+    The concurrency limit is adapted with additive increase/multiplicative decrease. Each successful request grows the
+    limit by 1/limit, i.e. by about one for every round of requests, while a throttled (429 or 503) response halves it
+    and pauses all requests until the time given by the Retry-After header, or a jittered exponential backoff if there
+    is none. Throttled responses arriving within the same pause only shrink the limit once, so that workers which were
+    throttled in lockstep do not collapse it.
+
+    Args:
+        max_concurrency (int):  Upper bound of the concurrency limit, which is also where it starts.
+        min_concurrency (int):  Lower bound of the concurrency limit.
+        max_requests_per_second (float):  Max number of requests to start per second. Defaults to no limit.
+        backoff_base (float):   Pause in seconds after the first throttled response without a Retry-After header.
+                                Doubles with each consecutive throttled response.
+        backoff_max (float):    Longest pause in seconds.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 100,
+        min_concurrency: int = 1,
+        max_requests_per_second: float = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60,
+    ):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._consecutive_throttles = 0
+        self._num_of_requests = 0
+        self._num_of_throttles = 0
+        self._condition = threading.Condition()
+        self._token_bucket = _TokenBucket(max_requests_per_second) if max_requests_per_second else None
+        self._retry_budgets = {}
+
+    def acquire(self):
+        """Blocks until a request may be started."""
+        with self._condition:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    self._condition.wait(pause)
+                elif self._in_flight < int(self._limit):
+                    break
+                else:
+                    self._condition.wait()
+            self._in_flight += 1
+            self._num_of_requests += 1
+        if self._token_bucket:
+            self._token_bucket.acquire()
+
+    def release(self):
+        """Marks a request started with acquire() as finished."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        with self._condition:
+            self._consecutive_throttles = 0
+            self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def on_throttle(self, retry_after: float = None):
+        with self._condition:
+            self._num_of_throttles += 1
+            now = time.monotonic()
+            if now < self._paused_until:
+                return
+            self._limit = max(float(self.min_concurrency), self._limit / 2)
+            if retry_after is None:
+                backoff = min(self.backoff_max, self.backoff_base * 2 ** self._consecutive_throttles)
+                pause = backoff / 2 + random.uniform(0, backoff / 2)
+            else:
+                pause = min(self.backoff_max, retry_after) * random.uniform(1, 1.1)
+            self._consecutive_throttles += 1
+            self._paused_until = now + pause
+
+    def retry_budget(self, endpoint: str) -> RetryBudget:
+        """Returns the retry budget shared by all requests to an endpoint."""
+        with self._condition:
+            if endpoint not in self._retry_budgets:
+                self._retry_budgets[endpoint] = RetryBudget()
+            return self._retry_budgets[endpoint]
+
+    def wait_for_pause(self):
+        """Blocks until requests are no longer paused after a throttled response."""
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+
+    def metrics(self):
+        """Returns the current limits and counters of the governor.
+
+        Returns:
+            Dict: The concurrency limit, number of requests in flight, request rate limit, number of requests started,
+            number of throttled responses, seconds left of the current pause and retries left in the budget of each
+            endpoint.
+        """
+        with self._condition:
+            return {
+                "retry_budgets": {endpoint: budget.tokens for endpoint, budget in self._retry_budgets.items()},
+                "concurrency_limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "max_requests_per_second": self._token_bucket.rate if self._token_bucket else None,
+                "requests": self._num_of_requests,
+                "throttled": self._num_of_throttles,
+                "paused_for": max(0.0, self._paused_until - time.monotonic()),
+            }
+
+
+class GovernedRetry(Retry):
+    """Retry policy which reports throttled responses to a ConcurrencyGovernor and waits out its shared pause.
+
+    Other retries sleep a random time of up to the exponential backoff, so that concurrent requests do not retry in
+    lockstep.
+    """
+
+    governor = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.governor = self.governor
+        return retry
+
+    def sleep(self, response=None):
+        if self.governor is None:
+            return super().sleep(response)
+        if response is not None and response.status in THROTTLE_STATUS_CODES:
+            self.governor.on_throttle(_parse_retry_after(response.headers.get("Retry-After")))
+            self.governor.wait_for_pause()
+        else:
+            time.sleep(random.uniform(0, self.get_backoff_time()))
@@ -0,0 +1,92 @@
+"""Converts lists of resource items, such as events, assets and time series, to dataframes."""
+
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# String columns with at most this many distinct values per row are made categorical
+_MAX_CATEGORICAL_RATIO = 0.5
+
+
+def _get_metadata_columns(items: List[Dict], prefix: str) -> "OrderedDict[str, np.ndarray]":
+    # Collects the rows and values of each metadata field in one pass, so that sparse metadata costs no more than dense
+    rows, values = OrderedDict(), {}
+    for i, item in enumerate(items):
+        metadata = item.get("metadata")
+        if metadata:
+            for key, value in metadata.items():
+                if key not in rows:
+                    rows[key], values[key] = [], []
+                rows[key].append(i)
+                values[key].append(value)
+
+    columns = OrderedDict()
+    for key in rows:
+        column = np.full(len(items), np.nan, dtype=object)
+        column[rows[key]] = values[key]
+        columns[prefix + key] = column
+    return columns
+
+
+def _to_categorical(frame: pd.DataFrame) -> pd.DataFrame:
+    for name in frame.columns:
+        column = frame[name]
+        if (
+            column.dtype == object
+            and pd.api.types.infer_dtype(column, skipna=True) == "string"
+            and column.nunique() <= len(column) * _MAX_CATEGORICAL_RATIO
+        ):
+            frame[name] = column.astype("category")
+    return frame
+
+
+def items_to_pandas(
+    items: List[Dict],
+    expand_metadata: bool = True,
+    metadata_prefix: str = "",
+    categorical: bool = False,
+    separate_metadata: bool = False,
+):
+    """Returns a dataframe with a row for each item and a column for each field.
+
+    The items are not copied, and the metadata fields of all items are collected in a single pass.
+
+    Args:
+        items (List[Dict]):     The items, e.g. events, with metadata dicts under 'metadata'.
+        expand_metadata (bool): Make a column of each metadata field rather than a column of metadata dicts. A metadata
+                                field with the same name as another field replaces it for the items which have it.
+        metadata_prefix (str):  Prefix of the names of the metadata columns.
+        categorical (bool):     Store string columns with few distinct values as categoricals, to save memory.
+        separate_metadata (bool):   Return the metadata fields as a separate sparse dataframe with the same index.
+
+    Returns:
+        Union[pandas.DataFrame, Tuple[pandas.DataFrame, pandas.DataFrame]]: The dataframe, or if separate_metadata is
+        True, the dataframe without metadata and a dataframe of the metadata fields.
+    """
+    frame = pd.DataFrame(items)
+    if "metadata" in frame.columns and (expand_metadata or separate_metadata):
+        frame = frame.drop(columns="metadata")
+        metadata_columns = _get_metadata_columns(items, metadata_prefix)
+    else:
+        metadata_columns = OrderedDict()
+
+    if separate_metadata:
+        metadata_frame = pd.DataFrame(
+            OrderedDict(
+                (name, pd.arrays.SparseArray(column, fill_value=np.nan)) for name, column in metadata_columns.items()
+            ),
+            index=frame.index,
+        )
+        return (_to_categorical(frame) if categorical else frame), metadata_frame
+
+    new_columns = OrderedDict()
+    for name, column in metadata_columns.items():
+        if name in frame.columns:
+            frame[name] = np.where(pd.isna(column), frame[name].astype(object), column)
+        else:
+            new_columns[name] = column
+    if new_columns:
+        frame = pd.concat([frame, pd.DataFrame(new_columns, index=frame.index)], axis=1)
+    return _to_categorical(frame) if categorical else frame
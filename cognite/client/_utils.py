@@ -6,6 +6,8 @@ This module provides helper methods and different utilities for the Cognite API
 This module is protected and should not used by end-users.
 """
 import datetime
+import functools
+import importlib
 import platform
 import re
 import sys
@@ -168,6 +170,7 @@ def to_snake_case(camel_case_string: str):
     return re.sub("([a-z0-9])([A-Z])", r"\1_\2", s1).lower()
 
 
+@functools.lru_cache(maxsize=1)
 def get_user_agent():
     sdk_version = "CognitePythonSDK/{}".format(cognite.__version__)
 
@@ -181,3 +184,26 @@ def get_user_agent():
     operating_system = "{}/{}".format(platform.system(), os_version_info)
 
     return "{} {} {}".format(sdk_version, python_version, operating_system)
+
+
+class _LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        return "<lazy module '{}'>".format(self._name)
+
+
+def lazy_import(name: str):
+    """Returns a proxy for a module which imports it on first attribute access.
+
+    Used for heavy dependencies such as pandas and protobuf, so that importing the SDK stays fast for programs which do
+    not need them.
+    """
+    return _LazyModule(name)
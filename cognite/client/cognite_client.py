@@ -1,13 +1,17 @@
+import hashlib
+import json
 import os
+import threading
+import time
 from typing import Any, Dict
 
 import requests
-from cognite_logger import cognite_logger
 from requests import Session
 from requests.adapters import HTTPAdapter
-from urllib3 import Retry
 
 from cognite.client._api_client import APIClient
+from cognite.client._executor import WorkerExecutor
+from cognite.client._governor import ConcurrencyGovernor, GovernedRetry
 from cognite.client._utils import get_user_agent
 from cognite.client.experimental import ExperimentalClient
 from cognite.client.stable.assets import AssetsClient
@@ -25,12 +29,17 @@ DEFAULT_BASE_URL = "https://api.cognitedata.com"
 DEFAULT_NUM_OF_RETRIES = 5
 DEFAULT_NUM_OF_WORKERS = 10
 DEFAULT_TIMEOUT = 60
+DEFAULT_MAX_CONCURRENCY = 100
+DEFAULT_LOGIN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cognite", "login_status.json")
 
 ENVIRONMENT_API_KEY = os.getenv("COGNITE_API_KEY")
 ENVIRONMENT_BASE_URL = os.getenv("COGNITE_BASE_URL")
 ENVIRONMENT_NUM_OF_RETRIES = os.getenv("COGNITE_NUM_RETRIES")
 ENVIRONMENT_NUM_OF_WORKERS = os.getenv("COGNITE_NUM_WORKERS")
 ENVIRONMENT_TIMEOUT = os.getenv("COGNITE_TIMEOUT")
+ENVIRONMENT_MAX_CONCURRENCY = os.getenv("COGNITE_MAX_CONCURRENCY")
+ENVIRONMENT_MAX_REQUESTS_PER_SECOND = os.getenv("COGNITE_MAX_REQUESTS_PER_SECOND")
+ENVIRONMENT_LOGIN_CACHE_TTL = os.getenv("COGNITE_LOGIN_CACHE_TTL")
 
 
 class CogniteClient:
@@ -40,16 +49,23 @@ class CogniteClient:
 
     Args:
         api_key (str): API key
-        project (str): Project. Defaults to project of given API key.
+        project (str): Project. Defaults to project of given API key, which is looked up on first use of the client.
         base_url (str): Base url to send requests to. Defaults to "https://api.cognitedata.com"
         num_of_retries (int): Number of times to retry failed requests. Defaults to 5.
-                        Will only retry status codes 401, 429, 500, 502, and 503.
-        num_of_workers (int): Number of workers to spawn when parallelizing data fetching. Defaults to 10.
+                        Will only retry status codes 401, 429, 500, 502, and 503. POST requests are only retried
+                        for idempotent endpoints, such as inserting datapoints or raw rows.
+        num_of_workers (int): Number of worker threads shared by all parallel data fetching through this client, which
+                        limits the number of parallel requests across simultaneous calls. Defaults to 10.
         cookies (Dict): Cookies to append to all requests. Defaults to {}
         headers (Dict): Additional headers to add to all requests. Defaults are:
                  {"api-key": self.api_key, "content-type": "application/json", "accept": "application/json"}
         timeout (int): Timeout on requests sent to the api. Defaults to 60 seconds.
         debug (bool): Configures logger to log extra request details to stdout.
+        max_concurrency (int): Max number of concurrent requests across all threads using this client. The limit adapts
+                        to throttling from the api and never exceeds this value. Defaults to 100.
+        max_requests_per_second (float): Max number of requests to send per second. Defaults to no limit.
+        login_cache_ttl (float): Number of seconds to cache the project of the API key on disk, so that short-lived
+                        programs need not look it up every time they start. Defaults to no caching.
 
 
     Examples:
@@ -75,6 +91,26 @@ class CogniteClient:
                 export COGNITE_NUM_RETRIES = <number-of-retries>
                 export COGNITE_NUM_WORKERS = <number-of-workers>
                 export COGNITE_TIMEOUT = <num-of-seconds>
+                export COGNITE_MAX_CONCURRENCY = <max-number-of-concurrent-requests>
+                export COGNITE_MAX_REQUESTS_PER_SECOND = <max-number-of-requests-per-second>
+                export COGNITE_LOGIN_CACHE_TTL = <num-of-seconds>
+
+            The current limits of the client can be monitored through its metrics::
+
+                client = CogniteClient()
+                print(client.metrics())
+
+            API clients such as client.datapoints are created on first access and shared by all threads using the
+            client, so accessing them in a loop is cheap::
+
+                client = CogniteClient()
+                for name in ["ts_1", "ts_2"]:
+                    print(client.datapoints.get_latest(name).to_json())
+
+            The worker threads of the client are stopped when it is closed, or when used as a context manager::
+
+                with CogniteClient() as client:
+                    res = client.datapoints.get_datapoints("my_ts", start="1w-ago")
     """
 
     def __init__(
@@ -88,6 +124,9 @@ class CogniteClient:
         cookies: Dict[str, str] = None,
         timeout: int = None,
         debug: bool = None,
+        max_concurrency: int = None,
+        max_requests_per_second: float = None,
+        login_cache_ttl: float = None,
     ):
         self.__api_key = api_key or ENVIRONMENT_API_KEY
         if self.__api_key is None:
@@ -110,17 +149,58 @@ class CogniteClient:
 
         self._timeout = timeout or ENVIRONMENT_TIMEOUT or DEFAULT_TIMEOUT
 
+        self._governor = ConcurrencyGovernor(
+            max_concurrency=int(max_concurrency or ENVIRONMENT_MAX_CONCURRENCY or DEFAULT_MAX_CONCURRENCY),
+            max_requests_per_second=float(max_requests_per_second or ENVIRONMENT_MAX_REQUESTS_PER_SECOND or 0) or None,
+        )
+
         self._requests_session = self._requests_retry_session()
 
+        self._executor = WorkerExecutor(self._num_of_workers)
+
         self._project = project
-        if project is None:
-            self._project = self.login.status().project
+        self._project_lock = threading.Lock()
+        self._login_cache_ttl = float(login_cache_ttl or ENVIRONMENT_LOGIN_CACHE_TTL or 0)
+
+        self._api_client = APIClient(
+            request_session=self._requests_session,
+            base_url=self._base_url,
+            num_of_workers=self._num_of_workers,
+            cookies=self._cookies,
+            headers=self._headers,
+            timeout=self._timeout,
+            governor=self._governor,
+            executor=self._executor,
+        )
+        self._login = LoginClient(
+            request_session=self._requests_session,
+            base_url=self._base_url,
+            num_of_workers=self._num_of_workers,
+            cookies=self._cookies,
+            headers=self._headers,
+            timeout=self._timeout,
+            governor=self._governor,
+            executor=self._executor,
+        )
 
-        self._api_client = self._client_factory(APIClient)
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self._experimental = ExperimentalClient(self._client_factory)
 
         if debug:
+            from cognite_logger import cognite_logger
+
             cognite_logger.configure_logger("cognite-sdk", log_level="INFO", log_json=True)
 
+    @property
+    def project(self) -> str:
+        """The project of the client. Looked up from the API key on first access if it was not given."""
+        if self._project is None:
+            with self._project_lock:
+                if self._project is None:
+                    self._project = self._get_project_of_api_key()
+        return self._project
+
     @property
     def assets(self) -> AssetsClient:
         return self._client_factory(AssetsClient)
@@ -139,7 +219,8 @@ class CogniteClient:
 
     @property
     def login(self) -> LoginClient:
-        return self._client_factory(LoginClient)
+        # Login does not depend on the project, and is used to look it up
+        return self._login
 
     @property
     def raw(self) -> RawClient:
@@ -155,7 +236,29 @@ class CogniteClient:
 
     @property
     def experimental(self) -> ExperimentalClient:
-        return ExperimentalClient(self._client_factory)
+        return self._experimental
+
+    def close(self):
+        """Stops the worker threads of the client once running calls are done.
+
+        Calls which fetch data in parallel cannot be made after the client has been closed.
+        """
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns the current request limits and counters of this client.
+
+        Returns:
+            Dict: The adaptive concurrency limit, number of requests in flight, request rate limit, number of requests
+            started, number of throttled responses and seconds left of the current pause after throttling.
+        """
+        return self._governor.metrics()
 
     def get(self, url: str, params: Dict[str, Any] = None, headers: Dict[str, Any] = None):
         """Perform a GET request to a path in the API.
@@ -193,19 +296,69 @@ class CogniteClient:
         return self._api_client._delete(url, params=params, headers=headers)
 
     def _client_factory(self, client):
-        return client(
-            request_session=self._requests_session,
-            project=self._project,
-            base_url=self._base_url,
-            num_of_workers=self._num_of_workers,
-            cookies=self._cookies,
-            headers=self._headers,
-            timeout=self._timeout,
-        )
+        """Returns the instance of an API client class shared by all users of this client, creating it on first use.
+
+        API clients hold no state specific to a call, so one instance can be used by several threads at once.
+        """
+        instance = self._clients.get(client)
+        if instance is None:
+            with self._clients_lock:
+                instance = self._clients.get(client)
+                if instance is None:
+                    instance = client(
+                        request_session=self._requests_session,
+                        project=self.project,
+                        base_url=self._base_url,
+                        num_of_workers=self._num_of_workers,
+                        cookies=self._cookies,
+                        headers=self._headers,
+                        timeout=self._timeout,
+                        governor=self._governor,
+                        executor=self._executor,
+                    )
+                    self._clients[client] = instance
+        return instance
+
+    def _get_project_of_api_key(self):
+        if not self._login_cache_ttl:
+            return self.login.status().project
+
+        key = hashlib.sha256("{} {}".format(self._base_url, self.__api_key).encode()).hexdigest()
+        cache = self._read_login_cache()
+        entry = cache.get(key)
+        if entry is not None and entry["expires"] > time.time():
+            return entry["project"]
+
+        project = self.login.status().project
+        now = time.time()
+        cache = {k: v for k, v in cache.items() if v["expires"] > now}
+        cache[key] = {"project": project, "expires": now + self._login_cache_ttl}
+        self._write_login_cache(cache)
+        return project
+
+    @staticmethod
+    def _read_login_cache():
+        try:
+            with open(DEFAULT_LOGIN_CACHE_PATH) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_login_cache(cache):
+        # The cache is only an optimization, so failing to write it must not fail the client
+        try:
+            os.makedirs(os.path.dirname(DEFAULT_LOGIN_CACHE_PATH), exist_ok=True)
+            tmp_path = "{}.{}.tmp".format(DEFAULT_LOGIN_CACHE_PATH, os.getpid())
+            with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, DEFAULT_LOGIN_CACHE_PATH)
+        except OSError:
+            pass
 
     def _requests_retry_session(self):
         session = Session()
-        retry = Retry(
+        retry = GovernedRetry(
             total=self._num_of_retries,
             read=self._num_of_retries,
             connect=self._num_of_retries,
@@ -213,6 +366,7 @@ class CogniteClient:
             status_forcelist=STATUS_FORCELIST,
             raise_on_status=False,
         )
+        retry.governor = self._governor
         adapter = HTTPAdapter(max_retries=retry)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
@@ -7,10 +7,11 @@ from cognite.client.experimental.time_series import TimeSeriesClient
 class ExperimentalClient:
     def __init__(self, client_factory):
         self._client_factory = client_factory
+        self._analytics = AnalyticsClient(client_factory=client_factory)
 
     @property
     def analytics(self) -> AnalyticsClient:
-        return AnalyticsClient(client_factory=self._client_factory)
+        return self._analytics
 
     @property
     def datapoints(self) -> DatapointsClient:
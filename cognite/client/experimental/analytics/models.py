@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Dict, List
-
-import requests
+import json
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List
 
 from cognite.client._api_client import APIClient
 
@@ -184,6 +184,126 @@ class ModelsClient(APIClient):
         res = self._put(url, body=body)
         return res.json()
 
+    def online_predict_in_batches(
+        self,
+        model_id: int,
+        version_id: int = None,
+        instances: Iterable = None,
+        args: Dict[str, Any] = None,
+        batch_size: int = 100,
+        max_batch_bytes: int = None,
+        workers: int = None,
+    ) -> List:
+        """Perform online prediction on a large number of instances by splitting them into micro-batches.
+
+        The micro-batches are sent concurrently and the predictions are returned in the same order as the instances.
+        Use iter_online_predict() if you want to consume the predictions as they become available.
+
+        Args:
+            model_id (int):     Perform a prediction on the model with this id. Will use active version.
+            version_id (int):   Use this version instead of the active version. (optional)
+            instances (Iterable): Iterable of JSON serializable instances to pass to your model one-by-one.
+            args (Dict[str, Any])    Dictionary of keyword arguments to pass to your predict method.
+            batch_size (int):   Maximum number of instances in each request. Defaults to 100.
+            max_batch_bytes (int):  Maximum size of the serialized instances in each request. (optional)
+            workers (int):      Maximum number of requests in flight at the same time. Defaults to num_of_workers.
+
+        Returns:
+            List: List of predictions for each instance.
+
+        Examples:
+            Predicting on 100,000 instances, 500 at a time::
+
+                client = CogniteClient()
+                predictions = client.experimental.analytics.models.online_predict_in_batches(
+                    model_id=123, instances=my_instances, batch_size=500
+                )
+        """
+        return list(
+            self.iter_online_predict(
+                model_id,
+                version_id=version_id,
+                instances=instances,
+                args=args,
+                batch_size=batch_size,
+                max_batch_bytes=max_batch_bytes,
+                workers=workers,
+            )
+        )
+
+    def iter_online_predict(
+        self,
+        model_id: int,
+        version_id: int = None,
+        instances: Iterable = None,
+        args: Dict[str, Any] = None,
+        batch_size: int = 100,
+        max_batch_bytes: int = None,
+        workers: int = None,
+    ) -> Iterator:
+        """Returns an iterator over the predictions for each instance, in the same order as the instances.
+
+        The instances are consumed lazily and split into micro-batches which are sent concurrently. At most ``workers``
+        micro-batches are held in memory at any time, so the instances may be a generator over a very large dataset.
+
+        Args:
+            model_id (int):     Perform a prediction on the model with this id. Will use active version.
+            version_id (int):   Use this version instead of the active version. (optional)
+            instances (Iterable): Iterable of JSON serializable instances to pass to your model one-by-one.
+            args (Dict[str, Any])    Dictionary of keyword arguments to pass to your predict method.
+            batch_size (int):   Maximum number of instances in each request. Defaults to 100.
+            max_batch_bytes (int):  Maximum size of the serialized instances in each request. (optional)
+            workers (int):      Maximum number of requests in flight at the same time. Defaults to num_of_workers.
+
+        Yields:
+            The prediction for each instance.
+
+        Examples:
+            Streaming predictions for instances read from a file::
+
+                client = CogniteClient()
+                instances = (json.loads(line) for line in open("instances.jsonl"))
+                for prediction in client.experimental.analytics.models.iter_online_predict(123, instances=instances):
+                    print(prediction)
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        workers = max(1, workers or self._num_of_workers or 1)
+        batches = self._split_instances(instances or [], batch_size, max_batch_bytes)
+
+        in_flight = deque()
+        for batch in batches:
+            if len(in_flight) == workers:
+                yield from in_flight.popleft().result()
+            in_flight.append(self._executor.submit(self._online_predict_batch, model_id, version_id, batch, args))
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+    def _online_predict_batch(self, model_id, version_id, instances, args):
+        predictions = self.online_predict(model_id, version_id=version_id, instances=instances, args=args)
+        predictions = predictions["data"]["predictions"]
+        if len(predictions) != len(instances):
+            raise ValueError("Got {} predictions for a batch of {} instances".format(len(predictions), len(instances)))
+        return predictions
+
+    @staticmethod
+    def _split_instances(instances, batch_size, max_batch_bytes=None):
+        batch = []
+        batch_bytes = 0
+        for instance in instances:
+            instance_bytes = len(json.dumps(instance)) + 1 if max_batch_bytes else 0
+            batch_is_full = len(batch) == batch_size or (
+                max_batch_bytes and batch_bytes + instance_bytes > max_batch_bytes
+            )
+            if batch and batch_is_full:
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(instance)
+            batch_bytes += instance_bytes
+        if batch:
+            yield batch
+
     def create_source_package(
         self,
         name: str,
@@ -193,6 +313,7 @@ class ModelsClient(APIClient):
         description: str = None,
         meta_data: Dict = None,
         file_path: str = None,
+        progress_callback: Callable[[int, int], None] = None,
     ) -> Dict:
         """Upload a source package to the model hosting environment.
 
@@ -204,6 +325,8 @@ class ModelsClient(APIClient):
             description (str): Description for source package
             meta_data (Dict): User defined key value pair of additional information.
             file_path (str): File path of source package distribution. If not specified, a download url will be returned.
+            progress_callback (Callable[[int, int], None]): Called with the number of bytes uploaded so far and the total
+                                number of bytes while uploading the file. (optional)
 
         Returns:
             Dict: Source package ID if file path was specified. Else, source package id and upload url.
@@ -220,17 +343,11 @@ class ModelsClient(APIClient):
         }
         res = self._post(url, body=body)
         if file_path:
-            self._upload_file(res.json().get("uploadUrl"), file_path)
+            self._upload(res.json().get("uploadUrl"), file_path, progress_callback=progress_callback)
             del res.json()["uploadUrl"]
             return res.json()
         return res.json()
 
-    def _upload_file(self, upload_url, file_path):
-        with open(file_path, "rb") as fh:
-            mydata = fh.read()
-            response = requests.put(upload_url, data=mydata)
-        return response
-
     def get_source_packages(self) -> List[Dict]:
         """Get all model source packages.
 
@@ -1,13 +1,12 @@
 # -*- coding: utf-8 -*-
-from concurrent.futures import ThreadPoolExecutor as Pool
 from functools import partial
 from typing import List
 
-import pandas as pd
-
 from cognite.client import _utils
 from cognite.client._api_client import APIClient, CogniteResponse
 
+pd = _utils.lazy_import("pandas")
+
 
 class DatapointsResponse(CogniteResponse):
     """Datapoints Response Object."""
@@ -95,8 +94,7 @@ class DatapointsClient(APIClient):
             include_outside_points=kwargs.get("include_outside_points", False),
         )
 
-        with Pool(steps) as p:
-            datapoints = p.map(partial_get_dps, args)
+        datapoints = self._executor.map(partial_get_dps, args, max_workers=steps)
 
         concat_dps = []
         [concat_dps.extend(el) for el in datapoints]
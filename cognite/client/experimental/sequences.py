@@ -2,10 +2,11 @@
 import json
 from typing import List
 
-import pandas as pd
-
+from cognite.client import _utils
 from cognite.client._api_client import APIClient
 
+pd = _utils.lazy_import("pandas")
+
 
 class Column:
     """Data transfer object for a column.
@@ -2,10 +2,11 @@
 from copy import deepcopy
 from typing import List
 
-import pandas as pd
-
+from cognite.client import _utils
 from cognite.client._api_client import APIClient, CogniteResponse
 
+pd = _utils.lazy_import("pandas")
+
 
 class TimeSeriesResponse(CogniteResponse):
     """Time series Response Object"""
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 import json
+import os
+import threading
 from typing import Dict, List
 
-import pandas as pd
-
+from cognite.client import _utils
 from cognite.client._api_client import APIClient, CogniteResponse
+from cognite.client.exceptions import APIError
+
+pd = _utils.lazy_import("pandas")
+_normalization = _utils.lazy_import("cognite.client._normalization")
 
 
 class AssetListResponse(CogniteResponse):
@@ -14,11 +19,25 @@ class AssetListResponse(CogniteResponse):
         super().__init__(internal_representation)
         self.counter = 0
 
-    def to_pandas(self):
-        """Returns data as a pandas dataframe"""
-        if len(self.to_json()) > 0:
-            return pd.DataFrame(self.internal_representation["data"]["items"])
-        return pd.DataFrame()
+    def to_pandas(self, expand_metadata=False, metadata_prefix="metadata.", categorical=False, separate_metadata=False):
+        """Returns data as a pandas dataframe with a row per asset.
+
+        Args:
+            expand_metadata (bool): Make a column of each metadata field rather than a column of metadata dicts.
+                                    Defaults to False.
+            metadata_prefix (str):  Prefix of the names of the metadata columns. Defaults to 'metadata.'.
+            categorical (bool):     Store string columns with few distinct values as categoricals, to save memory.
+                                    Defaults to False.
+            separate_metadata (bool):   Return the metadata fields as a separate sparse dataframe instead. Defaults to
+                                        False.
+
+        Returns:
+            Union[pandas.DataFrame, Tuple[pandas.DataFrame, pandas.DataFrame]]: The dataframe, or if separate_metadata
+            is True, the dataframe without metadata and a dataframe of the metadata fields.
+        """
+        return _normalization.items_to_pandas(
+            self.to_json(), expand_metadata, metadata_prefix, categorical, separate_metadata
+        )
 
     def __iter__(self):
         return self
@@ -69,7 +88,48 @@ class Asset:
         self.parentRefId = parent_ref_id
 
 
+def _group_hierarchy_by_depth(assets: List[Asset]) -> List[List[Asset]]:
+    """Groups assets by their depth in the hierarchy given by their ref ids, so that parents come before children."""
+    by_ref_id = {}
+    for asset in assets:
+        if asset.refId is None:
+            raise ValueError("All assets in a hierarchy must have a ref_id")
+        if asset.parentName is not None:
+            raise ValueError("Assets in a hierarchy must refer to their parent by parent_ref_id or parent_id")
+        if asset.refId in by_ref_id:
+            raise ValueError("Duplicate ref_id {}".format(asset.refId))
+        by_ref_id[asset.refId] = asset
+
+    depths = {}
+    for asset in assets:
+        # Walk up to the first ancestor of known depth, then number the assets on the way back down
+        path, on_path = [], set()
+        ref_id, depth = asset.refId, -1
+        while ref_id is not None:
+            if ref_id in depths:
+                depth = depths[ref_id]
+                break
+            if ref_id in on_path:
+                raise ValueError("The parents of asset {} form a cycle".format(asset.refId))
+            if ref_id not in by_ref_id:
+                raise ValueError("No asset has the ref_id {}, which is given as parent_ref_id".format(ref_id))
+            path.append(ref_id)
+            on_path.add(ref_id)
+            ref_id = by_ref_id[ref_id].parentRefId
+        for ref_id in reversed(path):
+            depth += 1
+            depths[ref_id] = depth
+
+    levels = [[] for _ in range(max(depths.values(), default=-1) + 1)]
+    for asset in assets:
+        levels[depths[asset.refId]].append(asset)
+    return levels
+
+
 class AssetsClient(APIClient):
+    # Max number of assets per request when creating or deleting assets
+    _BULK_LIMIT = 1000
+
     def __init__(self, **kwargs):
         super().__init__(version="0.5", **kwargs)
 
@@ -235,6 +295,165 @@ class AssetsClient(APIClient):
         body = {"items": asset_ids}
         self._post(url, body=body)
 
+    def post_assets_bulk(self, assets: List[Asset], chunk_size=None, max_workers=None) -> AssetListResponse:
+        """Inserts any number of assets, in chunks which are posted in parallel.
+
+        Assets can only refer to their parent by name or reference ID within the same request, so such assets must fit
+        in one chunk. Use post_asset_hierarchy() to post larger hierarchies.
+
+        Args:
+            assets (list[stable.assets.Asset]): List of asset data transfer objects.
+            chunk_size (int):       Max number of assets per request. Defaults to 1000, the limit of the API.
+            max_workers (int):      Max number of requests to send at once. Defaults to the number of workers of the
+                                    client.
+
+        Returns:
+            stable.assets.AssetListResponse: The posted assets, in the same order as the assets given.
+
+        Raises:
+            APIError: If any chunk fails, after the other chunks have been posted. extra["succeeded"] holds the posted
+            assets, extra["failed"] the assets of the failed chunks as dicts and extra["errors"] the error of each failed
+            chunk.
+
+        Examples:
+            Posting many assets below an existing asset::
+
+                from cognite.client.stable.assets import Asset
+
+                client = CogniteClient()
+
+                assets_to_post = [Asset("sensor_{}".format(i), parent_id=123) for i in range(100000)]
+                res = client.assets.post_assets_bulk(assets_to_post)
+        """
+        chunk_size = chunk_size or self._BULK_LIMIT
+        if len(assets) > chunk_size and any(asset.parentName or asset.parentRefId for asset in assets):
+            raise ValueError(
+                "Assets referring to their parent by name or reference ID must be posted in one request, use "
+                "post_asset_hierarchy() instead"
+            )
+        items = [asset.__dict__ for asset in assets]
+        posted = self._post_in_chunks("/assets", items, chunk_size, max_workers)
+        return AssetListResponse({"data": {"items": posted}})
+
+    def post_asset_hierarchy(
+        self, assets: List[Asset], state_path=None, chunk_size=None, max_workers=None
+    ) -> AssetListResponse:
+        """Inserts a hierarchy of any number of assets, one level at a time with each level posted in parallel chunks.
+
+        Assets refer to their parent by parent_ref_id, or by parent_id for parents which already exist. The assets are
+        grouped by depth, and before each level is posted the parent ref ids are replaced with the ids of the assets
+        created in the level above.
+
+        With a state path, the ids of the created assets are saved by ref id as soon as each chunk has been created, and
+        also when posting a level fails in any way. Calling this again with the same assets and state path only posts
+        the assets which were not created.
+
+        Args:
+            assets (list[stable.assets.Asset]): The assets of the hierarchy. All of them must have a ref_id.
+            state_path (str):       Path of a json file to save the ids of the created assets to.
+            chunk_size (int):       Max number of assets per request. Defaults to 1000, the limit of the API.
+            max_workers (int):      Max number of requests to send at once. Defaults to the number of workers of the
+                                    client.
+
+        Returns:
+            stable.assets.AssetListResponse: The assets created by this call, level by level.
+
+        Raises:
+            APIError: If any chunk of a level fails, after the other chunks of the level have been posted and the state
+            has been saved. The levels below are not posted.
+
+        Examples:
+            Posting a plant with many assets, resuming where it left off if it was interrupted::
+
+                from cognite.client.stable.assets import Asset
+
+                client = CogniteClient()
+
+                plant = [Asset("plant", ref_id="plant")]
+                plant += [Asset("area_{}".format(i), ref_id="a{}".format(i), parent_ref_id="plant") for i in range(100)]
+                plant += [
+                    Asset("pump_{}".format(j), ref_id="a{}p{}".format(i, j), parent_ref_id="a{}".format(i))
+                    for i in range(100)
+                    for j in range(1000)
+                ]
+                res = client.assets.post_asset_hierarchy(plant, state_path="plant_state.json")
+        """
+        levels = _group_hierarchy_by_depth(assets)
+        created_ids = {}
+        if state_path is not None and os.path.exists(state_path):
+            with open(state_path) as f:
+                created_ids = json.load(f)
+
+        created = []
+        state_lock = threading.Lock()
+
+        def record_chunk(chunk, posted_chunk):
+            # Saved per chunk, so that chunks created before e.g. a KeyboardInterrupt are not created again on a rerun
+            with state_lock:
+                for item, asset in zip(chunk, posted_chunk):
+                    created_ids[item["refId"]] = asset["id"]
+                self._save_hierarchy_state(state_path, created_ids)
+
+        try:
+            for level in levels:
+                items = []
+                for asset in level:
+                    if asset.refId in created_ids:
+                        continue
+                    item = dict(asset.__dict__)
+                    if asset.parentRefId is not None:
+                        item["parentId"] = created_ids[asset.parentRefId]
+                        item["parentRefId"] = None
+                    items.append(item)
+
+                try:
+                    posted = self._post_in_chunks(
+                        "/assets", items, chunk_size or self._BULK_LIMIT, max_workers, on_chunk_posted=record_chunk
+                    )
+                except APIError as e:
+                    created.extend(e.extra["succeeded"])
+                    raise
+                created.extend(posted)
+        finally:
+            # Also saved when a level fails in any way, so that a rerun does not create its assets again
+            with state_lock:
+                self._save_hierarchy_state(state_path, created_ids)
+
+        return AssetListResponse({"data": {"items": created}})
+
+    @staticmethod
+    def _save_hierarchy_state(state_path, created_ids):
+        if state_path is None:
+            return
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(created_ids, f)
+        os.replace(tmp_path, state_path)
+
+    def delete_assets_bulk(self, asset_ids: List[int], chunk_size=None, max_workers=None) -> None:
+        """Deletes any number of assets, in chunks which are deleted in parallel.
+
+        Args:
+            asset_ids (list[int]):  List of IDs of assets to delete.
+            chunk_size (int):       Max number of assets per request. Defaults to 1000, the limit of the API.
+            max_workers (int):      Max number of requests to send at once. Defaults to the number of workers of the
+                                    client.
+
+        Returns:
+            None
+
+        Raises:
+            APIError: If any chunk fails, after the other chunks have been deleted. extra["failed"] holds the IDs of the
+            failed chunks and extra["errors"] the error of each failed chunk.
+
+        Examples:
+            Deleting many assets::
+
+                client = CogniteClient()
+                client.assets.delete_assets_bulk(asset_ids)
+        """
+        self._post_in_chunks("/assets/delete", list(asset_ids), chunk_size or self._BULK_LIMIT, max_workers)
+
     def search_for_assets(
         self,
         name=None,
@@ -1,16 +1,27 @@
 # -*- coding: utf-8 -*-
 import io
+import json
+import os
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor as Pool
+from collections import OrderedDict, deque
+from concurrent.futures import Future, wait
 from functools import partial
-from typing import Dict, List
+from typing import Dict, Iterator, List, Union
 from urllib.parse import quote
 
-import pandas as pd
-
-from cognite._auxiliary._protobuf_descriptors import _api_timeseries_data_v2_pb2
 from cognite.client import _utils
 from cognite.client._api_client import APIClient, CogniteResponse
+from cognite.client.exceptions import APIError
+
+np = _utils.lazy_import("numpy")
+pd = _utils.lazy_import("pandas")
+_aggregation = _utils.lazy_import("cognite.client._aggregation")
+_alignment = _utils.lazy_import("cognite.client._alignment")
+_api_timeseries_data_v2_pb2 = _utils.lazy_import("cognite._auxiliary._protobuf_descriptors._api_timeseries_data_v2_pb2")
+
+# Statuses with which the API may reject a request body in a format it does not accept
+_PROTOBUF_UNSUPPORTED_STATUS_CODES = [400, 406, 415]
 
 
 class DatapointsResponse(CogniteResponse):
@@ -24,6 +35,43 @@ class DatapointsResponse(CogniteResponse):
         """Returns data as a pandas dataframe"""
         return pd.DataFrame(self.internal_representation["data"]["items"][0]["datapoints"])
 
+    def aggregate(self, aggregates, granularity, start=None, end=None):
+        """Computes aggregates of the raw datapoints in this response locally, with the same semantics as the API.
+
+        Args:
+            aggregates (list):      The list of aggregate functions to compute. Valid aggregate functions are: 'average/avg,
+                                    max, min, count, sum, interpolation/int, stepinterpolation/step, totalvariation/tv,
+                                    continuousvariance/cv, discretevariance/dv'.
+            granularity (str):      The granularity of the aggregate values, e.g. '1h' or '12hour'.
+            start (Union[str, int, datetime]):    Start of the query, which buckets are aligned to. Defaults to the first
+                                                  datapoint.
+            end (Union[str, int, datetime]):      End of the query. Defaults to after the last datapoint.
+
+        Returns:
+            pandas.DataFrame: The aggregates in the same format as returned by to_pandas() on a response with aggregates.
+
+        Examples:
+            Computing hourly averages and maxima from raw data which has already been fetched::
+
+                client = CogniteClient()
+                res = client.datapoints.get_datapoints(name="my_ts", start="1d-ago", include_outside_points=True)
+                hourly = res.aggregate(["avg", "max"], granularity="1h", start="1d-ago")
+        """
+        if start is not None or end is not None:
+            query_start, query_end = _utils.interval_to_ms(start, end)
+            start = query_start if start is not None else None
+            end = query_end if end is not None else None
+        datapoints = self.internal_representation["data"]["items"][0]["datapoints"]
+        aggregated = _aggregation.aggregate(
+            [dp["timestamp"] for dp in datapoints],
+            [dp["value"] for dp in datapoints],
+            aggregates,
+            granularity,
+            start=start,
+            end=end,
+        )
+        return pd.DataFrame(aggregated)
+
 
 class DatapointsQuery:
     """Data Query Object for Datapoints.
@@ -90,17 +138,100 @@ class Datapoint:
         value (string):     The data value, Can be string or numeric depending on the metric.
     """
 
+    __slots__ = ["timestamp", "value"]
+
     def __init__(self, timestamp, value):
         self.timestamp = timestamp if isinstance(timestamp, int) else _utils.datetime_to_ms(timestamp)
         self.value = value
 
+    def to_json(self):
+        return {"timestamp": self.timestamp, "value": self.value}
+
+
+def _timestamps_to_ms(timestamps) -> "np.ndarray":
+    dtype = getattr(timestamps, "dtype", None)
+    if dtype is not None and dtype.kind == "M":
+        index = pd.DatetimeIndex(timestamps)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        return index.values.astype("datetime64[ms]").astype(np.int64)
+    timestamps = np.asarray(timestamps)
+    if timestamps.dtype.kind == "O":
+        return np.fromiter(
+            (t if isinstance(t, int) else _utils.datetime_to_ms(t) for t in timestamps),
+            dtype=np.int64,
+            count=len(timestamps),
+        )
+    return timestamps.astype(np.int64)
+
+
+class DatapointBatch:
+    """Data transfer object for many datapoints of a timeseries, stored in arrays rather than as Datapoint objects.
+
+    Accepted wherever a list of Datapoint objects is, and much cheaper to create and serialize for large amounts of data.
+
+    Args:
+        timestamps (array-like):    The timestamps in milliseconds since the epoch, or as datetimes. Accepts lists,
+                                    numpy arrays of integers or datetime64, and pandas Series and DatetimeIndexes.
+                                    Timezone-naive datetimes are taken to be in UTC.
+        values (array-like):        The values, either all numeric or all strings.
+    """
+
+    __slots__ = ["timestamps", "values"]
+
+    def __init__(self, timestamps, values):
+        self.timestamps = _timestamps_to_ms(timestamps)
+        values = np.asarray(values)
+        if values.dtype.kind in "biuf":
+            self.values = values.astype(np.float64)
+        elif values.dtype.kind in "US" or any(isinstance(value, str) for value in values.flat):
+            self.values = values.astype(str).astype(object)
+        else:
+            try:
+                self.values = values.astype(np.float64)
+            except (TypeError, ValueError):
+                self.values = values
+        if self.timestamps.shape != self.values.shape or self.timestamps.ndim != 1:
+            raise ValueError("timestamps and values must be one-dimensional and of the same length")
+
+    @classmethod
+    def from_pandas(cls, series) -> "DatapointBatch":
+        """Returns a batch of the values of a pandas Series, indexed by datetimes or by timestamps in milliseconds."""
+        return cls(series.index, series.values)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            value = self.values[item]
+            return Datapoint(int(self.timestamps[item]), value.item() if isinstance(value, np.generic) else value)
+        batch = DatapointBatch.__new__(DatapointBatch)
+        batch.timestamps = self.timestamps[item]
+        batch.values = self.values[item]
+        return batch
+
+    def __iter__(self):
+        return (Datapoint(t, v) for t, v in zip(self.timestamps.tolist(), self.values.tolist()))
+
+    def to_json(self):
+        return [{"timestamp": t, "value": v} for t, v in zip(self.timestamps.tolist(), self.values.tolist())]
+
+
+def _to_datapoint_batch(datapoints) -> DatapointBatch:
+    if isinstance(datapoints, DatapointBatch):
+        return datapoints
+    timestamps = np.fromiter((dp.timestamp for dp in datapoints), dtype=np.int64, count=len(datapoints))
+    return DatapointBatch(timestamps, [dp.value for dp in datapoints])
+
 
 class TimeseriesWithDatapoints:
     """Data transfer object for a timeseries with datapoints.
 
     Args:
         name (str):       Unique ID of time series.
-        datapoints (List[stable.datapoints.Datapoint]): List of datapoints in the timeseries.
+        datapoints (Union[List[stable.datapoints.Datapoint], stable.datapoints.DatapointBatch]): The datapoints in the
+                    timeseries.
     """
 
     def __init__(self, name, datapoints):
@@ -124,9 +255,558 @@ class LatestDatapointResponse(CogniteResponse):
         return self.to_pandas().values[0]
 
 
+class LatestDatapointsResponse(CogniteResponse):
+    """Latest Datapoints Response Object for several time series.
+
+    The data is stored column-wise as lists of names, timestamps and values. Timestamp and value are None for time
+    series without datapoints.
+    """
+
+    def to_json(self):
+        """Returns data as a json object"""
+        return self.internal_representation["data"]
+
+    def to_pandas(self):
+        """Returns data as a pandas dataframe"""
+        return pd.DataFrame(self.internal_representation["data"], columns=["name", "timestamp", "value"])
+
+
+class WatermarkStore:
+    """Durable store of the timestamp of the latest datapoint synced for each time series.
+
+    Watermarks are kept in memory and written to a json file on save. Without a path the store only lives in memory.
+
+    Args:
+        path (str):     Path of the json file to keep the watermarks in. Existing watermarks are loaded from it.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._watermarks = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self._watermarks = json.load(f)
+
+    def get(self, name):
+        """Returns the watermark of a time series, or None if it has not been synced."""
+        return self._watermarks.get(name)
+
+    def set(self, name, timestamp):
+        """Sets the watermark of a time series. The change is not persisted until save() is called."""
+        with self._lock:
+            self._watermarks[name] = timestamp
+
+    def save(self):
+        """Atomically writes the watermarks to disk."""
+        if self.path is None:
+            return
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._watermarks, f)
+            os.replace(tmp_path, self.path)
+
+
+class DatapointsSubscription:
+    """Watches a set of time series for new datapoints with a single polling loop.
+
+    Each poll fetches the datapoints which arrived since the last one in batched multi time series requests. The poll
+    interval halves when new data arrives and grows by half when it does not, so it settles around the rate at which
+    data is produced. Use DatapointsClient.subscribe() to create one.
+
+    Args:
+        client (stable.datapoints.DatapointsClient):  The client to poll with.
+        names (List[str]):      Names of the time series to watch.
+        start (Union[str, int, datetime]):    Where to start watching from. Defaults to now.
+        min_interval (float):   Shortest time in seconds between polls.
+        max_interval (float):   Longest time in seconds between polls.
+        batch_size (int):       Max number of time series to query per request.
+    """
+
+    def __init__(self, client, names, start=None, min_interval=1, max_interval=60, batch_size=100):
+        self.names = list(names)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.batch_size = batch_size
+        self._client = client
+        self._start = _utils.interval_to_ms("now" if start is None else start, None)[0]
+        self._watermarks = WatermarkStore()
+        self._closed = threading.Event()
+
+    def poll(self):
+        """Fetches the datapoints which arrived since the last poll and adapts the poll interval.
+
+        Returns:
+            OrderedDict: Lists of new datapoint dicts by time series name.
+        """
+        new_datapoints = OrderedDict()
+
+        def sink(batch):
+            for name, datapoints in batch.items():
+                new_datapoints.setdefault(name, []).extend(datapoints)
+
+        self._client.sync_datapoints(self.names, sink, self._watermarks, start=self._start, batch_size=self.batch_size)
+        if new_datapoints:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        return new_datapoints
+
+    def run(self, callback):
+        """Polls until the subscription is closed, calling the callback with the result of each poll with new data."""
+        while not self._closed.is_set():
+            new_datapoints = self.poll()
+            if new_datapoints:
+                callback(new_datapoints)
+            self._closed.wait(self.interval)
+
+    def close(self):
+        """Stops the subscription. May be called from another thread."""
+        self._closed.set()
+
+    def __iter__(self):
+        """Yields (name, datapoint dict) tuples for all watched time series until the subscription is closed."""
+        while not self._closed.is_set():
+            for name, datapoints in self.poll().items():
+                for datapoint in datapoints:
+                    yield name, datapoint
+            self._closed.wait(self.interval)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class DatapointsRollupCache:
+    """Cache of aggregates which answers requests for coarser granularities locally when possible.
+
+    Aggregates fetched through the cache are stored per time series and granularity. Requests are answered from stored
+    buckets of the same granularity, or for count, sum, min, max, average and discrete variance by rolling up stored
+    buckets of the same or a finer granularity which the requested one is a multiple of. Only the remaining buckets are
+    fetched, along with the aggregates needed to roll them up later. Buckets which are only partly inside the requested
+    interval are always fetched. Stored buckets are never refreshed, so call invalidate() when the data may have
+    changed.
+
+    Args:
+        client (stable.datapoints.DatapointsClient):  The client to fetch aggregates with.
+
+    Examples:
+        Zooming out from minutes to hours and days without downloading the data again::
+
+            client = CogniteClient()
+            cache = DatapointsRollupCache(client.datapoints)
+            minutes = cache.get_datapoints("my_ts", start="7d-ago", end=end, aggregates=["avg"], granularity="1m")
+            days = cache.get_datapoints("my_ts", start="7d-ago", end=end, aggregates=["avg", "max"], granularity="1d")
+    """
+
+    _BASE_AGGREGATES = ["count", "sum", "min", "max", "discretevariance"]
+
+    def __init__(self, client):
+        self._client = client
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, name=None):
+        """Removes the stored aggregates of a time series, or of all time series if no name is given."""
+        with self._lock:
+            for key in list(self._entries):
+                if name is None or key[0] == name:
+                    del self._entries[key]
+
+    def get_datapoints(self, name, start, end=None, aggregates=None, granularity=None) -> DatapointsResponse:
+        """Returns aggregates of a time series, like DatapointsClient.get_datapoints(), using the cache where possible.
+
+        Requests for raw data are passed on to the client without caching.
+
+        Args:
+            name (str):             The name of the timeseries to retrieve data for.
+            start (Union[str, int, datetime]):    Get datapoints after this time.
+            end (Union[str, int, datetime]):      Get datapoints up to this time.
+            aggregates (list):      The list of aggregate functions you wish to apply to the data.
+            granularity (str):      The granularity of the aggregate values.
+
+        Returns:
+            stable.datapoints.DatapointsResponse: A data object containing the requested data.
+        """
+        if not aggregates or not granularity:
+            return self._client.get_datapoints(name, start, end, aggregates, granularity)
+        start, end = _utils.interval_to_ms(start, end)
+        names = list(OrderedDict.fromkeys(_utils.get_aggregate_func_return_name(agg) for agg in aggregates))
+        granularity_ms = _utils.granularity_to_ms(granularity)
+        origin = start - start % _aggregation._granularity_unit_to_ms(granularity)
+        bucket_starts = np.arange(origin, end, granularity_ms, dtype=np.int64)
+        complete = (bucket_starts >= start) & (bucket_starts + granularity_ms <= end)
+
+        available = complete.copy()
+        cached_columns = []
+        with self._lock:
+            for agg in names:
+                column_available = np.zeros(len(bucket_starts), dtype=bool)
+                column_parts = []
+                for fine_ms, entry, inputs in self._get_sources(name, agg, origin, granularity_ms):
+                    mask = complete & ~column_available & self._is_covered(entry, inputs, bucket_starts, granularity_ms)
+                    if not mask.any():
+                        continue
+                    rows = self._select_buckets(entry["frame"], mask, origin, granularity_ms)
+                    if inputs == [agg] and fine_ms == granularity_ms:
+                        column_parts.append(rows[["timestamp", agg]])
+                    else:
+                        fine = {column: rows[column].values for column in ["timestamp"] + inputs}
+                        column_parts.append(pd.DataFrame(_aggregation.rollup(fine, [agg], granularity, origin)))
+                    column_available |= mask
+                available &= column_available
+                column_parts.append(pd.DataFrame(columns=["timestamp", agg]))
+                cached_columns.append(pd.concat(column_parts, ignore_index=True))
+
+        parts = []
+        if available.any():
+            cached = None
+            for column in cached_columns:
+                column = self._select_buckets(column, available, origin, granularity_ms)
+                cached = column if cached is None else cached.merge(column, on="timestamp", how="outer")
+            parts.append(cached)
+
+        missing = np.flatnonzero(~available)
+        if len(missing):
+            runs = np.split(missing, np.flatnonzero(np.diff(missing) > 1) + 1)
+            fetch_names = names + [agg for agg in self._BASE_AGGREGATES if agg not in names]
+            for run in runs:
+                run_start = max(start, int(bucket_starts[run[0]]))
+                run_end = min(end, int(bucket_starts[run[-1]]) + granularity_ms)
+                df = self._fetch(name, run_start, run_end, fetch_names, granularity)
+                parts.append(df[["timestamp"] + names])
+
+        df = pd.concat(parts, ignore_index=True).sort_values("timestamp") if parts else pd.DataFrame()
+        df = df.reindex(columns=["timestamp"] + names)
+        datapoints = [
+            {column: value for column, value in zip(df.columns, row)}
+            for row in df.astype(object).itertuples(index=False)
+        ]
+        return DatapointsResponse({"data": {"items": [{"name": name, "datapoints": datapoints}]}})
+
+    def _get_sources(self, name, aggregate, origin, granularity_ms):
+        """Yields (granularity, entry, aggregates needed) for each stored entry which an aggregate can be taken from.
+
+        Stored values of the aggregate at the requested granularity come first, followed by entries it can be rolled up
+        from, coarsest first.
+        """
+        entry = self._entries.get((name, granularity_ms, origin % granularity_ms))
+        if entry is not None:
+            yield granularity_ms, entry, [aggregate]
+        if aggregate not in _aggregation.ROLLUP_INPUTS:
+            return
+        for (entry_name, fine_ms, phase), entry in sorted(self._entries.items(), key=lambda item: -item[0][1]):
+            if entry_name == name and granularity_ms % fine_ms == 0 and origin % fine_ms == phase:
+                yield fine_ms, entry, _aggregation.ROLLUP_INPUTS[aggregate]
+
+    def _fetch(self, name, start, end, aggregates, granularity):
+        df = self._client.get_datapoints(name, start, end, aggregates=aggregates, granularity=granularity).to_pandas()
+        df = df.reindex(columns=["timestamp"] + aggregates)
+        granularity_ms = _utils.granularity_to_ms(granularity)
+        origin = start - start % _aggregation._granularity_unit_to_ms(granularity)
+        key = (name, granularity_ms, origin % granularity_ms)
+        with self._lock:
+            entry = self._entries.setdefault(key, {"frame": pd.DataFrame(columns=["timestamp"]), "coverage": {}})
+            frame = pd.concat([entry["frame"], df], ignore_index=True, sort=False)
+            frame = frame.drop_duplicates("timestamp", keep="last").sort_values("timestamp").reset_index(drop=True)
+            entry["frame"] = frame
+            for column in aggregates:
+                entry["coverage"][column] = self._add_interval(entry["coverage"].get(column, []), start, end)
+        return df
+
+    @staticmethod
+    def _add_interval(intervals, start, end):
+        merged = []
+        for interval_start, interval_end in sorted(intervals + [(start, end)]):
+            if merged and interval_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], interval_end))
+            else:
+                merged.append((interval_start, interval_end))
+        return merged
+
+    @staticmethod
+    def _is_covered(entry, columns, bucket_starts, granularity_ms):
+        """Returns a mask of the buckets which are covered by stored data for all of the given columns."""
+        covered = np.ones(len(bucket_starts), dtype=bool)
+        for column in columns:
+            column_covered = np.zeros(len(bucket_starts), dtype=bool)
+            for start, end in entry["coverage"].get(column, []):
+                column_covered |= (bucket_starts >= start) & (bucket_starts + granularity_ms <= end)
+            covered &= column_covered
+        return covered
+
+    @staticmethod
+    def _select_buckets(frame, mask, origin, granularity_ms):
+        """Returns the rows of a stored frame which fall within the buckets selected by the mask."""
+        timestamps = frame["timestamp"].values.astype(np.int64)
+        index = (timestamps - origin) // granularity_ms
+        in_range = (index >= 0) & (index < len(mask))
+        selected = np.zeros(len(timestamps), dtype=bool)
+        selected[in_range] = mask[index[in_range]]
+        return frame[selected]
+
+
+def _concatenate_batches(batches: List[DatapointBatch]) -> DatapointBatch:
+    if len(batches) == 1:
+        return batches[0]
+    batch = DatapointBatch.__new__(DatapointBatch)
+    batch.timestamps = np.concatenate([b.timestamps for b in batches])
+    batch.values = np.concatenate([b.values for b in batches])
+    return batch
+
+
+class DatapointsWriter:
+    """Buffers datapoints written to many time series and inserts them in batched multi time series requests.
+
+    Datapoints are buffered per time series, and a background thread flushes the buffers once max_buffer_size
+    datapoints are buffered in total, or the oldest of them was written max_age seconds ago. Each flush packs the
+    buffers of all time series into as few requests as possible, like post_multi_time_series_datapoints(). If a flush
+    fails, the datapoints stay buffered and are retried after max_age seconds. While max_queue_size datapoints are
+    buffered, further datapoints are dropped and counted. Use DatapointsClient.writer() to create one.
+
+    With a spool path, each write is appended to the spool file before it is buffered, and the file is cleared once its
+    datapoints have been inserted. A writer with the same spool path inserts the datapoints which were not inserted when
+    the previous one stopped. Datapoints which were being inserted when it stopped are inserted again, which only
+    overwrites them with the same values. Recovered datapoints count towards max_queue_size like written ones.
+
+    Args:
+        client (stable.datapoints.DatapointsClient):  The client to insert with.
+        spool_path (str):       Path of the file to spool datapoints to. Defaults to keeping them only in memory.
+        max_buffer_size (int):  Number of buffered datapoints which triggers a flush.
+        max_age (float):        Max number of seconds a datapoint is buffered before a flush is triggered.
+        max_queue_size (int):   Max number of datapoints to buffer.
+        use_gzip (bool):        Whether or not to gzip the requests.
+        protobuf (bool):        Upload the data using the binary protobuf format.
+    """
+
+    def __init__(
+        self,
+        client,
+        spool_path=None,
+        max_buffer_size=100000,
+        max_age=5,
+        max_queue_size=1000000,
+        use_gzip=True,
+        protobuf=False,
+    ):
+        self.spool_path = spool_path
+        self.max_buffer_size = max_buffer_size
+        self.max_age = max_age
+        self.max_queue_size = max_queue_size
+        self.use_gzip = use_gzip
+        self.protobuf = protobuf
+        self._client = client
+        self._buffers = OrderedDict()
+        self._num_buffered = 0
+        self._oldest = None
+        self._num_written = 0
+        self._num_inserted = 0
+        self._num_dropped = 0
+        self._num_flushes = 0
+        self._num_failed_flushes = 0
+        self._last_flush_latency = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._spool = None
+        if spool_path is not None:
+            self._recover_spool()
+        self._thread = threading.Thread(target=self._run, name="cognite-sdk-datapoints-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def _flushing_path(self):
+        return self.spool_path + ".flushing"
+
+    def _recover_spool(self):
+        if os.path.exists(self._flushing_path):
+            self._merge_spool()
+        ends_with_newline = True
+        if os.path.exists(self.spool_path):
+            with open(self.spool_path) as f:
+                for line in f:
+                    ends_with_newline = line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A write which was cut short when the process stopped
+                        continue
+                    batch = self._fit_to_queue(DatapointBatch(record["timestamps"], record["values"]))
+                    if len(batch):
+                        self._buffer(record["name"], batch)
+        self._spool = open(self.spool_path, "a")
+        if not ends_with_newline:
+            self._spool.write("\n")
+
+    def _merge_spool(self):
+        # Puts the datapoints of an unfinished flush back in the spool, ahead of those written since it started
+        if os.path.exists(self.spool_path):
+            with open(self.spool_path) as src, open(self._flushing_path, "a") as dst:
+                dst.write(src.read())
+        os.replace(self._flushing_path, self.spool_path)
+
+    def _fit_to_queue(self, batch):
+        # Cuts the batch to the room left in the queue, counting the rest as dropped
+        room = max(0, self.max_queue_size - self._num_buffered)
+        if len(batch) > room:
+            self._num_dropped += len(batch) - room
+            batch = batch[:room]
+        return batch
+
+    def _buffer(self, name, batch):
+        self._buffers.setdefault(name, []).append(batch)
+        self._num_buffered += len(batch)
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+            self._wakeup.set()
+
+    def write(self, name, datapoints: Union[List[Datapoint], DatapointBatch]) -> None:
+        """Buffers datapoints to insert into a time series.
+
+        Args:
+            name (str):     Name of the time series to insert to.
+            datapoints (Union[List[stable.datapoints.Datapoint], stable.datapoints.DatapointBatch]): The datapoints to
+                            insert.
+        """
+        batch = _to_datapoint_batch(datapoints)
+        with self._lock:
+            if self._stopped.is_set():
+                raise RuntimeError("Cannot write to a closed writer")
+            buffered = self._buffers.get(name)
+            if buffered and len(batch) and buffered[0].values.dtype != batch.values.dtype:
+                raise ValueError("Datapoints of time series {} must be either all numeric or all strings".format(name))
+            self._num_written += len(batch)
+            batch = self._fit_to_queue(batch)
+            if len(batch) == 0:
+                return
+            if self._spool is not None:
+                record = {"name": name, "timestamps": batch.timestamps.tolist(), "values": batch.values.tolist()}
+                self._spool.write(json.dumps(record) + "\n")
+                self._spool.flush()
+            self._buffer(name, batch)
+            if self._num_buffered >= self.max_buffer_size:
+                self._wakeup.set()
+
+    def flush(self) -> None:
+        """Inserts all buffered datapoints.
+
+        If the insert fails, the datapoints stay buffered and the error is raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._buffers:
+                    return
+                buffers, self._buffers = self._buffers, OrderedDict()
+                num_of_datapoints, self._num_buffered = self._num_buffered, 0
+                oldest, self._oldest = self._oldest, None
+                if self._spool is not None:
+                    self._spool.close()
+                    os.replace(self.spool_path, self._flushing_path)
+                    self._spool = open(self.spool_path, "a")
+            start = time.monotonic()
+            timeseries_with_datapoints = [
+                TimeseriesWithDatapoints(name, _concatenate_batches(batches)) for name, batches in buffers.items()
+            ]
+            try:
+                self._client.post_multi_time_series_datapoints(
+                    timeseries_with_datapoints, use_gzip=self.use_gzip, protobuf=self.protobuf
+                )
+            except BaseException:
+                with self._lock:
+                    self._num_failed_flushes += 1
+                    for name, batches in self._buffers.items():
+                        buffers.setdefault(name, []).extend(batches)
+                    self._buffers = buffers
+                    self._num_buffered += num_of_datapoints
+                    self._oldest = oldest
+                    if self._spool is not None:
+                        self._spool.close()
+                        self._merge_spool()
+                        self._spool = open(self.spool_path, "a")
+                raise
+            if self._spool is not None:
+                os.remove(self._flushing_path)
+            with self._lock:
+                self._num_inserted += num_of_datapoints
+                self._num_flushes += 1
+                self._last_flush_latency = time.monotonic() - start
+
+    def _run(self):
+        while not self._stopped.is_set():
+            with self._lock:
+                if self._num_buffered >= self.max_buffer_size:
+                    due = 0
+                elif self._oldest is None:
+                    due = None
+                else:
+                    due = self._oldest + self.max_age - time.monotonic()
+            if due is None or due > 0:
+                self._wakeup.wait(due)
+                self._wakeup.clear()
+                continue
+            try:
+                self.flush()
+            except Exception:
+                # The failure is counted and the datapoints stay buffered until the next attempt
+                self._stopped.wait(self.max_age)
+
+    def metrics(self):
+        """Returns the state and counters of the writer.
+
+        Returns:
+            Dict: The number of datapoints buffered and of time series with datapoints buffered, seconds since the
+            oldest buffered datapoint was written, number of datapoints written, inserted and dropped, number of
+            flushes and failed flushes, and seconds taken by the last flush.
+        """
+        with self._lock:
+            return {
+                "buffered": self._num_buffered,
+                "buffered_time_series": len(self._buffers),
+                "oldest_age": None if self._oldest is None else time.monotonic() - self._oldest,
+                "written": self._num_written,
+                "inserted": self._num_inserted,
+                "dropped": self._num_dropped,
+                "flushes": self._num_flushes,
+                "failed_flushes": self._num_failed_flushes,
+                "last_flush_latency": self._last_flush_latency,
+            }
+
+    def close(self):
+        """Stops the background thread and inserts the remaining datapoints.
+
+        If the last flush fails the error is raised, and datapoints left in the spool are inserted by the next writer
+        with the same spool path.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                if self._spool is not None:
+                    self._spool.close()
+                    self._spool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
 class DatapointsClient(APIClient):
     def __init__(self, **kwargs):
         super().__init__(version="0.5", **kwargs)
+        self._latest_in_flight = {}
+        self._latest_lock = threading.Lock()
+        # Whether the API accepts protobuf insert bodies, or None until known
+        self._protobuf_inserts_supported = None
 
     def get_datapoints(self, name, start, end=None, aggregates=None, granularity=None, **kwargs) -> DatapointsResponse:
         """Returns a DatapointsObject containing a list of datapoints for the given query.
@@ -210,8 +890,7 @@ class DatapointsClient(APIClient):
             include_outside_points=kwargs.get("include_outside_points", False),
         )
 
-        with Pool(steps) as p:
-            datapoints = p.map(partial_get_dps, args)
+        datapoints = self._executor.map(partial_get_dps, args, max_workers=steps)
 
         concat_dps = []
         [concat_dps.extend(el) for el in datapoints]
@@ -386,6 +1065,9 @@ class DatapointsClient(APIClient):
         Keyword Args:
             use_gzip (bool): Whether or not to gzip the request. Defaults to True.
 
+            protobuf (bool): Upload the data using the binary protobuf format. Falls back to JSON if the API does not
+                             accept it. Defaults to False.
+
         Returns:
             None
 
@@ -429,19 +1111,24 @@ class DatapointsClient(APIClient):
         for bin in timeseries_to_upload_binned:
             body = {
                 "items": [
-                    {"name": ts_with_data.name, "datapoints": [dp.__dict__ for dp in ts_with_data.datapoints]}
+                    {"name": ts_with_data.name, "datapoints": _to_datapoint_batch(ts_with_data.datapoints)}
                     for ts_with_data in bin
                 ]
             }
-            self._post(url, body=body, use_gzip=use_gzip)
+            self._post_datapoints_body(url, body, use_gzip=use_gzip, protobuf=kwargs.get("protobuf", False))
 
-    def post_datapoints(self, name, datapoints: List[Datapoint]) -> None:
+    def post_datapoints(self, name, datapoints: Union[List[Datapoint], DatapointBatch], **kwargs) -> None:
         """Insert a list of datapoints.
 
         Args:
             name (str):       Name of timeseries to insert to.
 
-            datapoints (List[stable.datapoints.Datapoint]): List of datapoint data transfer objects to insert.
+            datapoints (Union[List[stable.datapoints.Datapoint], stable.datapoints.DatapointBatch]): The datapoints to
+                        insert.
+
+        Keyword Args:
+            protobuf (bool): Upload the data using the binary protobuf format. Falls back to JSON if the API does not
+                             accept it. Defaults to False.
 
         Returns:
             None
@@ -456,22 +1143,56 @@ class DatapointsClient(APIClient):
                 start = 1514761200000
                 my_dummy_data = [Datapoint(timestamp=start+off, value=off) for off in range(100)]
                 client.datapoints.post_datapoints(ts_name, my_dummy_data)
+
+            Posting a pandas Series indexed by time without creating a Datapoint object for each value::
+
+                from cognite.client.stable.datapoints import DatapointBatch
+
+                client = CogniteClient()
+
+                series = pd.Series([1.0, 2.0, 3.0], index=pd.date_range("2018-01-01", periods=3, freq="1min"))
+                client.datapoints.post_datapoints(ts_name, DatapointBatch.from_pandas(series))
         """
         url = "/timeseries/data/{}".format(quote(name, safe=""))
 
         ul_dps_limit = 100000
+        datapoints = _to_datapoint_batch(datapoints)
         i = 0
         while i < len(datapoints):
-            body = {"items": [dp.__dict__ for dp in datapoints[i : i + ul_dps_limit]]}
-            self._post(url, body=body)
+            body = {"items": datapoints[i : i + ul_dps_limit]}
+            self._post_datapoints_body(url, body, use_gzip=True, protobuf=kwargs.get("protobuf", False))
             i += ul_dps_limit
 
+    def _post_datapoints_body(self, url, body, use_gzip, protobuf):
+        """Posts a datapoint insert body, as protobuf if requested and not known to be unsupported by the API.
+
+        If the API rejects the first protobuf body, it is sent again as JSON, and if that succeeds, later bodies are
+        sent as JSON right away.
+        """
+        if not protobuf or self._protobuf_inserts_supported is False:
+            self._post(url, body=body, use_gzip=use_gzip)
+            return
+        try:
+            self._post(url, body=body, use_gzip=use_gzip, protobuf=True)
+            self._protobuf_inserts_supported = True
+            return
+        except APIError as e:
+            if self._protobuf_inserts_supported or e.code not in _PROTOBUF_UNSUPPORTED_STATUS_CODES:
+                raise
+        self._post(url, body=body, use_gzip=use_gzip)
+        self._protobuf_inserts_supported = False
+
     def get_latest(self, name, before=None) -> LatestDatapointResponse:
         """Returns a LatestDatapointObject containing the latest datapoint for the given timeseries.
 
+        Concurrent calls from different threads for the same name and before share a single request. Only calls made
+        while that request is in flight share it; calls are not held back to be batched with later ones.
+
         Args:
             name (str):       The name of the timeseries to retrieve data for.
 
+            before (int):     Get the latest datapoint before this time in ms since epoch.
+
         Returns:
             stable.datapoints.LatestDatapointsResponse: A data object containing the requested data with several getter methods with different
             output formats.
@@ -484,10 +1205,72 @@ class DatapointsClient(APIClient):
                 client.datapoints.get_latest(name="my_ts", before=x)
 
         """
-        url = "/timeseries/latest/{}".format(quote(name, safe=""))
-        params = {"before": before}
-        res = self._get(url, params=params)
-        return LatestDatapointResponse(res.json())
+        return LatestDatapointResponse(self._get_latest_json(name, before))
+
+    def _get_latest_json(self, name, before=None):
+        """Fetches the latest datapoint, sharing the request with concurrent lookups of the same name and before.
+
+        A lookup only joins a request which is already in flight. Lookups are not delayed to collect others arriving
+        shortly after, and lookups of different names or befores are not batched into one request.
+        """
+        key = (name, before)
+        with self._latest_lock:
+            future = self._latest_in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._latest_in_flight[key] = Future()
+        if is_owner:
+            try:
+                url = "/timeseries/latest/{}".format(quote(name, safe=""))
+                future.set_result(self._get(url, params={"before": before}).json())
+            except BaseException as e:
+                # Waiters must be released however the request fails, also on e.g. KeyboardInterrupt
+                future.set_exception(e)
+                raise
+            finally:
+                with self._latest_lock:
+                    del self._latest_in_flight[key]
+        return future.result()
+
+    def get_multiple_latest(self, names, before=None, **kwargs) -> LatestDatapointsResponse:
+        """Returns the latest datapoint of each of several time series.
+
+        The lookups are run concurrently.
+
+        Args:
+            names (List[str]):      The names of the time series to retrieve data for.
+
+            before (Union[int, Dict[str, int]]):  Get the latest datapoints before this time. Either one timestamp for all
+                                                  time series or a dict of timestamps by time series name.
+
+        Keyword Arguments:
+            workers (int):    Number of lookups to run in parallel. Defaults to 10.
+
+        Returns:
+            stable.datapoints.LatestDatapointsResponse: A data object containing the requested data with several getter
+            methods with different output formats.
+
+        Examples:
+            Get the current value of a set of sensors::
+
+                client = CogniteClient()
+                res = client.datapoints.get_multiple_latest(names=["sensor_1", "sensor_2"])
+                print(res.to_pandas())
+        """
+        names = list(names)
+        befores = [before.get(name) if isinstance(before, dict) else before for name in names]
+        data = {"name": names, "timestamp": [], "value": []}
+        if not names:
+            return LatestDatapointsResponse({"data": data})
+
+        num_of_workers = min(kwargs.get("workers", self._num_of_workers), len(names))
+        results = self._executor.map(self._get_latest_json, names, befores, max_workers=num_of_workers)
+
+        for res in results:
+            items = res["data"]["items"]
+            data["timestamp"].append(items[0]["timestamp"] if items else None)
+            data["value"].append(items[0]["value"] if items else None)
+        return LatestDatapointsResponse({"data": data})
 
     def get_multi_time_series_datapoints(
         self, datapoints_queries, start, end=None, aggregates=None, granularity=None, **kwargs
@@ -572,7 +1355,128 @@ class DatapointsClient(APIClient):
                 results[i]["data"]["items"][0]["datapoints"].extend(ts["datapoints"])
         return DatapointsResponseIterator([DatapointsResponse(result) for result in results])
 
-    def get_datapoints_frame(self, time_series, aggregates, granularity, start, end=None, **kwargs) -> pd.DataFrame:
+    def sync_datapoints(
+        self, names, sink, watermarks, start="2w-ago", end=None, batch_size=100, max_requests=None, **kwargs
+    ) -> int:
+        """Fetches the datapoints which are newer than the watermark of each time series and hands them to a sink.
+
+        Time series are queried in batches through /timeseries/dataquery. A series which fills its share of the response
+        stays in the batch with its start moved past the last datapoint, while the other slots are refilled with series
+        which have not been queried yet. After the sink has accepted a batch, the watermarks of its series are advanced.
+        They are saved once when the sync ends, also if it fails, so a sync which is interrupted or stopped by
+        max_requests resumes where it left off on the next call. If the sink or a request fails, no further batches are
+        handed to the sink, and the watermarks are saved once all workers have stopped.
+
+        Args:
+            names (List[str]):  Names of the time series to sync.
+
+            sink (Callable):    Called with an OrderedDict mapping time series names to lists of new datapoint dicts.
+                                Calls are serialized, so the sink does not need to be thread safe.
+
+            watermarks (stable.datapoints.WatermarkStore):    Store of the latest synced timestamp of each time series.
+
+            start (Union[str, int, datetime]):    Where to start syncing time series which have no watermark. Same format as
+                                                  for get_datapoints(). Defaults to '2w-ago'.
+
+            end (Union[str, int, datetime]):      Sync datapoints up to this time. Defaults to now.
+
+            batch_size (int):   Max number of time series to query per request. Defaults to 100.
+
+            max_requests (int): Max number of requests to make in this call. Defaults to no limit.
+
+        Keyword Arguments:
+            workers (int):    Number of requests to run in parallel. Defaults to 10.
+
+        Returns:
+            int: The number of datapoints handed to the sink.
+
+        Examples:
+            Mirroring a set of time series into a local store every five minutes::
+
+                client = CogniteClient()
+                watermarks = WatermarkStore("watermarks.json")
+                while True:
+                    client.datapoints.sync_datapoints(names, sink=my_store.write, watermarks=watermarks)
+                    time.sleep(300)
+        """
+        start, end = _utils.interval_to_ms(start, end)
+        pending = deque()
+        for name in OrderedDict.fromkeys(names):
+            watermark = watermarks.get(name)
+            series_start = start if watermark is None else watermark + 1
+            if series_start < end:
+                pending.append((name, series_start))
+
+        state = {"requests": 0, "datapoints": 0}
+        lock = threading.Lock()
+        stopped = threading.Event()
+
+        def sync_worker():
+            batch = []
+            try:
+                while True:
+                    with lock:
+                        while len(batch) < batch_size and pending:
+                            batch.append(pending.popleft())
+                        if stopped.is_set() or not batch:
+                            return
+                        if max_requests is not None and state["requests"] >= max_requests:
+                            return
+                        state["requests"] += 1
+                    batch = self._sync_datapoints_batch(batch, end, sink, watermarks, lock, state, stopped)
+            except BaseException:
+                stopped.set()
+                raise
+
+        num_of_workers = min(kwargs.get("workers", self._num_of_workers), max(1, -(-len(pending) // batch_size)))
+        futures = [self._executor.submit(sync_worker) for _ in range(num_of_workers)]
+        try:
+            for future in futures:
+                future.result()
+        finally:
+            # The other workers stop before their next sink call, and are waited for so the saved watermarks are final
+            stopped.set()
+            wait(futures)
+            watermarks.save()
+        return state["datapoints"]
+
+    def _sync_datapoints_batch(self, batch, end, sink, watermarks, lock, state, stopped):
+        """Queries one batch of (name, start) pairs and returns the pairs which have more data to fetch."""
+        limit = self._LIMIT // len(batch)
+        body = {
+            "items": [{"name": name, "start": start, "limit": limit} for name, start in batch],
+            "start": min(start for _, start in batch),
+            "end": end,
+        }
+        res = self._post("/timeseries/dataquery", body=body).json()["data"]["items"]
+
+        new_datapoints = OrderedDict()
+        incomplete = []
+        for (name, _), ts in zip(batch, res):
+            datapoints = ts["datapoints"]
+            if not datapoints:
+                continue
+            new_datapoints[name] = datapoints
+            next_start = datapoints[-1]["timestamp"] + 1
+            if len(datapoints) == limit and next_start < end:
+                incomplete.append((name, next_start))
+
+        if new_datapoints:
+            with lock:
+                if stopped.is_set():
+                    return []
+                try:
+                    sink(new_datapoints)
+                except BaseException:
+                    # Set while holding the lock, so no other worker calls the sink after it failed
+                    stopped.set()
+                    raise
+                for name, datapoints in new_datapoints.items():
+                    watermarks.set(name, datapoints[-1]["timestamp"])
+                state["datapoints"] += sum(len(datapoints) for datapoints in new_datapoints.values())
+        return incomplete
+
+    def get_datapoints_frame(self, time_series, aggregates, granularity, start, end=None, **kwargs) -> "pd.DataFrame":
         """Returns a pandas dataframe of datapoints for the given timeseries all on the same timestamps.
 
         This method will automate paging for the user and return all data for the given time period.
@@ -662,13 +1566,97 @@ class DatapointsClient(APIClient):
         if steps == 1:
             return self._get_datapoints_frame_helper(time_series, aggregates, granularity, start, end)
 
-        with Pool(steps) as p:
-            dataframes = p.map(partial_get_dpsf, args)
+        dataframes = self._executor.map(partial_get_dpsf, args, max_workers=steps)
 
         df = pd.concat(dataframes).drop_duplicates(subset="timestamp").reset_index(drop=True)
 
         return df
 
+    def get_aligned_datapoints_frame(
+        self, names, start, end=None, granularity=None, fill=None, **kwargs
+    ) -> "pd.DataFrame":
+        """Returns a pandas dataframe of raw datapoints for the given timeseries aligned on the same timestamps.
+
+        The raw datapoints are aligned locally, either on the union of their timestamps or on a fixed grid.
+
+        Args:
+            names (List[str]):      The names of the timeseries to retrieve data for.
+
+            start (Union[str, int, datetime]):    Get datapoints after this time. Same format as for get_datapoints().
+
+            end (Union[str, int, datetime]):      Get datapoints up to this time. Same format as for start.
+
+            granularity (str):      Spacing of a fixed grid to align the datapoints on, starting at start. Defaults to the
+                                    union of the timestamps of all time series.
+
+            fill (str):             How to fill in values at timestamps a time series has no datapoint at. None leaves
+                                    them missing, 'last' carries the last value forward, 'step' does the same but only up
+                                    to the last datapoint of the time series, and 'linear' interpolates linearly.
+
+        Keyword Arguments:
+            workers (int):    Number of download workers to run in parallell. Defaults to 10.
+
+            include_outside_points (bool):  Include the datapoints right outside the interval, so values at its edges
+                                            can be filled in.
+
+        Returns:
+            pandas.DataFrame: A timestamp column followed by a column of values for each time series.
+
+        Examples:
+            Aligning two time series on a 1 second grid, interpolating between their datapoints::
+
+                client = CogniteClient()
+                df = client.datapoints.get_aligned_datapoints_frame(
+                    ["ts_1", "ts_2"], start="1h-ago", granularity="1s", fill="linear"
+                )
+        """
+        frames = self.iter_aligned_datapoints_frames(names, start, end, granularity, fill, chunk_size=None, **kwargs)
+        return next(frames)
+
+    def iter_aligned_datapoints_frames(
+        self, names, start, end=None, granularity=None, fill=None, chunk_size=100000, **kwargs
+    ) -> Iterator["pd.DataFrame"]:
+        """Yields the result of get_aligned_datapoints_frame() in chunks of rows, to bound memory usage.
+
+        Args:
+            chunk_size (int):   Max number of rows in each dataframe. Defaults to 100,000.
+
+            See get_aligned_datapoints_frame() for the other arguments.
+
+        Yields:
+            pandas.DataFrame: A timestamp column followed by a column of values for each time series.
+        """
+        start, end = _utils.interval_to_ms(start, end)
+        names = list(OrderedDict.fromkeys(names))
+        num_of_workers = kwargs.get("workers", self._num_of_workers)
+        get_series = partial(
+            self._get_aligned_series,
+            start=start,
+            end=end,
+            workers=num_of_workers,
+            include_outside_points=kwargs.get("include_outside_points", False),
+        )
+        # Series are fetched in parallel. A single series is fetched in parallel intervals by get_datapoints() instead.
+        series = OrderedDict(zip(names, self._executor.map(get_series, names, max_workers=num_of_workers)))
+
+        if granularity is None:
+            grid = _alignment.union_grid(series)
+            grid = grid[(grid >= start) & (grid < end)]
+        else:
+            grid = _alignment.fixed_grid(start, end, granularity)
+        return _alignment.iter_align(series, grid, fill, chunk_size=chunk_size or max(len(grid), 1))
+
+    def _get_aligned_series(self, name, start, end, workers, include_outside_points):
+        """Returns the timestamps and values of the raw datapoints of a numeric time series as numpy arrays."""
+        datapoints = self.get_datapoints(
+            name, start, end, workers=workers, include_outside_points=include_outside_points
+        ).to_json()["datapoints"]
+        if any(isinstance(dp["value"], str) for dp in datapoints):
+            raise ValueError("Time series {} has string datapoints, which cannot be aligned".format(name))
+        timestamps = np.fromiter((dp["timestamp"] for dp in datapoints), dtype=np.int64, count=len(datapoints))
+        values = np.fromiter((dp["value"] for dp in datapoints), dtype=np.float64, count=len(datapoints))
+        return timestamps, values
+
     def _get_datapoints_frame_helper_wrapper(self, args, time_series, aggregates, granularity):
         return self._get_datapoints_frame_helper(time_series, aggregates, granularity, args["start"], args["end"])
 
@@ -812,12 +1800,75 @@ class DatapointsClient(APIClient):
             raise ValueError("DataFrame not on a correct format")
 
         for name in names:
-            data_points = [Datapoint(int(timestamp[i]), dataframe[name].iloc[i]) for i in range(0, len(dataframe))]
-            self.post_datapoints(name, data_points)
+            self.post_datapoints(name, DatapointBatch(timestamp.values, dataframe[name].values))
+
+    def subscribe(self, names, start=None, min_interval=1, max_interval=60, batch_size=100) -> DatapointsSubscription:
+        """Returns a subscription which watches many time series for new datapoints with one polling loop.
+
+        Args:
+            names (List[str]):      Names of the time series to watch.
+
+            start (Union[str, int, datetime]):    Where to start watching from. Defaults to now.
+
+            min_interval (float):   Shortest time in seconds between polls. Defaults to 1.
+
+            max_interval (float):   Longest time in seconds between polls. Defaults to 60.
+
+            batch_size (int):       Max number of time series to query per request. Defaults to 100.
+
+        Returns:
+            stable.datapoints.DatapointsSubscription: A subscription which can be iterated over or run with a callback.
+
+        Examples:
+            Printing new datapoints from a set of time series as they arrive::
+
+                client = CogniteClient()
+                with client.datapoints.subscribe(["ts_1", "ts_2"]) as subscription:
+                    for name, datapoint in subscription:
+                        print(name, datapoint["timestamp"], datapoint["value"])
+        """
+        return DatapointsSubscription(self, names, start, min_interval, max_interval, batch_size)
+
+    def writer(
+        self, spool_path=None, max_buffer_size=100000, max_age=5, max_queue_size=1000000, use_gzip=True, protobuf=False
+    ) -> DatapointsWriter:
+        """Returns a writer which buffers datapoints for many time series and inserts them in batched requests.
+
+        Args:
+            spool_path (str):       Path of a file to spool datapoints to until they are inserted, so that they survive
+                                    a restart. Defaults to keeping them only in memory.
+
+            max_buffer_size (int):  Number of buffered datapoints which triggers a flush. Defaults to 100,000.
+
+            max_age (float):        Max number of seconds a datapoint is buffered before a flush is triggered. Defaults
+                                    to 5.
+
+            max_queue_size (int):   Max number of datapoints to buffer. Datapoints written beyond this are dropped.
+                                    Defaults to 1,000,000.
+
+            use_gzip (bool):        Whether or not to gzip the requests. Defaults to True.
+
+            protobuf (bool):        Upload the data using the binary protobuf format. Defaults to False.
+
+        Returns:
+            stable.datapoints.DatapointsWriter: The writer. Close it to insert the remaining datapoints.
+
+        Examples:
+            Inserting datapoints from a collector as they are read::
+
+                client = CogniteClient()
+                with client.datapoints.writer(spool_path="datapoints.spool") as writer:
+                    for name, timestamp, value in read_sensors():
+                        writer.write(name, [Datapoint(timestamp, value)])
+                    print(writer.metrics())
+        """
+        return DatapointsWriter(self, spool_path, max_buffer_size, max_age, max_queue_size, use_gzip, protobuf)
 
     def live_data_generator(self, name, update_frequency=1):
         """Generator function which continously polls latest datapoint of a timeseries and yields new datapoints.
 
+        Use subscribe() to watch several time series at once.
+
         Args:
             name (str): Name of timeseries to get latest datapoints for.
 
@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 import json
-from copy import deepcopy
+from functools import partial
 from typing import Dict, List
 
-import pandas as pd
-
+from cognite.client import _utils
 from cognite.client._api_client import APIClient, CogniteResponse
 
+pd = _utils.lazy_import("pandas")
+_normalization = _utils.lazy_import("cognite.client._normalization")
+
 
 class EventResponse(CogniteResponse):
     """Event Response Object."""
@@ -21,7 +23,7 @@ class EventResponse(CogniteResponse):
         return self.internal_representation["data"]["items"][0]
 
     def to_pandas(self):
-        event = deepcopy(self.to_json())
+        event = dict(self.to_json())
         if event.get("metadata"):
             event.update(event.pop("metadata"))
         return pd.DataFrame.from_dict(event, orient="index")
@@ -34,12 +36,25 @@ class EventListResponse(CogniteResponse):
         super().__init__(internal_representation)
         self.counter = 0
 
-    def to_pandas(self):
-        items = deepcopy(self.to_json())
-        for d in items:
-            if d.get("metadata"):
-                d.update(d.pop("metadata"))
-        return pd.DataFrame(items)
+    def to_pandas(self, expand_metadata=True, metadata_prefix="", categorical=False, separate_metadata=False):
+        """Returns data as a pandas dataframe with a row per event.
+
+        Args:
+            expand_metadata (bool): Make a column of each metadata field rather than a column of metadata dicts.
+                                    Defaults to True.
+            metadata_prefix (str):  Prefix of the names of the metadata columns. Defaults to ''.
+            categorical (bool):     Store string columns with few distinct values as categoricals, to save memory.
+                                    Defaults to False.
+            separate_metadata (bool):   Return the metadata fields as a separate sparse dataframe instead. Defaults to
+                                        False.
+
+        Returns:
+            Union[pandas.DataFrame, Tuple[pandas.DataFrame, pandas.DataFrame]]: The dataframe, or if separate_metadata
+            is True, the dataframe without metadata and a dataframe of the metadata fields.
+        """
+        return _normalization.items_to_pandas(
+            self.to_json(), expand_metadata, metadata_prefix, categorical, separate_metadata
+        )
 
     def __iter__(self):
         return self
@@ -78,6 +93,11 @@ class Event(object):
 
 
 class EventsClient(APIClient):
+    # Max number of events returned by a search, including the offset
+    _SEARCH_LIMIT = 1000
+    # Max number of events per request when creating or deleting events
+    _BULK_LIMIT = 1000
+
     def __init__(self, **kwargs):
         super().__init__(version="0.5", **kwargs)
 
@@ -216,6 +236,59 @@ class EventsClient(APIClient):
         body = {"items": event_ids}
         self._post(url, body=body)
 
+    def post_events_bulk(self, events: List[Event], chunk_size=None, max_workers=None) -> EventListResponse:
+        """Adds any number of events, in chunks which are posted in parallel.
+
+        Args:
+            events (List[stable.events.Event]):    List of events to create.
+            chunk_size (int):       Max number of events per request. Defaults to 1000, the limit of the API.
+            max_workers (int):      Max number of requests to send at once. Defaults to the number of workers of the
+                                    client.
+
+        Returns:
+            stable.events.EventListResponse: The created events, in the same order as the events given.
+
+        Raises:
+            APIError: If any chunk fails, after the other chunks have been posted. extra["succeeded"] holds the created
+            events, extra["failed"] the events of the failed chunks as dicts and extra["errors"] the error of each failed chunk.
+
+        Examples:
+            Posting many events and reporting those which failed::
+
+                client = CogniteClient()
+                try:
+                    res = client.events.post_events_bulk(my_events)
+                except APIError as e:
+                    print("Failed to post {} events: {}".format(len(e.extra["failed"]), e.extra["errors"]))
+        """
+        items = [event.__dict__ for event in events]
+        created = self._post_in_chunks("/events", items, chunk_size or self._BULK_LIMIT, max_workers)
+        return EventListResponse({"data": {"items": created}})
+
+    def delete_events_bulk(self, event_ids: List[int], chunk_size=None, max_workers=None) -> None:
+        """Deletes any number of events, in chunks which are deleted in parallel.
+
+        Args:
+            event_ids (List[int]):  List of ids of events to delete.
+            chunk_size (int):       Max number of events per request. Defaults to 1000, the limit of the API.
+            max_workers (int):      Max number of requests to send at once. Defaults to the number of workers of the
+                                    client.
+
+        Returns:
+            None
+
+        Raises:
+            APIError: If any chunk fails, after the other chunks have been deleted. extra["failed"] holds the ids of the
+            failed chunks and extra["errors"] the error of each failed chunk.
+
+        Examples:
+            Deleting many events::
+
+                client = CogniteClient()
+                client.events.delete_events_bulk(event_ids=list(range(1, 100001)))
+        """
+        self._post_in_chunks("/events/delete", list(event_ids), chunk_size or self._BULK_LIMIT, max_workers)
+
     def search_for_events(
         self,
         description=None,
@@ -294,3 +367,69 @@ class EventsClient(APIClient):
 
         res = self._get(url, params=params)
         return EventListResponse(res.json())
+
+    def get_events_frame(self, start, end=None, partitions=None, **kwargs) -> "pd.DataFrame":
+        """Returns all events starting in a time interval as a dataframe ordered by start time.
+
+        The interval is split into partitions by start time, which are searched for in parallel. A partition with more
+        events than a single search returns is split in half, and the halves are searched for in the next round.
+
+        Args:
+            start (Union[str, int, datetime]):    Get events starting at or after this time. Format is
+                                        N[timeunit]-ago where timeunit is w,d,h,m,s, ms since epoch or a datetime.
+
+            end (Union[str, int, datetime]):      Get events starting before this time. Same format as for start.
+                                        Defaults to now.
+
+            partitions (int):       Number of partitions to start with. Defaults to the number of workers of the client.
+
+        Keyword Args:
+            Filters of search_for_events(), except those on start time, e.g. type, subtype, asset_ids or metadata.
+
+        Returns:
+            pandas.DataFrame: The events, one per row, with the metadata fields as columns.
+
+        Examples:
+            Getting a year of alarm events::
+
+                client = CogniteClient()
+                df = client.events.get_events_frame(start="52w-ago", type="alarm")
+        """
+        for key in ["min_start_time", "max_start_time", "limit", "offset"]:
+            if key in kwargs:
+                raise ValueError("{} cannot be used when getting an events frame".format(key))
+        start, end = _utils.interval_to_ms(start, end)
+
+        events = []
+        if end > start:
+            num_of_partitions = max(1, min(partitions or self._num_of_workers or 1, end - start))
+            bounds = [start + (end - start) * i // num_of_partitions for i in range(num_of_partitions + 1)]
+            # Partitions are inclusive at both ends, like the start time filters
+            pending = [(bounds[i], bounds[i + 1] - 1) for i in range(num_of_partitions)]
+            search = partial(self._search_events_partition, filters=kwargs)
+            while pending:
+                results = self._executor.map(search, pending)
+                full = []
+                for (first, last), items in zip(pending, results):
+                    if len(items) < self._SEARCH_LIMIT:
+                        events.extend(items)
+                    elif first == last:
+                        raise ValueError(
+                            "More than {} events start at {}, use get_events() with autopaging to get them".format(
+                                self._SEARCH_LIMIT - 1, first
+                            )
+                        )
+                    else:
+                        middle = (first + last) // 2
+                        full.extend([(first, middle), (middle + 1, last)])
+                pending = full
+
+        df = EventListResponse({"data": {"items": events}}).to_pandas()
+        if events:
+            df = df.sort_values(["startTime", "id"], kind="mergesort").reset_index(drop=True)
+        return df
+
+    def _search_events_partition(self, partition, filters):
+        first, last = partition
+        res = self.search_for_events(min_start_time=first, max_start_time=last, limit=self._SEARCH_LIMIT, **filters)
+        return res.to_json()
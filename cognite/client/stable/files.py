@@ -1,14 +1,15 @@
 # -*- coding: utf-8 -*-
-import os
 import warnings
 from copy import deepcopy
 from typing import Dict, List, Union
 
-import pandas as pd
 import requests
 
+from cognite.client import _utils
 from cognite.client._api_client import APIClient, CogniteResponse
 
+pd = _utils.lazy_import("pandas")
+
 
 class FileInfoResponse(CogniteResponse):
     """File Info Response Object.
@@ -93,6 +94,11 @@ class FilesClient(APIClient):
 
             overwrite (bool):     Whether to overwrite existing data if duplicate or not. Default is false.
 
+            chunked (bool):       Upload the file using chunked transfer encoding. Default is false.
+
+            progress_callback (Callable[[int, int], None]): Called with the number of bytes uploaded so far and the total
+                                  number of bytes while uploading the file.
+
         Returns:
             Dict: A dictionary containing the field fileId and optionally also uploadURL if file_path is omitted.
 
@@ -124,9 +130,12 @@ class FilesClient(APIClient):
             if not content_type:
                 warning = "content_type should be specified when directly uploading the file."
                 warnings.warn(warning)
-            headers = {"content-length": str(os.path.getsize(file_path))}
-            with open(file_path, "rb") as file:
-                requests.put(result["uploadURL"], data=file, headers=headers)
+            self._upload(
+                result["uploadURL"],
+                file_path,
+                chunked=kwargs.get("chunked", False),
+                progress_callback=kwargs.get("progress_callback"),
+            )
             result.pop("uploadURL")
         return result
 
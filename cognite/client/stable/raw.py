@@ -2,10 +2,11 @@
 import json
 from typing import Dict, List
 
-import pandas as pd
-
+from cognite.client import _utils
 from cognite.client._api_client import APIClient, CogniteResponse
 
+pd = _utils.lazy_import("pandas")
+
 
 class RawResponse(CogniteResponse):
     """Raw Response Object."""
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
-import pandas as pd
-
+from cognite.client import _utils
 from cognite.client._api_client import APIClient, CogniteResponse
 
+pd = _utils.lazy_import("pandas")
+
 
 class TagMatchingResponse(CogniteResponse):
     """Tag Matching Response Object.
@@ -1,25 +1,35 @@
 # -*- coding: utf-8 -*-
-from copy import deepcopy
 from typing import Dict, List
 from urllib.parse import quote
 
-import pandas as pd
-
+from cognite.client import _utils
 from cognite.client._api_client import APIClient, CogniteResponse
 
+_normalization = _utils.lazy_import("cognite.client._normalization")
+
 
 class TimeSeriesResponse(CogniteResponse):
     """Time series Response Object"""
 
-    def to_pandas(self):
-        """Returns data as a pandas dataframe"""
-        items = deepcopy(self.internal_representation["data"]["items"])
-        if items and items[0].get("metadata") is None:
-            return pd.DataFrame(items)
-        for d in items:
-            if d.get("metadata"):
-                d.update(d.pop("metadata"))
-        return pd.DataFrame(items)
+    def to_pandas(self, expand_metadata=True, metadata_prefix="", categorical=False, separate_metadata=False):
+        """Returns data as a pandas dataframe with a row per time series.
+
+        Args:
+            expand_metadata (bool): Make a column of each metadata field rather than a column of metadata dicts.
+                                    Defaults to True.
+            metadata_prefix (str):  Prefix of the names of the metadata columns. Defaults to ''.
+            categorical (bool):     Store string columns with few distinct values as categoricals, to save memory.
+                                    Defaults to False.
+            separate_metadata (bool):   Return the metadata fields as a separate sparse dataframe instead. Defaults to
+                                        False.
+
+        Returns:
+            Union[pandas.DataFrame, Tuple[pandas.DataFrame, pandas.DataFrame]]: The dataframe, or if separate_metadata
+            is True, the dataframe without metadata and a dataframe of the metadata fields.
+        """
+        return _normalization.items_to_pandas(
+            self.to_json(), expand_metadata, metadata_prefix, categorical, separate_metadata
+        )
 
 
 class TimeSeries:
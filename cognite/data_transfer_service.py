@@ -1,13 +1,26 @@
+import hashlib
 import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor as Pool
+from concurrent.futures import as_completed
 from copy import deepcopy
 from datetime import datetime
 from io import BytesIO
-from typing import Dict, List, Union
+from typing import Dict, Iterator, List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from cognite import CogniteClient
-from cognite.client._utils import get_aggregate_func_return_name, to_camel_case, to_snake_case
+from cognite.client._aggregation import get_bucket_starts
+from cognite.client._utils import (
+    datetime_to_ms,
+    get_aggregate_func_return_name,
+    interval_to_ms,
+    to_camel_case,
+    to_snake_case,
+)
 
 
 class TimeSeries:
@@ -159,6 +172,8 @@ class DataSpec:
             for el in obj:
                 new_list.append(DataSpec._to_json(el))
             return new_list
+        elif isinstance(obj, datetime):
+            return datetime_to_ms(obj)
         elif isinstance(obj, (str, int, float, bool)) or obj is None:
             return obj
         raise AssertionError("Data spec does not accept type {}".format(type(obj)))
@@ -207,13 +222,29 @@ class DataTransferService:
     Fetch timeseries from the api.
     """
 
-    def __init__(self, data_spec: DataSpec, api_key: str = None, cookies: Dict = None, num_of_workers: int = 10):
+    def __init__(
+        self,
+        data_spec: DataSpec,
+        api_key: str = None,
+        cookies: Dict = None,
+        num_of_workers: int = 10,
+        materialization_dir: str = None,
+    ):
         """
         Args:
             data_spec (data_transfer_service.DataSpec):   Data Spec.
             api_key (str):          Api key.
             cookies (dict):         Cookies.
             num_of_workers (int):   Number of workers to fetch data with.
+            materialization_dir (str):  Directory to persist the dataframe of each TimeSeriesDataSpec in. When set,
+                                        later runs only fetch data newer than what is stored. Requires pyarrow,
+                                        which is installed with the materialization extra.
+
+        Examples:
+            Materializing the dataframes of an hourly retraining job, so that each run only downloads the last hour::
+
+                dts = DataTransferService(data_spec, materialization_dir="/data/dts")
+                dataframes = dts.get_dataframes()
         """
         self.cognite_client = CogniteClient(api_key=api_key, cookies=cookies, num_of_workers=num_of_workers)
 
@@ -226,6 +257,14 @@ class DataTransferService:
         self.ts_data_specs = self.data_spec.time_series_data_specs
         self.files_data_spec = self.data_spec.files_data_spec
         self.cookies = cookies
+        self._num_of_workers = num_of_workers
+        self._id_to_name = None
+        self._materialization_dir = materialization_dir
+        self._materialization_paths = {}
+        if materialization_dir:
+            os.makedirs(materialization_dir, exist_ok=True)
+            for tsds in self.ts_data_specs or []:
+                self._materialization_paths[tsds.label] = self._get_materialization_path(tsds)
 
     def get_time_series_name(self, ts_label: str, dataframe_label: str = "default"):
         if self.ts_data_specs is None:
@@ -237,12 +276,7 @@ class DataTransferService:
                 tsds = ts_data_spec
 
         if tsds:
-            # Temporary workaround that you cannot use get_datapoints_frame with ts id.
-            ts_res = self.cognite_client.experimental.time_series.get_multiple_time_series_by_id(
-                ids=list(set([ts.id for ts in tsds.time_series]))
-            )
-            id_to_name = {ts["id"]: ts["name"] for ts in ts_res.to_json()}
-
+            id_to_name = self._get_id_to_name()
             for ts in tsds.time_series:
                 if ts.label == ts_label:
                     return id_to_name[ts.id]
@@ -252,20 +286,70 @@ class DataTransferService:
     def get_dataframes(self, drop_agg_suffix: bool = True):
         """Return a dictionary of dataframes indexed by label - one per data spec.
 
+        Data specs which share start, end and granularity are downloaded together in a single frame, which is split
+        into one dataframe per data spec afterwards. The downloads for all data specs run concurrently.
+
         Args:
             drop_agg_suffix (bool): If a time series has only one aggregate, drop the `|<agg-func>` suffix on
                                     those column names.
         Returns:
             Dict[str, pd.DataFrame]: A label-indexed dictionary of data frames.
         """
-        if len(self.ts_data_specs) == 0 or self.ts_data_specs is None:
+        if self.ts_data_specs is None or len(self.ts_data_specs) == 0:
             raise ValueError("Data spec does not contain any TimeSeriesDataSpecs")
 
-        dataframes = {}
-        for tsds in self.ts_data_specs:
-            df = self.get_dataframe(tsds.label, drop_agg_suffix=drop_agg_suffix)
-            dataframes[tsds.label] = df
-        return dataframes
+        dataframes = dict(self.iter_dataframes(drop_agg_suffix=drop_agg_suffix))
+        return {tsds.label: dataframes[tsds.label] for tsds in self.ts_data_specs}
+
+    def iter_dataframes(self, drop_agg_suffix: bool = True) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Return an iterator yielding a (label, dataframe) tuple for each data spec as soon as it is ready.
+
+        The downloads for all data specs run concurrently and share the worker budget of the service.
+
+        Args:
+            drop_agg_suffix (bool): If a time series has only one aggregate, drop the `|<agg-func>` suffix on
+                                    those column names.
+        Yields:
+            Tuple[str, pd.DataFrame]: The label of a data spec and its dataframe.
+
+        Examples:
+            Start training on each dataframe as soon as it has been downloaded::
+
+                dts = DataTransferService(data_spec)
+                for label, df in dts.iter_dataframes():
+                    train(label, df)
+        """
+        if self.ts_data_specs is None or len(self.ts_data_specs) == 0:
+            raise ValueError("Data spec does not contain any TimeSeriesDataSpecs")
+        for _, label, df in self._iter_data(self.ts_data_specs, [], drop_agg_suffix):
+            yield label, df
+
+    def get_data(self, drop_agg_suffix: bool = True) -> Tuple[Dict[str, pd.DataFrame], Dict[str, BytesIO]]:
+        """Return all dataframes and files in the data spec, downloading them concurrently.
+
+        Args:
+            drop_agg_suffix (bool): If a time series has only one aggregate, drop the `|<agg-func>` suffix on
+                                    those column names.
+        Returns:
+            Tuple[Dict[str, pd.DataFrame], Dict[str, BytesIO]]: A label-indexed dictionary of data frames and a
+            name-indexed dictionary of files.
+        """
+        file_names = list(self.files_data_spec.file_ids) if self.files_data_spec else []
+        data = {"dataframe": {}, "file": {}}
+        for kind, label, value in self._iter_data(self.ts_data_specs or [], file_names, drop_agg_suffix):
+            data[kind][label] = value
+        dataframes = {tsds.label: data["dataframe"][tsds.label] for tsds in self.ts_data_specs or []}
+        return dataframes, data["file"]
+
+    def get_files(self) -> Dict[str, BytesIO]:
+        """Return all files in the FilesDataSpec indexed by name, downloading them concurrently.
+
+        Returns:
+            Dict[str, BytesIO]: A name-indexed dictionary of files.
+        """
+        if not self.files_data_spec or not isinstance(self.files_data_spec, FilesDataSpec):
+            raise ValueError("Data spec does not contain a FilesDataSpec")
+        return {name: file for _, name, file in self._iter_data([], list(self.files_data_spec.file_ids), False)}
 
     def get_dataframe(self, label: str = "default", drop_agg_suffix: bool = True):
         if self.ts_data_specs is None:
@@ -276,31 +360,141 @@ class DataTransferService:
             if ts_data_spec.label == label:
                 tsds = ts_data_spec
         if tsds:
-            ts_list = []
+            df = self._get_raw_dataframes([tsds])[0]
+            return self._process_raw_dataframe(df, tsds, drop_agg_suffix)
+        raise ValueError("Invalid label")
+
+    def _get_id_to_name(self):
+        """Returns a mapping from id to name for all time series in the data spec.
+
+        All ids are resolved in a single request the first time this is called, and the result is reused for the
+        lifetime of the service.
+        """
+        if self._id_to_name is None:
             # Temporary workaround that you cannot use get_datapoints_frame with ts id.
-            ts_res = self.cognite_client.experimental.time_series.get_multiple_time_series_by_id(
-                ids=list(set([ts.id for ts in tsds.time_series]))
-            )
-            id_to_name = {ts["id"]: ts["name"] for ts in ts_res.to_json()}
+            ids = set(ts.id for tsds in self.ts_data_specs or [] for ts in tsds.time_series)
+            ts_res = self.cognite_client.experimental.time_series.get_multiple_time_series_by_id(ids=sorted(ids))
+            self._id_to_name = {ts["id"]: ts["name"] for ts in ts_res.to_json()}
+        return self._id_to_name
+
+    @staticmethod
+    def _group_ts_data_specs_by_window(ts_data_specs: List[TimeSeriesDataSpec]) -> List[List[TimeSeriesDataSpec]]:
+        groups = OrderedDict()
+        for tsds in ts_data_specs:
+            window = (str(tsds.start), str(tsds.end), tsds.granularity)
+            groups.setdefault(window, []).append(tsds)
+        return list(groups.values())
+
+    @staticmethod
+    def _get_column_names(tsds: TimeSeriesDataSpec) -> List[str]:
+        column_names = []
+        for ts in tsds.time_series:
+            for agg in ts.aggregates or tsds.aggregates:
+                column_name = ts._name + "|" + get_aggregate_func_return_name(agg)
+                if column_name not in column_names:
+                    column_names.append(column_name)
+        return column_names
+
+    def _get_raw_dataframes(self, ts_data_specs: List[TimeSeriesDataSpec], workers: int = None) -> List[pd.DataFrame]:
+        """Downloads the data for data specs sharing start, end and granularity in a single frame.
 
+        Each time series is requested once with the union of the aggregates asked for by the data specs. The frame is
+        then split into one dataframe per data spec, with columns named by time series name and aggregate.
+        """
+        id_to_name = self._get_id_to_name()
+        aggregates_by_name = OrderedDict()
+        for tsds in ts_data_specs:
             for ts in tsds.time_series:
                 ts._name = id_to_name[ts.id]
                 if not ts.label:
-                    ts.label = id_to_name[ts.id]
-                ts_dict = dict(
-                    name=id_to_name[ts.id],
-                    aggregates=ts.aggregates or tsds.aggregates,
-                    missingDataStrategy=ts.missing_data_strategy,
-                )
-                ts_list.append(ts_dict)
-
+                    ts.label = ts._name
+                aggregates = aggregates_by_name.setdefault(ts._name, OrderedDict())
+                for agg in ts.aggregates or tsds.aggregates:
+                    aggregates.setdefault(get_aggregate_func_return_name(agg), agg)
+
+        time_series = [{"name": name, "aggregates": list(aggs.values())} for name, aggs in aggregates_by_name.items()]
+        first = ts_data_specs[0]
+        start, end = interval_to_ms(first.start, first.end)
+        stored_dataframes = [self._load_materialized_dataframe(tsds) for tsds in ts_data_specs]
+        if all(stored_df is not None and not stored_df.empty for stored_df in stored_dataframes):
+            # The last stored row is fetched again, since its aggregates may have changed after it was stored. If the
+            # stored frames end before the window, only the window is fetched.
+            start = max(start, min(int(stored_df["timestamp"].iloc[-1]) for stored_df in stored_dataframes))
+
+        df = pd.DataFrame(columns=["timestamp"])
+        if start < end:
             df = self.cognite_client.datapoints.get_datapoints_frame(
-                ts_list, tsds.aggregates, tsds.granularity, tsds.start, tsds.end
+                time_series, first.aggregates, first.granularity, start, end, workers=workers
             )
-            df = self.__apply_missing_data_strategies(df, ts_list, tsds.missing_data_strategy)
-            df = self.__convert_ts_names_to_labels(df, tsds, drop_agg_suffix)
-            return df
-        raise ValueError("Invalid label")
+        # The coalesced frame has the timestamps of all its time series, so rows which only other specs have data for
+        # are dropped, as they would not be part of a frame downloaded for a spec alone.
+        has_data = df.drop(columns="timestamp").notna().any(axis=1)
+        dataframes = []
+        for tsds in ts_data_specs:
+            spec_df = df.reindex(columns=["timestamp"] + self._get_column_names(tsds))
+            own_rows = spec_df.drop(columns="timestamp").notna().any(axis=1) | ~has_data
+            dataframes.append(spec_df[own_rows].reset_index(drop=True))
+        if self._materialization_dir:
+            dataframes = [
+                self._update_materialized_dataframe(tsds, stored_df, df)
+                for tsds, stored_df, df in zip(ts_data_specs, stored_dataframes, dataframes)
+            ]
+        return dataframes
+
+    @staticmethod
+    def _import_feather():
+        try:
+            from pyarrow import feather
+        except ImportError as e:
+            raise ImportError(
+                "Materializing dataframes requires pyarrow. Install it with "
+                "'pip install cognite-sdk[materialization]'."
+            ) from e
+        return feather
+
+    def _get_materialization_path(self, tsds: TimeSeriesDataSpec) -> str:
+        json_repr = json.dumps(DataSpec._to_json(tsds), sort_keys=True)
+        key = hashlib.sha256(json_repr.encode("utf-8")).hexdigest()
+        return os.path.join(self._materialization_dir, "{}.feather".format(key))
+
+    def _load_materialized_dataframe(self, tsds: TimeSeriesDataSpec):
+        path = self._materialization_paths.get(tsds.label)
+        if path is None or not os.path.exists(path):
+            return None
+        return self._import_feather().read_feather(path)
+
+    def _update_materialized_dataframe(self, tsds: TimeSeriesDataSpec, stored_df: pd.DataFrame, new_df: pd.DataFrame):
+        """Appends newly fetched rows to the stored dataframe of a data spec and writes it back to disk.
+
+        Rows which have fallen out of the window of the data spec, e.g. because it has a relative start time, are
+        dropped.
+        """
+        df = new_df
+        if stored_df is not None and not stored_df.empty:
+            last_timestamp = stored_df["timestamp"].iloc[-1]
+            df = pd.concat(
+                [stored_df[stored_df["timestamp"] < last_timestamp], new_df[new_df["timestamp"] >= last_timestamp]]
+            )
+        # The first bucket starts at the query start rounded down to a whole granularity unit, as in the API
+        start = interval_to_ms(tsds.start, tsds.end)[0]
+        start = int(get_bucket_starts(np.array([start]), tsds.granularity, start)[0])
+        df = df[df["timestamp"] >= start].reset_index(drop=True)
+
+        path = self._materialization_paths[tsds.label]
+        tmp_path = path + ".tmp"
+        self._import_feather().write_feather(df, tmp_path)
+        os.replace(tmp_path, path)
+        return df
+
+    def _process_raw_dataframe(self, df: pd.DataFrame, tsds: TimeSeriesDataSpec, drop_agg_suffix: bool):
+        ts_list = [
+            dict(
+                name=ts._name, aggregates=ts.aggregates or tsds.aggregates, missingDataStrategy=ts.missing_data_strategy
+            )
+            for ts in tsds.time_series
+        ]
+        df = self.__apply_missing_data_strategies(df, ts_list, tsds.missing_data_strategy)
+        return self.__convert_ts_names_to_labels(df, tsds, drop_agg_suffix)
 
     def get_file(self, name):
         """Return files by name as specified in the DataSpec
@@ -310,12 +504,52 @@ class DataTransferService:
         """
         if not self.files_data_spec or not isinstance(self.files_data_spec, FilesDataSpec):
             raise ValueError("Data spec does not contain a FilesDataSpec")
-        id = self.files_data_spec.file_ids.get(name)
-        if id:
-            file_bytes = self.cognite_client.files.download_file(id, get_contents=True)
-            return BytesIO(file_bytes)
+        if self.files_data_spec.file_ids.get(name):
+            return self._download_file(name)
         raise ValueError("Invalid name")
 
+    def _download_file(self, name):
+        file_bytes = self.cognite_client.files.download_file(self.files_data_spec.file_ids[name], get_contents=True)
+        return BytesIO(file_bytes)
+
+    def _iter_data(self, ts_data_specs: List[TimeSeriesDataSpec], file_names: List[str], drop_agg_suffix: bool):
+        """Downloads dataframes and files concurrently and yields (kind, label, data) tuples as they are ready.
+
+        Every group of data specs sharing a window and every file is a task on one pool bounded by the number of
+        workers of the service. The workers left over are split between the dataframe downloads, so that the total
+        number of requests in flight stays within the budget.
+        """
+        tsds_groups = self._group_ts_data_specs_by_window(ts_data_specs)
+        num_of_tasks = len(tsds_groups) + len(file_names)
+        if num_of_tasks == 0:
+            return
+        if tsds_groups:
+            self._get_id_to_name()
+        workers_per_download = max(1, self._num_of_workers // num_of_tasks)
+
+        with Pool(min(num_of_tasks, self._num_of_workers)) as p:
+            futures = [
+                p.submit(self._get_processed_dataframes, tsds_group, drop_agg_suffix, workers_per_download)
+                for tsds_group in tsds_groups
+            ]
+            futures.extend(p.submit(self._get_file_data, name) for name in file_names)
+            try:
+                for future in as_completed(futures):
+                    yield from future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _get_file_data(self, name):
+        return [("file", name, self._download_file(name))]
+
+    def _get_processed_dataframes(self, ts_data_specs: List[TimeSeriesDataSpec], drop_agg_suffix: bool, workers: int):
+        raw_dataframes = self._get_raw_dataframes(ts_data_specs, workers=workers)
+        return [
+            ("dataframe", tsds.label, self._process_raw_dataframe(df, tsds, drop_agg_suffix))
+            for tsds, df in zip(ts_data_specs, raw_dataframes)
+        ]
+
     def __convert_ts_names_to_labels(self, df: pd.DataFrame, tsds: TimeSeriesDataSpec, drop_agg_suffix: bool):
         name_to_label = {}
         for ts in tsds.time_series:
@@ -330,21 +564,27 @@ class DataTransferService:
     def __apply_missing_data_strategies(self, df, ts_list, global_missing_data_strategy):
         """Applies missing data strategies to dataframe.
 
-        Local strategies have precedence over global strategy.
+        Local strategies have precedence over global strategy. Columns are grouped by strategy, so each strategy is
+        applied to all of its columns in a single operation and the resulting frame is assembled once.
         """
-        new_df = df["timestamp"]
+        columns_by_strategy = OrderedDict()
+        seen_columns = {"timestamp"}
         for ts in ts_list:
-            name = ts["name"]
-            colnames = [colname for colname in df.columns.values if colname.startswith(name)]
-
-            missing_data_strategy = ts.get("missingDataStrategy", global_missing_data_strategy)
-            partial_df = df[colnames]
-
+            missing_data_strategy = ts.get("missingDataStrategy") or global_missing_data_strategy
+            for agg in ts["aggregates"]:
+                column = ts["name"] + "|" + get_aggregate_func_return_name(agg)
+                if column in df.columns and column not in seen_columns:
+                    seen_columns.add(column)
+                    columns_by_strategy.setdefault(missing_data_strategy, []).append(column)
+
+        blocks = [df[["timestamp"]]]
+        for missing_data_strategy, columns in columns_by_strategy.items():
+            block = df[columns]
             if missing_data_strategy == "ffill":
-                partial_df = df[colnames].fillna(method="pad")
+                block = block.ffill()
             elif missing_data_strategy and missing_data_strategy.endswith("Interpolation"):
                 method = missing_data_strategy[:-13].lower()
-                partial_df = df[colnames].interpolate(method=method, axis=0)
-            new_df = pd.concat([new_df, partial_df], axis=1)
-            new_df = new_df.iloc[:, ~new_df.columns.duplicated()]
-        return new_df
+                block = block.interpolate(method=method, axis=0)
+            blocks.append(block)
+        new_df = pd.concat(blocks, axis=1)
+        return new_df[[column for column in df.columns if column in seen_columns]]
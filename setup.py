@@ -2,7 +2,7 @@ import re
 
 from setuptools import find_packages, setup
 
-packages = find_packages(exclude=["tests*"])
+packages = find_packages(exclude=["tests*", "benchmarks*"])
 
 version = re.search('^__version__\s*=\s*"(.*)"', open("cognite/__init__.py").read(), re.M).group(1)
 
@@ -16,6 +16,7 @@ setup(
     author_email="erlend.vollset@cognite.com",
     packages=packages,
     install_requires=["requests", "pandas", "protobuf", "tabulate", "cognite-logger>=0.3"],
+    extras_require={"materialization": ["pyarrow"]},
     python_requires=">=3.5",
     zip_safe=False,
     include_package_data=True,
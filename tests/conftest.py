@@ -1,8 +1,12 @@
 import datetime
+import json
 import logging
 import random
 import string
+import threading
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
 from unittest import mock
 from unittest.mock import MagicMock
 
@@ -116,3 +120,73 @@ def get_time_w_offset(**kwargs):
 
 def generate_random_string(n):
     return "".join(random.choice(string.ascii_uppercase + string.digits) for _ in range(n))
+
+
+class StubServer:
+    """Local HTTP server which can stand in for an API endpoint in tests.
+
+    The handler is called with the method, path, headers and raw body of each request and must return a tuple of
+    (status code, body). Bodies which are not bytes are json encoded.
+
+    Examples:
+        Serving a fixed response::
+
+            with StubServer(lambda method, path, headers, body: (200, {"data": {}})) as server:
+                requests.get(server.url + "/some/path")
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}".format(self._server.server_address[1])
+
+    def __enter__(self):
+        stub = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def _handle(self):
+                if self.headers.get("Transfer-Encoding") == "chunked":
+                    body = self._read_chunked()
+                else:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = self.rfile.read(length) if length else b""
+                stub.requests.append((self.command, self.path, dict(self.headers), body))
+                status, res_body = stub.handler(self.command, self.path, self.headers, body)
+                if not isinstance(res_body, bytes):
+                    res_body = json.dumps(res_body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(res_body)))
+                self.end_headers()
+                self.wfile.write(res_body)
+
+            def _read_chunked(self):
+                body = b""
+                while True:
+                    size = int(self.rfile.readline().strip(), 16)
+                    chunk = self.rfile.read(size + 2)[:size]
+                    if size == 0:
+                        return body
+                    body += chunk
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingMixIn, HTTPServer):
+            daemon_threads = True
+            request_queue_size = 128
+
+        self._server = Server(("127.0.0.1", 0), RequestHandler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,234 @@
+import numpy as np
+import pytest
+
+from cognite.client._aggregation import aggregate, get_bucket_starts, rollup
+
+HOUR = 3600000
+MINUTE = 60000
+
+ALL_AGGREGATES = ["avg", "max", "min", "count", "sum", "int", "step", "tv", "dv", "cv"]
+
+# Raw datapoints of a time series, as (minute, value), with several datapoints per hour, an hour without datapoints,
+# a datapoint before the query for interpolation, and one on a bucket boundary and one at the end of the query.
+RAW_DATAPOINTS = [
+    (-30, 4.0),
+    (10, 2.0),
+    (15, 6.0),
+    (45, 4.0),
+    (90, 8.0),
+    (110, 2.0),
+    (200, 5.0),
+    (240, 1.0),
+    (270, 3.0),
+    (280, 3.0),
+    (290, 0.0),
+    (300, 9.0),
+]
+
+# /timeseries/data responses for RAW_DATAPOINTS with all aggregates from 0 to 5 hours, worked out by hand from the
+# definitions of the aggregates in the API documentation.
+API_RESPONSES = {
+    "1h": {
+        "data": {
+            "items": [
+                {
+                    "name": "ts",
+                    "datapoints": [
+                        {
+                            "timestamp": 0,
+                            "average": 4.0,
+                            "max": 6.0,
+                            "min": 2.0,
+                            "count": 3,
+                            "sum": 12.0,
+                            "interpolation": 2.5,
+                            "stepinterpolation": 4.0,
+                            "totalvariation": 6.0,
+                            "discretevariance": 8 / 3,
+                            "continuousvariance": 88 / 147,
+                        },
+                        {
+                            "timestamp": HOUR,
+                            "average": 5.0,
+                            "max": 8.0,
+                            "min": 2.0,
+                            "count": 2,
+                            "sum": 10.0,
+                            "interpolation": 16 / 3,
+                            "stepinterpolation": 4.0,
+                            "totalvariation": 6.0,
+                            "discretevariance": 9.0,
+                            "continuousvariance": 3.0,
+                        },
+                        {
+                            "timestamp": 3 * HOUR,
+                            "average": 5.0,
+                            "max": 5.0,
+                            "min": 5.0,
+                            "count": 1,
+                            "sum": 5.0,
+                            "interpolation": 13 / 3,
+                            "stepinterpolation": 2.0,
+                            "totalvariation": 0.0,
+                            "discretevariance": 0.0,
+                            "continuousvariance": 0.0,
+                        },
+                        {
+                            "timestamp": 4 * HOUR,
+                            "average": 1.75,
+                            "max": 3.0,
+                            "min": 0.0,
+                            "count": 4,
+                            "sum": 7.0,
+                            "interpolation": 1.0,
+                            "stepinterpolation": 1.0,
+                            "totalvariation": 5.0,
+                            "discretevariance": 1.6875,
+                            "continuousvariance": 0.59,
+                        },
+                    ],
+                }
+            ]
+        }
+    },
+    "2h": {
+        "data": {
+            "items": [
+                {
+                    "name": "ts",
+                    "datapoints": [
+                        {
+                            "timestamp": 0,
+                            "average": 4.4,
+                            "max": 8.0,
+                            "min": 2.0,
+                            "count": 5,
+                            "sum": 22.0,
+                            "interpolation": 2.5,
+                            "stepinterpolation": 4.0,
+                            "totalvariation": 16.0,
+                            "discretevariance": 5.44,
+                            "continuousvariance": 128 / 75,
+                        },
+                        {
+                            "timestamp": 2 * HOUR,
+                            "average": 5.0,
+                            "max": 5.0,
+                            "min": 5.0,
+                            "count": 1,
+                            "sum": 5.0,
+                            "interpolation": 7 / 3,
+                            "stepinterpolation": 2.0,
+                            "totalvariation": 0.0,
+                            "discretevariance": 0.0,
+                            "continuousvariance": 0.0,
+                        },
+                        {
+                            "timestamp": 4 * HOUR,
+                            "average": 1.75,
+                            "max": 3.0,
+                            "min": 0.0,
+                            "count": 4,
+                            "sum": 7.0,
+                            "interpolation": 1.0,
+                            "stepinterpolation": 1.0,
+                            "totalvariation": 5.0,
+                            "discretevariance": 1.6875,
+                            "continuousvariance": 0.59,
+                        },
+                    ],
+                }
+            ]
+        }
+    },
+}
+
+
+def api_response_columns(granularity):
+    datapoints = API_RESPONSES[granularity]["data"]["items"][0]["datapoints"]
+    return {key: np.array([dp[key] for dp in datapoints]) for key in datapoints[0]}
+
+
+class TestBucketAlignment:
+    def test_buckets_aligned_to_granularity_unit_of_start(self):
+        timestamps = np.array([HOUR + 1000, 12 * HOUR, 13 * HOUR + 1])
+        assert list(get_bucket_starts(timestamps, "12h", start=HOUR + 1000)) == [HOUR, HOUR, 13 * HOUR]
+        assert list(get_bucket_starts(timestamps, "12hour", start=0)) == [0, 12 * HOUR, 12 * HOUR]
+
+    def test_default_start_is_first_timestamp(self):
+        assert list(get_bucket_starts(np.array([90000, 150000]), "1m")) == [60000, 120000]
+
+
+class TestAggregate:
+    @pytest.fixture
+    def datapoints(self):
+        yield [0, 1000, 2000, HOUR, HOUR + 500], [1.0, 3.0, 2.0, 5.0, 7.0]
+
+    def test_aggregates(self, datapoints):
+        res = aggregate(*datapoints, ["avg", "max", "min", "count", "sum", "tv", "dv", "cv"], "1h")
+        assert list(res.keys()) == [
+            "timestamp",
+            "average",
+            "max",
+            "min",
+            "count",
+            "sum",
+            "totalvariation",
+            "discretevariance",
+            "continuousvariance",
+        ]
+        assert list(res["timestamp"]) == [0, HOUR]
+        assert list(res["average"]) == [2, 6]
+        assert list(res["max"]) == [3, 7]
+        assert list(res["min"]) == [1, 5]
+        assert list(res["count"]) == [3, 2]
+        assert list(res["sum"]) == [6, 12]
+        assert list(res["totalvariation"]) == [3, 2]
+        assert np.allclose(res["discretevariance"], [2 / 3, 1])
+        assert np.allclose(res["continuousvariance"], [(4333.33 + 6333.33) / 2000 - 2.25 ** 2, 1 / 3], atol=1e-5)
+
+    def test_interpolation_uses_datapoints_outside_query(self):
+        timestamps = [-HOUR, 0.5 * HOUR, 1.5 * HOUR, 3 * HOUR]
+        values = [0.0, 10.0, 20.0, 50.0]
+        res = aggregate(timestamps, values, ["int", "step", "count"], "1h", start=0, end=3 * HOUR)
+        assert list(res["timestamp"]) == [0, HOUR]
+        assert np.allclose(res["interpolation"], [20 / 3, 15])
+        assert list(res["stepinterpolation"]) == [0, 10]
+        assert list(res["count"]) == [1, 1]
+
+    def test_unsorted_input_and_empty_buckets(self):
+        res = aggregate([3 * HOUR, 0, 3 * HOUR + 1], [1, 2, 3], ["sum"], "1h")
+        assert list(res["timestamp"]) == [0, 3 * HOUR]
+        assert list(res["sum"]) == [2, 4]
+
+    def test_no_datapoints(self):
+        res = aggregate([], [], ["avg", "average"], "1h")
+        assert list(res.keys()) == ["timestamp", "average"]
+        assert len(res["timestamp"]) == 0
+
+    def test_unknown_aggregate(self):
+        with pytest.raises(ValueError, match="Unknown aggregate"):
+            aggregate([0], [1], ["median"], "1h")
+
+
+class TestAggregateMatchesApi:
+    @pytest.fixture
+    def raw(self):
+        yield [minute * MINUTE for minute, _ in RAW_DATAPOINTS], [value for _, value in RAW_DATAPOINTS]
+
+    @pytest.mark.parametrize("granularity", ["1h", "2h"])
+    def test_aggregates_match_api_response(self, raw, granularity):
+        expected = api_response_columns(granularity)
+        res = aggregate(*raw, ALL_AGGREGATES, granularity, start=0, end=5 * HOUR)
+        assert sorted(res.keys()) == sorted(expected.keys())
+        assert list(res["timestamp"]) == list(expected["timestamp"])
+        for name in expected:
+            assert np.allclose(res[name], expected[name]), name
+
+    def test_rollup_matches_api_response(self):
+        fine = api_response_columns("1h")
+        expected = api_response_columns("2h")
+        res = rollup(fine, ["avg", "max", "min", "count", "sum", "dv"], "2h", origin=0)
+        assert list(res["timestamp"]) == list(expected["timestamp"])
+        for name in res:
+            assert np.allclose(res[name], expected[name]), name
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from cognite.client._alignment import align, fixed_grid, iter_align, union_grid
+
+
+@pytest.fixture
+def series():
+    yield {"a": ([0, 10, 20], [1.0, 2.0, 3.0]), "b": ([5, 10, 30], [10.0, 20.0, 30.0])}
+
+
+def assert_equal_with_nan(actual, expected):
+    np.testing.assert_array_equal(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float))
+
+
+class TestGrids:
+    def test_union_grid(self, series):
+        assert list(union_grid(series)) == [0, 5, 10, 20, 30]
+
+    def test_union_grid_of_no_series(self):
+        assert len(union_grid({})) == 0
+
+    def test_fixed_grid_excludes_end(self):
+        assert list(fixed_grid(0, 30000, "10s")) == [0, 10000, 20000]
+
+
+class TestAlign:
+    def test_no_fill(self, series):
+        df = align(series)
+        assert list(df.columns) == ["timestamp", "a", "b"]
+        assert list(df["timestamp"]) == [0, 5, 10, 20, 30]
+        assert_equal_with_nan(df["a"], [1, np.nan, 2, 3, np.nan])
+        assert_equal_with_nan(df["b"], [np.nan, 10, 20, np.nan, 30])
+
+    def test_last_fill(self, series):
+        df = align(series, fill="last")
+        assert_equal_with_nan(df["a"], [1, 1, 2, 3, 3])
+        assert_equal_with_nan(df["b"], [np.nan, 10, 20, 20, 30])
+
+    def test_step_fill_stops_at_last_datapoint(self, series):
+        df = align(series, fill="step")
+        assert_equal_with_nan(df["a"], [1, 1, 2, 3, np.nan])
+
+    def test_linear_fill(self, series):
+        df = align(series, grid=[0, 5, 15, 25], fill="linear")
+        assert_equal_with_nan(df["a"], [1, 1.5, 2.5, np.nan])
+        assert_equal_with_nan(df["b"], [np.nan, 10, 22.5, 27.5])
+
+    def test_empty_series(self):
+        df = align({"a": ([], []), "b": ([1], [2.0])}, fill="last")
+        assert_equal_with_nan(df["a"], [np.nan])
+        assert_equal_with_nan(df["b"], [2])
+
+    def test_chunks(self, series):
+        chunks = list(iter_align(series, fill="last", chunk_size=2))
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert_equal_with_nan(np.concatenate([chunk["b"] for chunk in chunks]), [np.nan, 10, 20, 20, 30])
+
+    def test_invalid_fill(self, series):
+        with pytest.raises(ValueError):
+            align(series, fill="nearest")
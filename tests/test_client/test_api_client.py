@@ -1,17 +1,20 @@
 # -*- coding: utf-8 -*-
+import gzip
+import json
 import re
 from unittest import mock
 from unittest.mock import MagicMock
 
 import pytest
-from requests import Session
+from requests import ConnectionError, Session
 from requests.adapters import HTTPAdapter
 from urllib3 import Retry
 
 from cognite import APIError
-from cognite.client._api_client import APIClient
+from cognite.client._api_client import APIClient, _get_idempotent_post_endpoint
+from cognite.client._governor import ConcurrencyGovernor
 from cognite.client.cognite_client import STATUS_FORCELIST
-from tests.conftest import MockReturnValue
+from tests.conftest import MockReturnValue, StubServer
 
 RESPONSE = {
     "data": {
@@ -316,3 +319,191 @@ class TestRequests:
         response = api_client._put(url, RESPONSE, headers={"Existing-Header": "SomeValue"})
 
         assert response.status_code == 200
+
+
+class TestUpload:
+    @pytest.fixture
+    def file_path(self, tmpdir):
+        file_path = str(tmpdir.join("upload.bin"))
+        with open(file_path, "wb") as f:
+            f.write(bytes(range(256)) * 10000)
+        yield file_path
+
+    @pytest.fixture
+    def file_content(self, file_path):
+        with open(file_path, "rb") as f:
+            yield f.read()
+
+    def test_upload_streams_file(self, api_client, file_path, file_content):
+        progress = []
+        with StubServer(lambda *args: (200, b"")) as server:
+            api_client._upload(
+                server.url + "/upload", file_path, progress_callback=lambda sent, total: progress.append((sent, total))
+            )
+        method, path, headers, body = server.requests[0]
+        assert (method, path) == ("PUT", "/upload")
+        assert body == file_content
+        assert headers["Content-Length"] == str(len(file_content))
+        assert "api-key" not in headers
+        assert len(progress) == 3
+        assert progress[-1] == (len(file_content), len(file_content))
+
+    def test_upload_chunked(self, api_client, file_path, file_content):
+        with StubServer(lambda *args: (200, b"")) as server:
+            api_client._upload(server.url + "/upload", file_path, chunked=True)
+        _, _, headers, body = server.requests[0]
+        assert headers["Transfer-Encoding"] == "chunked"
+        assert body == file_content
+
+    def test_upload_is_retried(self, api_client_with_retries, file_path, file_content):
+        responses = iter([503, 200])
+        with StubServer(lambda *args: (next(responses), b"")) as server:
+            api_client_with_retries._upload(server.url + "/upload", file_path)
+        assert len(server.requests) == 2
+        assert all(body == file_content for _, _, _, body in server.requests)
+
+    def test_upload_failed(self, api_client, file_path):
+        with StubServer(lambda *args: (400, {"error": {"code": 400, "message": "Bad upload"}})) as server:
+            with pytest.raises(APIError) as e:
+                api_client._upload(server.url + "/upload", file_path)
+        assert e.value.code == 400
+        assert e.value.message == "Bad upload"
+
+
+class TestIdempotentPostRetries:
+    @pytest.fixture
+    def failing_server(self):
+        state = {"failures": 2}
+
+        def handler(method, path, headers, body):
+            if state["failures"] > 0:
+                state["failures"] -= 1
+                return 503, {"error": {"code": 503, "message": "Service unavailable"}}
+            return 200, {"data": {}}
+
+        with StubServer(handler) as server:
+            server.state = state
+            yield server
+
+    @pytest.fixture
+    def governor(self):
+        yield ConcurrencyGovernor(backoff_base=0.01)
+
+    @pytest.fixture
+    def stub_client(self, failing_server, governor):
+        session = Session()
+        retry = Retry(total=3, read=3, connect=3, backoff_factor=0, status_forcelist=STATUS_FORCELIST)
+        session.mount("http://", HTTPAdapter(max_retries=retry))
+        yield APIClient(
+            request_session=session,
+            version="0.5",
+            project="test",
+            base_url=failing_server.url,
+            num_of_workers=1,
+            cookies={},
+            headers={},
+            timeout=10,
+            governor=governor,
+        )
+
+    def test_idempotent_post_is_retried_with_same_body(self, stub_client, failing_server):
+        res = stub_client._post("/timeseries/data/my%20ts", body={"items": [{"timestamp": 1, "value": 1}]})
+        assert res.status_code == 200
+        assert len(failing_server.requests) == 3
+        assert len(set(body for _, _, _, body in failing_server.requests)) == 1
+
+    def test_non_idempotent_post_is_not_retried(self, stub_client, failing_server):
+        with pytest.raises(APIError) as e:
+            stub_client._post("/assets", body={"items": []})
+        assert e.value.code == 503
+        assert len(failing_server.requests) == 1
+
+    def test_retries_are_bounded_by_retry_policy(self, stub_client, failing_server):
+        failing_server.state["failures"] = 10
+        with pytest.raises(APIError):
+            stub_client._post("/raw/db/table/create", body={"items": []})
+        assert len(failing_server.requests) == 4
+
+    def test_retries_are_bounded_by_retry_budget(self, stub_client, failing_server, governor):
+        budget = governor.retry_budget("timeseries/dataquery")
+        budget.min_retries_per_second = 0
+        budget.ratio = 0
+        budget._tokens = 1
+        with pytest.raises(APIError):
+            stub_client._post("/timeseries/dataquery", body={"items": []})
+        assert len(failing_server.requests) == 2
+        assert governor.metrics()["retry_budgets"] == {"timeseries/dataquery": 0}
+
+    @pytest.mark.parametrize(
+        "url, endpoint",
+        [
+            ("https://api/api/0.5/projects/test/timeseries/dataframe", "timeseries/dataframe"),
+            ("https://api/api/0.5/projects/test/timeseries/data/my%20ts", "timeseries/data"),
+            ("https://api/api/0.6/projects/test/analytics/models/1/predict", None),
+            ("https://api/api/0.6/projects/test/analytics/models/1/versions/2/predict", None),
+            ("https://api/api/0.5/projects/test/assets", None),
+        ],
+    )
+    def test_idempotent_post_endpoints(self, url, endpoint):
+        assert _get_idempotent_post_endpoint(url) == endpoint
+
+    def test_dataframe_post_is_retried(self, stub_client, failing_server):
+        res = stub_client._post("/timeseries/dataframe", body={"items": [{"name": "ts"}]})
+        assert res.status_code == 200
+        assert len(failing_server.requests) == 3
+
+
+class TestPostInChunks:
+    @pytest.fixture
+    def echo_server(self):
+        def handler(method, path, headers, body):
+            items = json.loads(gzip.decompress(body))["items"]
+            if "bad" in items:
+                return 400, {"error": {"code": 400, "message": "Invalid item"}}
+            return 200, {"data": {"items": [{"id": item} for item in items]}}
+
+        with StubServer(handler) as server:
+            yield server
+
+    @pytest.fixture
+    def stub_client(self, echo_server):
+        yield APIClient(
+            request_session=Session(),
+            version="0.5",
+            project="test",
+            base_url=echo_server.url,
+            num_of_workers=4,
+            cookies={},
+            headers={},
+            timeout=10,
+        )
+
+    def test_items_are_returned_in_order(self, stub_client, echo_server):
+        items = stub_client._post_in_chunks("/events", list(range(25)), chunk_size=3)
+        assert items == [{"id": i} for i in range(25)]
+        assert len(echo_server.requests) == 9
+
+    def test_failed_chunks_are_reported(self, stub_client, echo_server):
+        with pytest.raises(APIError) as e:
+            stub_client._post_in_chunks("/events", [0, 1, "bad", 3, 4, 5, 6, "bad"], chunk_size=2, max_workers=2)
+        assert len(echo_server.requests) == 4
+        assert e.value.code == 400
+        assert e.value.extra["succeeded"] == [{"id": 0}, {"id": 1}, {"id": 4}, {"id": 5}]
+        assert e.value.extra["failed"] == ["bad", 3, 6, "bad"]
+        assert [error.message for error in e.value.extra["errors"]] == ["Invalid item"] * 2
+
+    def test_transport_errors_are_reported_per_chunk(self, stub_client, echo_server):
+        post = stub_client._post
+
+        def flaky_post(url, body, **kwargs):
+            if "drop" in body["items"]:
+                raise ConnectionError("Connection aborted")
+            return post(url, body, **kwargs)
+
+        with mock.patch.object(stub_client, "_post", side_effect=flaky_post):
+            with pytest.raises(APIError) as e:
+                stub_client._post_in_chunks("/events", [0, 1, "drop", 3, 4, 5], chunk_size=2)
+        assert len(echo_server.requests) == 2
+        assert e.value.extra["succeeded"] == [{"id": 0}, {"id": 1}, {"id": 4}, {"id": 5}]
+        assert e.value.extra["failed"] == ["drop", 3]
+        assert isinstance(e.value.extra["errors"][0], ConnectionError)
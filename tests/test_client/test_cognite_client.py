@@ -1,8 +1,15 @@
+import json
 import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor as Pool
+from unittest import mock
 
 import pytest
 
 from cognite import APIError, CogniteClient
+from tests.conftest import StubServer
 
 
 @pytest.fixture
@@ -42,7 +49,7 @@ class TestCogniteClient:
         assert e.value.code == 405
 
     def test_project_is_correct(self, client):
-        assert client._project == "mltest"
+        assert client.project == "mltest"
 
     def assert_config_is_correct(self, client, base_url, num_of_retries, num_of_workers, timeout):
         assert client._base_url == base_url
@@ -67,3 +74,81 @@ class TestCogniteClient:
             timeout=timeout,
         )
         self.assert_config_is_correct(client, base_url, num_of_retries, num_of_workers, timeout)
+
+
+@pytest.fixture
+def login_server():
+    def handler(method, path, headers, body):
+        body = {"data": {"user": "user", "project": "my-project", "projectId": 1, "loggedIn": True}}
+        return 200, json.dumps(body).encode()
+
+    with StubServer(handler) as server:
+        yield server
+
+
+class TestStartup:
+    def test_import_does_not_load_heavy_dependencies(self):
+        code = (
+            "import sys, cognite; print(sorted(m for m in ['pandas', 'numpy', 'google.protobuf'] if m in sys.modules))"
+        )
+        assert subprocess.check_output([sys.executable, "-c", code]).decode().strip() == "[]"
+
+    def test_client_and_sub_clients_do_not_load_heavy_dependencies(self):
+        code = (
+            "import sys; from cognite import CogniteClient; c = CogniteClient(api_key='key', project='project'); "
+            "[c.assets, c.datapoints, c.events, c.files, c.raw, c.time_series, c.experimental]; "
+            "print(sorted(m for m in ['pandas', 'numpy', 'google.protobuf'] if m in sys.modules))"
+        )
+        assert subprocess.check_output([sys.executable, "-c", code]).decode().strip() == "[]"
+
+    def test_project_is_looked_up_on_first_use(self, login_server):
+        client = CogniteClient(api_key="key", base_url=login_server.url)
+        assert login_server.requests == []
+        client.assets
+        client.time_series
+        assert client.project == "my-project"
+        assert [request[1] for request in login_server.requests] == ["/login/status"]
+
+    def test_given_project_is_not_looked_up(self, login_server):
+        client = CogniteClient(api_key="key", project="other-project", base_url=login_server.url)
+        assert client.datapoints._base_url.endswith("/projects/other-project")
+        assert login_server.requests == []
+
+    def test_login_cache(self, login_server, tmpdir):
+        cache_path = os.path.join(str(tmpdir), "login_status.json")
+        with mock.patch("cognite.client.cognite_client.DEFAULT_LOGIN_CACHE_PATH", cache_path):
+            for _ in range(2):
+                assert (
+                    CogniteClient(api_key="key", base_url=login_server.url, login_cache_ttl=60).project == "my-project"
+                )
+            assert len(login_server.requests) == 1
+            with open(cache_path) as f:
+                assert "key" not in f.read()
+
+            assert CogniteClient(api_key="other-key", base_url=login_server.url, login_cache_ttl=60).project
+            assert len(login_server.requests) == 2
+
+    def test_expired_login_cache(self, login_server, tmpdir):
+        cache_path = os.path.join(str(tmpdir), "login_status.json")
+        with mock.patch("cognite.client.cognite_client.DEFAULT_LOGIN_CACHE_PATH", cache_path):
+            CogniteClient(api_key="key", base_url=login_server.url, login_cache_ttl=60).project
+            later = time.time() + 120
+            with mock.patch("cognite.client.cognite_client.time.time", return_value=later):
+                CogniteClient(api_key="key", base_url=login_server.url, login_cache_ttl=60).project
+            assert len(login_server.requests) == 2
+
+
+class TestSubClients:
+    def test_sub_clients_are_cached(self):
+        client = CogniteClient(api_key="key", project="project")
+        assert client.datapoints is client.datapoints
+        assert client.login is client.login
+        assert client.experimental.time_series is client.experimental.time_series
+        assert client.experimental.analytics.models is client.experimental.analytics.models
+        assert client.datapoints is not client.experimental.datapoints
+
+    def test_sub_clients_are_created_once_across_threads(self):
+        client = CogniteClient(api_key="key", project="project")
+        with Pool(8) as p:
+            clients = list(p.map(lambda _: client.assets, range(100)))
+        assert all(c is clients[0] for c in clients)
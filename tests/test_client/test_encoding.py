@@ -0,0 +1,85 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from cognite._auxiliary._protobuf_descriptors import _api_timeseries_data_v2_pb2
+from cognite.client._encoding import encode_body, is_datapoints_body
+from cognite.client.stable.datapoints import DatapointBatch
+
+
+@pytest.fixture
+def batch():
+    yield DatapointBatch(1514764800000 + np.arange(25000) * 1000, np.random.RandomState(0).randn(25000) * 1e6)
+
+
+class TestIsDatapointsBody:
+    def test_datapoints_bodies(self, batch):
+        assert is_datapoints_body({"items": batch})
+        assert is_datapoints_body({"items": [{"name": "a", "datapoints": batch}]})
+
+    def test_other_bodies(self, batch):
+        assert not is_datapoints_body({"items": []})
+        assert not is_datapoints_body({"items": [{"name": "a", "datapoints": [{"timestamp": 0, "value": 1}]}]})
+        assert not is_datapoints_body({"items": batch, "other": 1})
+        assert not is_datapoints_body({"items": [{"name": "a", "datapoints": batch, "id": 1}]})
+
+
+class TestEncodeBody:
+    def test_single_time_series(self, batch):
+        decoded = json.loads(encode_body({"items": batch}, use_gzip=False))
+        assert decoded == {"items": batch.to_json()}
+
+    def test_floats_round_trip(self):
+        values = np.array([0.1, 1 / 3, 1e-300, 1.7976931348623157e308, -0.0, 5.0])
+        decoded = json.loads(encode_body({"items": DatapointBatch(np.arange(6), values)}, use_gzip=False))
+        assert [item["value"] for item in decoded["items"]] == values.tolist()
+
+    def test_multiple_time_series_with_gzip(self, batch):
+        strings = DatapointBatch([0, 1], ["on", 'o"ff'])
+        body = {"items": [{"name": "a", "datapoints": batch}, {"name": "bé", "datapoints": strings}]}
+        decoded = json.loads(gzip.decompress(encode_body(body, use_gzip=True)))
+        assert decoded == {
+            "items": [{"name": "a", "datapoints": batch.to_json()}, {"name": "bé", "datapoints": strings.to_json()}]
+        }
+
+    def test_non_finite_values_encoded_as_by_json(self):
+        body = {"items": DatapointBatch([0, 1], [np.nan, np.inf])}
+        expected = b'{"items":[{"timestamp":0,"value":NaN},{"timestamp":1,"value":Infinity}]}'
+        assert encode_body(body, use_gzip=False) == expected
+
+    def test_other_bodies_encoded_with_json(self):
+        body = {"items": [{"name": "a"}], "cursor": None}
+        assert encode_body(body, use_gzip=False) == json.dumps(body).encode()
+        assert json.loads(gzip.decompress(encode_body(body, use_gzip=True))) == body
+
+
+class TestEncodeBodyProtobuf:
+    def test_matches_protobuf_library(self):
+        timestamps = [0, 1, 127, 128, 16383, 16384, 1514764800000, 2 ** 63 - 1, -1, -(2 ** 63)]
+        values = [0.0, -0.0, 1.5, -2.25, 1e-300, 1e300, np.inf, -np.inf, 1 / 3, 7.0]
+        expected = _api_timeseries_data_v2_pb2.TimeseriesData()
+        for t, v in zip(timestamps, values):
+            expected.numericData.points.add(timestamp=t, value=v)
+        decoded = _api_timeseries_data_v2_pb2.TimeseriesData()
+        decoded.ParseFromString(
+            encode_body({"items": DatapointBatch(timestamps, values)}, use_gzip=False, protobuf=True)
+        )
+        assert decoded == expected
+
+    def test_multiple_time_series_with_gzip(self, batch):
+        strings = DatapointBatch([0, 1], ["on", "øff"])
+        body = {"items": [{"name": "a", "datapoints": batch}, {"name": "bé", "datapoints": strings}]}
+        decoded = _api_timeseries_data_v2_pb2.MultiNamedTimeseriesData()
+        decoded.ParseFromString(gzip.decompress(encode_body(body, use_gzip=True, protobuf=True)))
+        a, b = decoded.namedTimeseriesData
+        assert (a.name, b.name) == ("a", "bé")
+        assert [(p.timestamp, p.value) for p in a.numericData.points] == list(
+            zip(batch.timestamps.tolist(), batch.values.tolist())
+        )
+        assert [(p.timestamp, p.value) for p in b.stringData.points] == [(0, "on"), (1, "øff")]
+
+    def test_only_datapoint_bodies(self):
+        with pytest.raises(ValueError):
+            encode_body({"items": []}, use_gzip=False, protobuf=True)
@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor as Pool
+
+import pytest
+
+from cognite import CogniteClient
+from cognite.client._executor import WorkerExecutor
+
+
+class ConcurrencyCounter:
+    def __init__(self):
+        self.current = 0
+        self.max = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, x):
+        with self.lock:
+            self.current += 1
+            self.max = max(self.max, self.current)
+        time.sleep(0.01)
+        with self.lock:
+            self.current -= 1
+        return x * 2
+
+
+pytest_executor = None
+
+
+def map_in_child(queue):
+    queue.put(pytest_executor.map(lambda x: x + 1, range(5)))
+
+
+class TestWorkerExecutor:
+    def test_map_returns_results_in_order(self):
+        executor = WorkerExecutor(4)
+        assert executor.map(lambda x, y: x + y, range(20), range(20)) == [2 * i for i in range(20)]
+        assert executor.map(lambda x: x, []) == []
+
+    def test_map_limits_concurrency_of_call(self):
+        executor = WorkerExecutor(8)
+        counter = ConcurrencyCounter()
+        assert executor.map(counter, range(20), max_workers=2) == [2 * i for i in range(20)]
+        assert counter.max == 2
+
+    def test_concurrency_is_limited_across_calls(self):
+        executor = WorkerExecutor(3)
+        counter = ConcurrencyCounter()
+        with Pool(4) as p:
+            for future in [p.submit(executor.map, counter, range(10)) for _ in range(4)]:
+                future.result()
+        assert counter.max == 3
+
+    def test_threads_are_reused(self):
+        executor = WorkerExecutor(2)
+        threads = set()
+        for _ in range(5):
+            executor.map(lambda x: threads.add(threading.current_thread()), range(4))
+        assert len(threads) <= 2
+
+    def test_nested_calls_run_inline(self):
+        executor = WorkerExecutor(1)
+        res = executor.submit(lambda: executor.map(lambda x: x + 1, range(3), max_workers=3)).result(timeout=5)
+        assert res == [1, 2, 3]
+
+    def test_exception_is_raised(self):
+        executor = WorkerExecutor(4)
+
+        def fail(x):
+            if x == 3:
+                raise ValueError("failed")
+            return x
+
+        with pytest.raises(ValueError, match="failed"):
+            executor.map(fail, range(10))
+
+    def test_shutdown(self):
+        executor = WorkerExecutor(2)
+        executor.map(lambda x: x, range(4))
+        executor.shutdown()
+        with pytest.raises(RuntimeError):
+            executor.map(lambda x: x, range(4))
+
+    @pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="Requires os.register_at_fork")
+    def test_usable_after_fork(self):
+        global pytest_executor
+        pytest_executor = WorkerExecutor(2)
+        pytest_executor.map(lambda x: x, range(4))
+
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        process = context.Process(target=map_in_child, args=(queue,))
+        process.start()
+        assert queue.get(timeout=10) == [1, 2, 3, 4, 5]
+        process.join()
+
+
+class TestClientExecutor:
+    def test_sub_clients_share_executor(self):
+        client = CogniteClient(api_key="key", project="project", num_of_workers=3)
+        assert client.datapoints._executor is client._executor
+        assert client.experimental.datapoints._executor is client._executor
+        assert client._executor.max_workers == 3
+
+    def test_context_manager_closes_executor(self):
+        with CogniteClient(api_key="key", project="project") as client:
+            client._executor.map(lambda x: x, range(4))
+        with pytest.raises(RuntimeError):
+            client._executor.map(lambda x: x, range(4))
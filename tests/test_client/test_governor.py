@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor as Pool
+
+import pytest
+
+from cognite import CogniteClient
+from cognite.client._governor import ConcurrencyGovernor, _parse_retry_after
+from tests.conftest import StubServer
+
+
+class TestConcurrencyGovernor:
+    def test_additive_increase_multiplicative_decrease(self):
+        governor = ConcurrencyGovernor(max_concurrency=16, backoff_base=0.01)
+        governor.on_throttle()
+        assert governor.metrics()["concurrency_limit"] == 8
+        for _ in range(9):
+            governor.on_success()
+        assert governor.metrics()["concurrency_limit"] == 9
+        for _ in range(100):
+            governor.on_success()
+        assert governor.metrics()["concurrency_limit"] == 16
+
+    def test_throttles_within_pause_decrease_once(self):
+        governor = ConcurrencyGovernor(max_concurrency=16)
+        for _ in range(5):
+            governor.on_throttle(retry_after=1)
+        metrics = governor.metrics()
+        assert metrics["concurrency_limit"] == 8
+        assert metrics["throttled"] == 5
+        assert 0.9 < metrics["paused_for"] <= 1.1
+
+    def test_limit_does_not_go_below_min(self):
+        governor = ConcurrencyGovernor(max_concurrency=4, min_concurrency=2)
+        for _ in range(3):
+            governor.on_throttle(retry_after=0)
+        assert governor.metrics()["concurrency_limit"] == 2
+
+    def test_acquire_bounds_concurrency(self):
+        governor = ConcurrencyGovernor(max_concurrency=3)
+        in_flight = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def request(_):
+            governor.acquire()
+            with lock:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            time.sleep(0.01)
+            with lock:
+                in_flight["now"] -= 1
+            governor.release()
+
+        with Pool(10) as p:
+            list(p.map(request, range(30)))
+        assert in_flight["max"] == 3
+        assert governor.metrics()["requests"] == 30
+
+    def test_acquire_waits_for_pause(self):
+        governor = ConcurrencyGovernor(max_concurrency=3)
+        governor.on_throttle(retry_after=0.2)
+        t0 = time.time()
+        governor.acquire()
+        assert time.time() - t0 >= 0.2
+
+    def test_token_bucket_limits_rate(self):
+        governor = ConcurrencyGovernor(max_requests_per_second=20)
+        t0 = time.time()
+        for _ in range(30):
+            governor.acquire()
+            governor.release()
+        assert time.time() - t0 >= 0.45
+
+    @pytest.mark.parametrize("value, expected", [(None, None), ("2", 2), ("-1", 0), ("invalid", None)])
+    def test_parse_retry_after(self, value, expected):
+        assert _parse_retry_after(value) == expected
+
+
+class TestGovernedClient:
+    @pytest.fixture
+    def throttling_server(self):
+        state = {"throttle": 3, "now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def handler(method, path, headers, body):
+            with lock:
+                state["now"] += 1
+                state["max"] = max(state["max"], state["now"])
+                throttle = state["throttle"] > 0
+                state["throttle"] -= 1
+            time.sleep(0.01)
+            with lock:
+                state["now"] -= 1
+            if throttle:
+                return 429, {"error": {"code": 429, "message": "Too many requests"}}
+            return 200, {"data": {}}
+
+        with StubServer(handler) as server:
+            server.state = state
+            yield server
+
+    @pytest.fixture
+    def client(self, throttling_server):
+        yield CogniteClient(
+            api_key="key", project="test", base_url=throttling_server.url, num_of_retries=5, max_concurrency=4
+        )
+
+    def test_throttled_requests_are_retried(self, client, throttling_server):
+        t0 = time.time()
+        with Pool(10) as p:
+            responses = list(p.map(lambda _: client.get("/login/status"), range(20)))
+        assert time.time() - t0 >= 0.25
+        assert all(res.status_code == 200 for res in responses)
+        assert throttling_server.state["max"] <= 4
+        metrics = client.metrics()
+        assert metrics["throttled"] == 3
+        assert metrics["concurrency_limit"] == 4
+        assert metrics["in_flight"] == 0
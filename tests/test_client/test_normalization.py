@@ -0,0 +1,82 @@
+from copy import deepcopy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cognite.client._normalization import items_to_pandas
+from cognite.client.stable.assets import AssetListResponse
+from cognite.client.stable.events import EventListResponse
+from cognite.client.stable.time_series import TimeSeriesResponse
+
+
+@pytest.fixture
+def items():
+    yield [
+        {"id": 1, "type": "alarm", "metadata": {"severity": "high", "source": "a"}},
+        {"id": 2, "type": "alarm"},
+        {"id": 3, "type": "alarm", "metadata": {"severity": "low", "type": "override"}},
+        {"id": 4, "type": "alarm", "metadata": {}},
+    ]
+
+
+def previous_to_pandas(items):
+    items = deepcopy(items)
+    for d in items:
+        if d.get("metadata"):
+            d.update(d.pop("metadata"))
+    return pd.DataFrame(items)
+
+
+class TestItemsToPandas:
+    def test_expand_metadata(self, items):
+        df = items_to_pandas(items)
+        assert list(df.columns) == ["id", "type", "severity", "source"]
+        assert list(df["type"]) == ["alarm", "alarm", "override", "alarm"]
+        assert df["severity"].tolist()[0] == "high" and pd.isna(df["severity"][1])
+        assert "metadata" in items[0]
+
+    def test_same_as_previous_conversion(self, items):
+        pd.testing.assert_frame_equal(
+            items_to_pandas(items[:3]), previous_to_pandas(items[:3]), check_like=True, check_dtype=False
+        )
+
+    def test_metadata_prefix(self, items):
+        df = items_to_pandas(items, metadata_prefix="metadata.")
+        assert list(df.columns) == ["id", "type", "metadata.severity", "metadata.source", "metadata.type"]
+        assert list(df["type"]) == ["alarm"] * 4
+
+    def test_keep_metadata_dicts(self, items):
+        df = items_to_pandas(items, expand_metadata=False)
+        assert list(df.columns) == ["id", "type", "metadata"]
+        assert df["metadata"][0] is items[0]["metadata"]
+
+    def test_categorical(self):
+        items = [{"id": i, "type": "alarm", "description": "event {}".format(i)} for i in range(10)]
+        df = items_to_pandas(items, categorical=True)
+        assert df["type"].dtype == "category"
+        assert df["description"].dtype == object
+        assert df["id"].dtype == np.int64
+
+    def test_separate_metadata(self, items):
+        df, metadata = items_to_pandas(items, separate_metadata=True)
+        assert list(df.columns) == ["id", "type"]
+        assert list(metadata.columns) == ["severity", "source", "type"]
+        assert all(isinstance(dtype, pd.SparseDtype) for dtype in metadata.dtypes)
+        assert metadata["type"].sparse.density == 0.25
+        assert metadata.sparse.to_dense()["severity"][2] == "low"
+
+    def test_no_items(self):
+        assert items_to_pandas([]).empty
+
+
+class TestResponses:
+    def test_events_and_time_series_expand_metadata(self, items):
+        for response in [EventListResponse, TimeSeriesResponse]:
+            df = response({"data": {"items": items}}).to_pandas()
+            assert list(df.columns) == ["id", "type", "severity", "source"]
+
+    def test_assets_keep_metadata_dicts_by_default(self, items):
+        response = AssetListResponse({"data": {"items": items}})
+        assert list(response.to_pandas().columns) == ["id", "type", "metadata"]
+        assert "metadata.source" in response.to_pandas(expand_metadata=True).columns
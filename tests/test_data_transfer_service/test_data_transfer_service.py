@@ -1,9 +1,13 @@
 import json
+import threading
 from io import BytesIO
+from unittest import mock
 
 import pandas as pd
 import pytest
 
+from cognite.client._utils import get_aggregate_func_return_name
+from cognite.client.experimental.time_series import TimeSeriesResponse
 from cognite.data_transfer_service import (
     DataSpec,
     DataSpecValidationError,
@@ -48,6 +52,19 @@ def files_data_spec_dto():
     yield FilesDataSpec(file_ids={"file1": 1})
 
 
+@pytest.fixture
+def mock_get_by_id(request):
+    """Resolves the ids 1 to n to the names ts_1 to ts_n, where n is 3 unless parametrized indirectly."""
+    num_of_time_series = getattr(request, "param", 3)
+    with mock.patch(
+        "cognite.client.experimental.time_series.TimeSeriesClient.get_multiple_time_series_by_id"
+    ) as mock_get:
+        mock_get.return_value = TimeSeriesResponse(
+            {"data": {"items": [{"id": i, "name": "ts_{}".format(i)} for i in range(1, num_of_time_series + 1)]}}
+        )
+        yield mock_get
+
+
 class TestDataTransferService:
     def test_instantiate_data_spec(self, ts_data_spec_dtos):
         DataSpec(ts_data_spec_dtos, files_data_spec=FilesDataSpec(file_ids={"name": 123}))
@@ -232,3 +249,218 @@ class TestDataTransferService:
         dts = DataTransferService(data_spec, num_of_workers=3)
         for ts_label in ["ts1", "ts2", "ts3", "ts4"]:
             assert dts.get_time_series_name(ts_label) == TEST_TS_1_NAME
+
+
+class TestDataTransferServiceDownloads:
+    @pytest.fixture
+    def mock_get_frame(self):
+        def get_datapoints_frame(time_series, aggregates, granularity, start, end=None, **kwargs):
+            if mock_get.barrier is not None:
+                mock_get.barrier.wait()
+            df = pd.DataFrame({"timestamp": [0, 1, 2]})
+            for ts in time_series:
+                for agg in ts["aggregates"]:
+                    df[ts["name"] + "|" + get_aggregate_func_return_name(agg)] = [1.0, 2.0, 3.0]
+            return df
+
+        with mock.patch("cognite.client.stable.datapoints.DatapointsClient.get_datapoints_frame") as mock_get:
+            mock_get.side_effect = get_datapoints_frame
+            mock_get.barrier = None
+            yield mock_get
+
+    @pytest.fixture
+    def data_spec(self):
+        ds1 = TimeSeriesDataSpec(
+            time_series=[TimeSeries(id=1, label="a"), TimeSeries(id=2, aggregates=["min"], label="b")],
+            aggregates=["avg"],
+            granularity="1h",
+            start=0,
+            end=100,
+            label="ds1",
+        )
+        ds2 = TimeSeriesDataSpec(
+            time_series=[TimeSeries(id=2, aggregates=["max", "min"]), TimeSeries(id=3)],
+            aggregates=["average"],
+            granularity="1h",
+            start=0,
+            end=100,
+            label="ds2",
+        )
+        ds3 = TimeSeriesDataSpec(
+            time_series=[TimeSeries(id=1)], aggregates=["avg"], granularity="1d", start=0, end=100, label="ds3"
+        )
+        yield DataSpec(time_series_data_specs=[ds1, ds2, ds3])
+
+    def test_get_dataframes_coalesces_requests(self, data_spec, mock_get_by_id, mock_get_frame):
+        dts = DataTransferService(data_spec)
+        dfs = dts.get_dataframes()
+
+        assert mock_get_by_id.call_count == 1
+        assert sorted(mock_get_by_id.call_args[1]["ids"]) == [1, 2, 3]
+        assert mock_get_frame.call_count == 2
+        coalesced_time_series = max((call[0][0] for call in mock_get_frame.call_args_list), key=len)
+        assert coalesced_time_series == [
+            {"name": "ts_1", "aggregates": ["avg"]},
+            {"name": "ts_2", "aggregates": ["min", "max"]},
+            {"name": "ts_3", "aggregates": ["average"]},
+        ]
+
+        assert list(dfs.keys()) == ["ds1", "ds2", "ds3"]
+        assert list(dfs["ds1"].columns) == ["timestamp", "a", "b"]
+        assert list(dfs["ds2"].columns) == ["timestamp", "ts_2|max", "ts_2|min", "ts_3"]
+        assert list(dfs["ds3"].columns) == ["timestamp", "ts_1"]
+
+    def test_names_are_resolved_once(self, data_spec, mock_get_by_id, mock_get_frame):
+        dts = DataTransferService(data_spec)
+        dts.get_dataframe("ds1")
+        dts.get_dataframe("ds2")
+        assert dts.get_time_series_name("b", dataframe_label="ds1") == "ts_2"
+        assert mock_get_by_id.call_count == 1
+        assert mock_get_frame.call_count == 2
+
+    def test_specs_are_downloaded_concurrently(self, data_spec, mock_get_by_id, mock_get_frame):
+        # Both downloads must be in progress at once to get past the barrier
+        mock_get_frame.barrier = threading.Barrier(2, timeout=10)
+        dts = DataTransferService(data_spec, num_of_workers=4)
+        labels = [label for label, df in dts.iter_dataframes()]
+        assert sorted(labels) == ["ds1", "ds2", "ds3"]
+        assert all(call[1]["workers"] == 2 for call in mock_get_frame.call_args_list)
+
+    def test_get_data_fetches_files_concurrently(self, data_spec, mock_get_by_id, mock_get_frame):
+        data_spec.files_data_spec = FilesDataSpec(file_ids={"f1": 1, "f2": 2})
+        # Both files must be downloading at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=10)
+
+        def download_file(id, get_contents):
+            barrier.wait()
+            return str(id).encode()
+
+        with mock.patch("cognite.client.stable.files.FilesClient.download_file") as mock_download:
+            mock_download.side_effect = download_file
+            dts = DataTransferService(data_spec, num_of_workers=4)
+            dataframes, files = dts.get_data()
+        assert list(dataframes.keys()) == ["ds1", "ds2", "ds3"]
+        assert {name: f.getvalue() for name, f in files.items()} == {"f1": b"1", "f2": b"2"}
+
+
+class TestMissingDataStrategies:
+    @pytest.fixture
+    def mock_get_frame(self):
+        df = pd.DataFrame(
+            {
+                "timestamp": [0, 1, 2, 3],
+                "ts_1|average": [1.0, None, None, 4.0],
+                "ts_2|average": [1.0, None, None, 4.0],
+                "ts_2|max": [1.0, None, None, 4.0],
+                "ts_3|average": [1.0, None, None, 4.0],
+            }
+        )
+        with mock.patch("cognite.client.stable.datapoints.DatapointsClient.get_datapoints_frame") as mock_get:
+            mock_get.return_value = df
+            yield mock_get
+
+    def test_local_and_global_strategies(self, mock_get_by_id, mock_get_frame):
+        tsds = TimeSeriesDataSpec(
+            time_series=[
+                TimeSeries(id=1, missing_data_strategy="ffill"),
+                TimeSeries(id=2, aggregates=["avg", "max"]),
+                TimeSeries(id=3, missing_data_strategy="none"),
+            ],
+            aggregates=["avg"],
+            granularity="1m",
+            missing_data_strategy="linearInterpolation",
+        )
+        df = DataTransferService(DataSpec([tsds])).get_dataframe()
+
+        assert list(df.columns) == ["timestamp", "ts_1", "ts_2|average", "ts_2|max", "ts_3"]
+        assert list(df["ts_1"]) == [1.0, 1.0, 1.0, 4.0]
+        assert list(df["ts_2|average"]) == [1.0, 2.0, 3.0, 4.0]
+        assert list(df["ts_2|max"]) == [1.0, 2.0, 3.0, 4.0]
+        assert df["ts_3"].isnull().sum() == 2
+
+    def test_coalesced_specs_only_get_their_own_timestamps(self, mock_get_by_id):
+        df = pd.DataFrame(
+            {"timestamp": [0, 1, 2, 3], "ts_1|average": [1.0, None, 3.0, None], "ts_2|average": [None, 2.0, None, 4.0]}
+        )
+        ds1 = TimeSeriesDataSpec(
+            time_series=[TimeSeries(id=1)], aggregates=["avg"], granularity="1m", start=0, end=10, label="ds1"
+        )
+        ds2 = TimeSeriesDataSpec(
+            time_series=[TimeSeries(id=2)],
+            aggregates=["avg"],
+            granularity="1m",
+            start=0,
+            end=10,
+            label="ds2",
+            missing_data_strategy="linearInterpolation",
+        )
+        with mock.patch("cognite.client.stable.datapoints.DatapointsClient.get_datapoints_frame") as mock_get:
+            mock_get.return_value = df
+            dfs = DataTransferService(DataSpec([ds1, ds2])).get_dataframes()
+
+        assert mock_get.call_count == 1
+        assert list(dfs["ds1"]["timestamp"]) == [0, 2]
+        assert list(dfs["ds1"]["ts_1"]) == [1.0, 3.0]
+        assert list(dfs["ds2"]["timestamp"]) == [1, 3]
+        assert list(dfs["ds2"]["ts_2"]) == [2.0, 4.0]
+
+
+@pytest.mark.parametrize("mock_get_by_id", [1], indirect=True)
+class TestMaterializedDataframes:
+    @pytest.fixture(autouse=True)
+    def pyarrow(self):
+        pytest.importorskip("pyarrow")
+
+    @pytest.fixture
+    def mock_get_frame(self):
+        def get_datapoints_frame(time_series, aggregates, granularity, start, end=None, **kwargs):
+            timestamps = [t for t in range(0, 100000, 1000) if start <= t < end]
+            df = pd.DataFrame({"timestamp": timestamps})
+            for agg in time_series[0]["aggregates"]:
+                df["ts_1|" + get_aggregate_func_return_name(agg)] = [float(end) for _ in timestamps]
+            return df
+
+        with mock.patch("cognite.client.stable.datapoints.DatapointsClient.get_datapoints_frame") as mock_get:
+            mock_get.side_effect = get_datapoints_frame
+            yield mock_get
+
+    @staticmethod
+    def get_dataframe(materialization_dir, now, aggregates=None, granularity="1s"):
+        tsds = TimeSeriesDataSpec(
+            time_series=[TimeSeries(id=1)],
+            aggregates=aggregates or ["avg"],
+            granularity=granularity,
+            start="10s-ago",
+            end="now",
+            label="ds",
+        )
+        dts = DataTransferService(DataSpec(time_series_data_specs=[tsds]), materialization_dir=materialization_dir)
+        with mock.patch("cognite.client._utils.time.time", return_value=now):
+            return dts.get_dataframe("ds", drop_agg_suffix=False)
+
+    def test_only_tail_is_fetched(self, tmpdir, mock_get_by_id, mock_get_frame):
+        df = self.get_dataframe(str(tmpdir), now=10)
+        assert list(df["timestamp"]) == list(range(0, 10000, 1000))
+
+        df = self.get_dataframe(str(tmpdir), now=13)
+        assert mock_get_frame.call_args[0][3:5] == (9000, 13000)
+        assert list(df["timestamp"]) == list(range(3000, 13000, 1000))
+        assert list(df["ts_1|average"]) == [10000.0] * 6 + [13000.0] * 4
+
+    def test_refetch_starts_at_window_if_stored_frame_is_older(self, tmpdir, mock_get_by_id, mock_get_frame):
+        self.get_dataframe(str(tmpdir), now=10)
+        df = self.get_dataframe(str(tmpdir), now=30)
+        assert mock_get_frame.call_args[0][3:5] == (20000, 30000)
+        assert list(df["timestamp"]) == list(range(20000, 30000, 1000))
+
+    def test_window_is_aligned_to_granularity_unit(self, tmpdir, mock_get_by_id, mock_get_frame):
+        self.get_dataframe(str(tmpdir), now=10, granularity="2s")
+        df = self.get_dataframe(str(tmpdir), now=11, granularity="2s")
+        assert df["timestamp"].iloc[0] == 1000
+
+    def test_specs_are_materialized_separately(self, tmpdir, mock_get_by_id, mock_get_frame):
+        self.get_dataframe(str(tmpdir), now=10)
+        df = self.get_dataframe(str(tmpdir), now=13, aggregates=["max"])
+        assert mock_get_frame.call_args[0][3:5] == (3000, 13000)
+        assert list(df.columns) == ["timestamp", "ts_1|max"]
+        assert len(tmpdir.listdir()) == 2
@@ -1,8 +1,14 @@
-from random import randint
+import json
+import threading
+import time
+from random import randint, random
 
 import pytest
+from requests import Session
 
 from cognite import CogniteClient
+from cognite.client.experimental.analytics.models import ModelsClient
+from tests.conftest import StubServer
 
 models = CogniteClient().experimental.analytics.models
 
@@ -33,3 +39,64 @@ class TestModels:
     def test_get_source_package(self, created_source_package):
         sp = models.get_source_package(created_source_package["id"])
         assert sp["id"] == created_source_package["id"]
+
+
+class TestOnlinePredictInBatches:
+    @pytest.fixture
+    def prediction_server(self):
+        in_flight = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def handler(method, path, headers, body):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            time.sleep(random() / 50)
+            instances = json.loads(body)["instances"]
+            with lock:
+                in_flight["now"] -= 1
+            return 200, {"data": {"predictions": [instance * 2 for instance in instances]}}
+
+        with StubServer(handler) as server:
+            server.in_flight = in_flight
+            yield server
+
+    @pytest.fixture
+    def stub_models(self, prediction_server):
+        yield ModelsClient(
+            request_session=Session(),
+            project="test",
+            base_url=prediction_server.url,
+            num_of_workers=4,
+            cookies={},
+            headers={},
+            timeout=10,
+        )
+
+    def test_predictions_in_input_order(self, stub_models, prediction_server):
+        predictions = stub_models.online_predict_in_batches(model_id=1, instances=list(range(250)), batch_size=10)
+        assert predictions == [i * 2 for i in range(250)]
+        assert len(prediction_server.requests) == 25
+        assert all(
+            path == "/api/0.6/projects/test/analytics/models/1/predict" for _, path, _, _ in prediction_server.requests
+        )
+
+    def test_bounded_parallelism(self, stub_models, prediction_server):
+        stub_models.online_predict_in_batches(model_id=1, instances=list(range(200)), batch_size=5, workers=3)
+        assert 1 <= prediction_server.in_flight["max"] <= 3
+
+    def test_iter_consumes_generator(self, stub_models, prediction_server):
+        predictions = stub_models.iter_online_predict(
+            model_id=1, version_id=2, instances=(i for i in range(30)), batch_size=7
+        )
+        assert next(predictions) == 0
+        assert list(predictions) == [i * 2 for i in range(1, 30)]
+        assert len(prediction_server.requests) == 5
+        assert prediction_server.requests[0][1] == "/api/0.6/projects/test/analytics/models/1/versions/2/predict"
+
+    def test_max_batch_bytes(self, stub_models, prediction_server):
+        predictions = stub_models.online_predict_in_batches(
+            model_id=1, instances=[1000] * 10, batch_size=100, max_batch_bytes=10
+        )
+        assert predictions == [2000] * 10
+        assert [len(json.loads(body)["instances"]) for _, _, _, body in prediction_server.requests] == [2] * 5
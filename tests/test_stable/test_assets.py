@@ -1,9 +1,14 @@
+import gzip
+import json
+from unittest import mock
+
 import pandas as pd
 import pytest
+from requests import ConnectionError, Session
 
-from cognite import CogniteClient
-from cognite.client.stable.assets import Asset, AssetListResponse, AssetResponse
-from tests.conftest import generate_random_string
+from cognite import APIError, CogniteClient
+from cognite.client.stable.assets import Asset, AssetListResponse, AssetResponse, AssetsClient
+from tests.conftest import StubServer, generate_random_string
 
 assets = CogniteClient().assets
 
@@ -71,3 +76,126 @@ def test_delete_assets():
 def test_search_for_assets():
     res = assets.search_for_assets()
     assert len(res.to_json()) > 0
+
+
+def test_post_assets_bulk_with_parent_names_over_several_chunks():
+    hierarchy = [Asset("root", ref_id="root")] + [Asset("child", parent_ref_id="root") for _ in range(3)]
+    with pytest.raises(ValueError):
+        assets.post_assets_bulk(hierarchy, chunk_size=2)
+
+
+class TestAssetHierarchy:
+    @pytest.fixture
+    def hierarchy_server(self):
+        def handler(method, path, headers, body):
+            items = json.loads(gzip.decompress(body))["items"]
+            if any(item["name"] in server.failing_names for item in items):
+                return 500, {"error": {"code": 500, "message": "Internal error"}}
+            created = []
+            for item in items:
+                server.parent_ids[item["name"]] = item["parentId"]
+                created.append({"id": len(server.parent_ids), "name": item["name"]})
+            return 200, {"data": {"items": created}}
+
+        with StubServer(handler) as server:
+            server.failing_names = set()
+            server.parent_ids = {}
+            yield server
+
+    @pytest.fixture
+    def assets_client(self, hierarchy_server):
+        yield AssetsClient(
+            request_session=Session(),
+            project="test",
+            base_url=hierarchy_server.url,
+            num_of_workers=4,
+            cookies={},
+            headers={},
+            timeout=10,
+        )
+
+    @staticmethod
+    def hierarchy():
+        # Children are listed before their parents to check that the assets are sorted
+        return (
+            [Asset("pump_{}".format(i), ref_id="p{}".format(i), parent_ref_id="a{}".format(i % 2)) for i in range(5)]
+            + [Asset("area_{}".format(i), ref_id="a{}".format(i), parent_ref_id="root") for i in range(2)]
+            + [Asset("root", ref_id="root", parent_id=42)]
+        )
+
+    def test_post_asset_hierarchy(self, assets_client, hierarchy_server):
+        res = assets_client.post_asset_hierarchy(self.hierarchy(), chunk_size=2)
+        assert [asset["name"] for asset in res.to_json()][:3] == ["root", "area_0", "area_1"]
+        ids = {asset["name"]: asset["id"] for asset in res.to_json()}
+        parent_ids = hierarchy_server.parent_ids
+        assert parent_ids["root"] == 42
+        assert parent_ids["area_1"] == ids["root"]
+        assert [parent_ids["pump_{}".format(i)] for i in range(5)] == [ids["area_{}".format(i % 2)] for i in range(5)]
+        assert len(hierarchy_server.requests) == 1 + 1 + 3
+
+    def test_resume_after_failure(self, assets_client, hierarchy_server, tmpdir):
+        state_path = str(tmpdir.join("state.json"))
+        hierarchy_server.failing_names = {"area_1"}
+        with pytest.raises(APIError):
+            assets_client.post_asset_hierarchy(self.hierarchy(), state_path=state_path, chunk_size=1)
+        assert sorted(hierarchy_server.parent_ids) == ["area_0", "root"]
+        with open(state_path) as f:
+            assert sorted(json.load(f)) == ["a0", "root"]
+
+        hierarchy_server.failing_names = set()
+        res = assets_client.post_asset_hierarchy(self.hierarchy(), state_path=state_path)
+        assert [asset["name"] for asset in res.to_json()][0] == "area_1"
+        assert len(res.to_json()) == 6
+        assert hierarchy_server.parent_ids["pump_0"] == 2
+
+    def test_state_is_saved_on_connection_error(self, assets_client, hierarchy_server, tmpdir):
+        state_path = str(tmpdir.join("state.json"))
+        post = assets_client._post
+
+        def dropping_post(url, body, **kwargs):
+            if any(item["name"] == "area_1" for item in body["items"]):
+                raise ConnectionError("Connection aborted")
+            return post(url, body, **kwargs)
+
+        with mock.patch.object(assets_client, "_post", side_effect=dropping_post):
+            with pytest.raises(APIError):
+                assets_client.post_asset_hierarchy(self.hierarchy(), state_path=state_path, chunk_size=1)
+        with open(state_path) as f:
+            assert sorted(json.load(f)) == ["a0", "root"]
+
+        res = assets_client.post_asset_hierarchy(self.hierarchy(), state_path=state_path)
+        assert len(res.to_json()) == 6
+        assert len(hierarchy_server.parent_ids) == 8
+
+    def test_state_is_saved_per_chunk_on_interrupt(self, assets_client, hierarchy_server, tmpdir):
+        class Interrupted(BaseException):
+            pass
+
+        state_path = str(tmpdir.join("state.json"))
+        post = assets_client._post
+
+        def interrupted_post(url, body, **kwargs):
+            if any(item["name"] == "area_1" for item in body["items"]):
+                raise Interrupted
+            return post(url, body, **kwargs)
+
+        with mock.patch.object(assets_client, "_post", side_effect=interrupted_post):
+            with pytest.raises(Interrupted):
+                assets_client.post_asset_hierarchy(self.hierarchy(), state_path=state_path, chunk_size=1, max_workers=1)
+        with open(state_path) as f:
+            assert sorted(json.load(f)) == ["a0", "root"]
+
+    @pytest.mark.parametrize(
+        "hierarchy",
+        [
+            [Asset("a")],
+            [Asset("a", ref_id="a"), Asset("b", ref_id="a")],
+            [Asset("a", ref_id="a", parent_ref_id="missing")],
+            [Asset("a", ref_id="a", parent_ref_id="b"), Asset("b", ref_id="b", parent_ref_id="a")],
+            [Asset("a", ref_id="a", parent_name="b")],
+        ],
+    )
+    def test_invalid_hierarchy(self, assets_client, hierarchy, hierarchy_server):
+        with pytest.raises(ValueError):
+            assets_client.post_asset_hierarchy(hierarchy)
+        assert hierarchy_server.requests == []
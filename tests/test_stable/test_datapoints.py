@@ -1,3 +1,7 @@
+import gzip
+import json
+import threading
+import time
 from datetime import datetime
 from random import randint
 from typing import List
@@ -6,15 +10,24 @@ from unittest import mock
 import numpy as np
 import pandas as pd
 import pytest
+from requests import Session
 
 from cognite import CogniteClient
+from cognite._auxiliary._protobuf_descriptors import _api_timeseries_data_v2_pb2
+from cognite.client._aggregation import aggregate
 from cognite.client._api_client import APIClient
+from cognite.client.exceptions import APIError
 from cognite.client.stable.datapoints import (
     Datapoint,
+    DatapointBatch,
+    DatapointsClient,
     DatapointsQuery,
     DatapointsResponse,
+    DatapointsRollupCache,
     LatestDatapointResponse,
+    LatestDatapointsResponse,
     TimeseriesWithDatapoints,
+    WatermarkStore,
 )
 from cognite.client.stable.time_series import TimeSeries
 from tests.conftest import (
@@ -22,6 +35,7 @@ from tests.conftest import (
     TEST_TS_2_NAME,
     TEST_TS_REASONABLE_INTERVAL,
     TEST_TS_REASONABLE_INTERVAL_DATETIME,
+    StubServer,
 )
 
 client = CogniteClient()
@@ -111,6 +125,24 @@ class TestDatapoints:
         assert len(res.to_json().get("datapoints")) == 100
 
 
+class TestLocalAggregation:
+    @pytest.mark.parametrize("granularity", ["1m", "10m", "1h"])
+    def test_local_aggregates_match_server(self, granularity):
+        start, end = TEST_TS_REASONABLE_INTERVAL["start"], TEST_TS_REASONABLE_INTERVAL["end"]
+        aggregates = ["avg", "min", "max", "count", "sum", "int", "step"]
+        raw = client.datapoints.get_datapoints(
+            name=TEST_TS_1_NAME, start=start, end=end, include_outside_points=True, protobuf=False
+        )
+        server = client.datapoints.get_datapoints(
+            name=TEST_TS_1_NAME, start=start, end=end, aggregates=aggregates, granularity=granularity
+        ).to_pandas()
+        local = raw.aggregate(aggregates, granularity, start=start, end=end)
+
+        assert list(local["timestamp"]) == list(server["timestamp"])
+        for column in local.columns:
+            assert np.allclose(local[column].values, server[column].values), column
+
+
 class TestLatest:
     def test_get_latest(self):
         response = client.datapoints.get_latest(TEST_TS_1_NAME)
@@ -225,3 +257,613 @@ class TestMultiTimeseriesDatapoints:
 
         assert isinstance(result[0], TimeseriesWithDatapoints)
         assert len(result) == 1
+
+
+@pytest.fixture
+def dataquery_server():
+    timestamps = {"ts_{}".format(i): list(range(0, 1000, 10 * (i + 1))) for i in range(5)}
+
+    def handler(method, path, headers, body):
+        body = json.loads(gzip.decompress(body))
+        items = []
+        for item in body["items"]:
+            dps = [t for t in timestamps[item["name"]] if item["start"] <= t < body["end"]][: item["limit"]]
+            items.append({"name": item["name"], "datapoints": [{"timestamp": t, "value": t} for t in dps]})
+        return 200, {"data": {"items": items}}
+
+    with StubServer(handler) as server:
+        server.timestamps = timestamps
+        yield server
+
+
+@pytest.fixture
+def stub_datapoints(dataquery_server):
+    client = DatapointsClient(
+        request_session=Session(),
+        project="test",
+        base_url=dataquery_server.url,
+        num_of_workers=2,
+        cookies={},
+        headers={},
+        timeout=10,
+    )
+    client._LIMIT = 20
+    yield client
+
+
+class TestSyncDatapoints:
+    @pytest.fixture
+    def synced(self):
+        synced = {}
+
+        def sink(batch):
+            for name, dps in batch.items():
+                synced.setdefault(name, []).extend(dp["timestamp"] for dp in dps)
+
+        synced["sink"] = sink
+        yield synced
+
+    def test_sync_datapoints(self, stub_datapoints, dataquery_server, synced, tmpdir):
+        path = str(tmpdir.join("watermarks.json"))
+        sink = synced.pop("sink")
+        count = stub_datapoints.sync_datapoints(
+            sorted(dataquery_server.timestamps), sink, WatermarkStore(path), start=0, end=1000, batch_size=2
+        )
+        assert synced == dataquery_server.timestamps
+        assert count == sum(len(timestamps) for timestamps in dataquery_server.timestamps.values())
+        assert all(len(json.loads(gzip.decompress(r[3]))["items"]) <= 2 for r in dataquery_server.requests)
+
+        synced.clear()
+        dataquery_server.requests.clear()
+        dataquery_server.timestamps["ts_0"].append(1000)
+        watermarks = WatermarkStore(path)
+        assert watermarks.get("ts_0") == 990
+        stub_datapoints.sync_datapoints(sorted(dataquery_server.timestamps), sink, watermarks, start=0, end=2000)
+        assert synced == {"ts_0": [1000]}
+        assert len(dataquery_server.requests) == 1
+        assert watermarks.get("ts_0") == 1000
+
+    def test_sync_datapoints_max_requests(self, stub_datapoints, dataquery_server, synced):
+        sink = synced.pop("sink")
+        watermarks = WatermarkStore()
+        names = sorted(dataquery_server.timestamps)
+        stub_datapoints.sync_datapoints(names, sink, watermarks, start=0, end=1000, batch_size=2, max_requests=3)
+        assert len(dataquery_server.requests) == 3
+        assert synced != dataquery_server.timestamps
+
+        while stub_datapoints.sync_datapoints(names, sink, watermarks, start=0, end=1000, max_requests=3):
+            pass
+        assert synced == dataquery_server.timestamps
+
+    def test_sync_datapoints_saves_watermarks_once(self, stub_datapoints, dataquery_server, synced, tmpdir):
+        path = str(tmpdir.join("watermarks.json"))
+        sink = synced.pop("sink")
+        watermarks = WatermarkStore(path)
+        with mock.patch.object(watermarks, "save", wraps=watermarks.save) as save:
+            stub_datapoints.sync_datapoints(["ts_0", "ts_1"], sink, watermarks, start=0, end=1000, batch_size=1)
+        assert len(dataquery_server.requests) > 1
+        assert save.call_count == 1
+
+    def test_sync_datapoints_saves_watermarks_on_failure(self, stub_datapoints, dataquery_server, tmpdir):
+        path = str(tmpdir.join("watermarks.json"))
+        batches = []
+
+        def sink(batch):
+            if batches:
+                raise RuntimeError("sink failed")
+            batches.append(batch)
+
+        with pytest.raises(RuntimeError):
+            stub_datapoints.sync_datapoints(["ts_0"], sink, WatermarkStore(path), start=0, end=1000, workers=1)
+        assert WatermarkStore(path).get("ts_0") == batches[0]["ts_0"][-1]["timestamp"]
+
+    def test_sync_datapoints_stops_all_workers_on_failure(self, stub_datapoints, dataquery_server, tmpdir):
+        path = str(tmpdir.join("watermarks.json"))
+        names = sorted(dataquery_server.timestamps)
+        calls = []
+
+        def sink(batch):
+            calls.append(batch)
+            raise RuntimeError("sink failed")
+
+        with pytest.raises(RuntimeError):
+            stub_datapoints.sync_datapoints(names, sink, WatermarkStore(path), start=0, end=1000, batch_size=1)
+        assert len(calls) == 1
+        assert all(WatermarkStore(path).get(name) is None for name in names)
+
+
+class TestDatapointsSubscription:
+    def test_iterate_merged_updates(self, stub_datapoints, dataquery_server):
+        subscription = stub_datapoints.subscribe(sorted(dataquery_server.timestamps), start=500, min_interval=0)
+        updates = []
+        for name, datapoint in subscription:
+            updates.append((name, datapoint["timestamp"]))
+            if len(updates) == 3:
+                dataquery_server.timestamps["ts_4"].append(999)
+            if name == "ts_4" and datapoint["timestamp"] == 999:
+                subscription.close()
+        assert ("ts_0", 500) in updates
+        assert len(set(updates)) == len(updates)
+        assert updates[-1] == ("ts_4", 999)
+
+    def test_poll_interval_adapts(self, stub_datapoints, dataquery_server):
+        subscription = stub_datapoints.subscribe(["ts_0"], start=0, min_interval=1, max_interval=4)
+        assert len(subscription.poll()["ts_0"]) == 100
+        assert subscription.interval == 1
+        subscription.poll()
+        subscription.poll()
+        assert subscription.interval == 2.25
+        subscription.poll()
+        subscription.poll()
+        assert subscription.interval == 4
+        dataquery_server.timestamps["ts_0"].append(990 + 1)
+        assert subscription.poll() == {"ts_0": [{"timestamp": 991, "value": 991}]}
+        assert subscription.interval == 2
+
+    def test_run_with_callback(self, stub_datapoints, dataquery_server):
+        subscription = stub_datapoints.subscribe(["ts_1", "ts_2"], start=900, min_interval=0)
+        batches = []
+
+        def callback(batch):
+            batches.append(batch)
+            subscription.close()
+
+        subscription.run(callback)
+        assert list(batches[0].keys()) == ["ts_1", "ts_2"]
+
+
+class TestMultipleLatest:
+    @pytest.fixture
+    def latest_server(self):
+        barriers = {}
+
+        def handler(method, path, headers, body):
+            time.sleep(0.1)
+            name = path.split("?")[0].rsplit("/", 1)[-1]
+            if name in barriers:
+                barriers[name].wait()
+            if name == "empty":
+                return 200, {"data": {"items": []}}
+            before = int(path.split("before=")[1]) if "before=" in path else 1000
+            return 200, {"data": {"items": [{"timestamp": before - 1, "value": int(name.split("_")[1])}]}}
+
+        with StubServer(handler) as server:
+            server.barriers = barriers
+            yield server
+
+    @pytest.fixture
+    def stub_datapoints(self, latest_server):
+        yield DatapointsClient(
+            request_session=Session(),
+            project="test",
+            base_url=latest_server.url,
+            num_of_workers=10,
+            cookies={},
+            headers={},
+            timeout=10,
+        )
+
+    def test_get_multiple_latest(self, stub_datapoints, latest_server):
+        names = ["ts_{}".format(i) for i in range(20)] + ["empty"]
+        # The first two lookups only complete if they are in flight at the same time
+        barrier = threading.Barrier(2, timeout=10)
+        latest_server.barriers.update(ts_0=barrier, ts_1=barrier)
+        res = stub_datapoints.get_multiple_latest(names, before={"ts_1": 500})
+        assert isinstance(res, LatestDatapointsResponse)
+        df = res.to_pandas()
+        assert list(df.columns) == ["name", "timestamp", "value"]
+        assert list(df["name"]) == names
+        assert res.to_json()["timestamp"][:3] == [999, 499, 999]
+        assert res.to_json()["value"][-1] is None
+
+    def test_concurrent_get_latest_share_request(self, stub_datapoints, latest_server):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(stub_datapoints.get_latest("ts_1").to_json()))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [{"timestamp": 999, "value": 1}] * 5
+        assert len(latest_server.requests) == 1
+        stub_datapoints.get_latest("ts_1")
+        assert len(latest_server.requests) == 2
+
+    def test_interrupted_get_latest_releases_waiters(self, stub_datapoints):
+        class Interrupted(BaseException):
+            pass
+
+        in_flight = []
+
+        def interrupted_get(*args, **kwargs):
+            in_flight.append(stub_datapoints._latest_in_flight[("ts_1", None)])
+            raise Interrupted
+
+        with mock.patch.object(stub_datapoints, "_get", side_effect=interrupted_get):
+            with pytest.raises(Interrupted):
+                stub_datapoints.get_latest("ts_1")
+        assert isinstance(in_flight[0].exception(timeout=0), Interrupted)
+        assert stub_datapoints._latest_in_flight == {}
+
+
+class TestDatapointsRollupCache:
+    DAY = 86400000
+
+    @pytest.fixture
+    def raw(self):
+        timestamps = np.sort(np.random.RandomState(0).randint(0, 3 * self.DAY, 20000))
+        values = np.random.RandomState(1).randn(len(timestamps))
+        yield timestamps, values
+
+    @pytest.fixture
+    def mock_get_datapoints(self, raw):
+        def get_datapoints(name, start, end=None, aggregates=None, granularity=None, **kwargs):
+            res = aggregate(*raw, aggregates, granularity, start=start, end=end)
+            datapoints = [dict(zip(res.keys(), row)) for row in zip(*[v.tolist() for v in res.values()])]
+            return DatapointsResponse({"data": {"items": [{"name": name, "datapoints": datapoints}]}})
+
+        with mock.patch.object(DatapointsClient, "get_datapoints", side_effect=get_datapoints) as mock_get:
+            yield mock_get
+
+    @pytest.fixture
+    def cache(self, mock_get_datapoints):
+        yield DatapointsRollupCache(client.datapoints)
+
+    def assert_matches_raw(self, res, raw, aggregates, granularity, start, end):
+        expected = pd.DataFrame(aggregate(*raw, aggregates, granularity, start=start, end=end))
+        df = res.to_pandas()
+        assert list(df.columns) == list(expected.columns)
+        assert list(df["timestamp"]) == list(expected["timestamp"])
+        for column in expected.columns:
+            assert np.allclose(df[column].values.astype(float), expected[column].values), column
+
+    def test_coarse_aggregates_are_rolled_up(self, cache, mock_get_datapoints, raw):
+        cache.get_datapoints("ts", 0, self.DAY, aggregates=["avg"], granularity="1m")
+        assert mock_get_datapoints.call_count == 1
+        aggregates = ["avg", "min", "max", "count", "sum", "dv"]
+        for granularity in ["1h", "6h", "1d"]:
+            res = cache.get_datapoints("ts", 0, self.DAY, aggregates=aggregates, granularity=granularity)
+            self.assert_matches_raw(res, raw, aggregates, granularity, 0, self.DAY)
+        assert mock_get_datapoints.call_count == 1
+
+    def test_only_missing_buckets_are_fetched(self, cache, mock_get_datapoints, raw):
+        cache.get_datapoints("ts", self.DAY, 2 * self.DAY, aggregates=["avg"], granularity="1h")
+        res = cache.get_datapoints("ts", 0, 3 * self.DAY, aggregates=["avg", "max"], granularity="1d")
+        self.assert_matches_raw(res, raw, ["avg", "max"], "1d", 0, 3 * self.DAY)
+        fetched = [call[0][1:3] for call in mock_get_datapoints.call_args_list[1:]]
+        assert fetched == [(0, self.DAY), (2 * self.DAY, 3 * self.DAY)]
+
+    def test_aggregates_which_cannot_be_rolled_up_are_fetched(self, cache, mock_get_datapoints, raw):
+        cache.get_datapoints("ts", 0, self.DAY, aggregates=["avg"], granularity="1m")
+        res = cache.get_datapoints("ts", 0, self.DAY, aggregates=["tv"], granularity="1h")
+        self.assert_matches_raw(res, raw, ["tv"], "1h", 0, self.DAY)
+        assert mock_get_datapoints.call_count == 2
+        cache.get_datapoints("ts", 0, self.DAY, aggregates=["tv", "avg"], granularity="1h")
+        assert mock_get_datapoints.call_count == 2
+
+    def test_partial_buckets_are_fetched(self, cache, mock_get_datapoints, raw):
+        cache.get_datapoints("ts", 0, self.DAY, aggregates=["avg"], granularity="1m")
+        start, end = 30 * 60000, self.DAY - 30 * 60000
+        res = cache.get_datapoints("ts", start, end, aggregates=["avg"], granularity="1h")
+        self.assert_matches_raw(res, raw, ["avg"], "1h", start, end)
+        fetched = [call[0][1:3] for call in mock_get_datapoints.call_args_list[1:]]
+        assert fetched == [(start, 3600000), (self.DAY - 3600000, end)]
+
+    def test_invalidate(self, cache, mock_get_datapoints):
+        cache.get_datapoints("ts", 0, self.DAY, aggregates=["avg"], granularity="1h")
+        cache.invalidate("ts")
+        cache.get_datapoints("ts", 0, self.DAY, aggregates=["avg"], granularity="1h")
+        assert mock_get_datapoints.call_count == 2
+
+
+class TestAlignedDatapointsFrame:
+    @pytest.fixture
+    def mock_get_datapoints(self):
+        raw = {"a": [(0, 1.0), (1000, 2.0), (3000, 4.0)], "b": [(500, 10.0), (2500, 20.0)]}
+
+        def get_datapoints(name, start, end=None, **kwargs):
+            datapoints = [{"timestamp": t, "value": v} for t, v in raw[name] if start <= t < end]
+            return DatapointsResponse({"data": {"items": [{"name": name, "datapoints": datapoints}]}})
+
+        with mock.patch.object(DatapointsClient, "get_datapoints", side_effect=get_datapoints) as mock_get:
+            yield mock_get
+
+    def test_union_of_timestamps(self, mock_get_datapoints):
+        df = client.datapoints.get_aligned_datapoints_frame(["a", "b"], start=0, end=3000, fill="last")
+        assert list(df.columns) == ["timestamp", "a", "b"]
+        assert list(df["timestamp"]) == [0, 500, 1000, 2500]
+        assert list(df["a"]) == [1, 1, 2, 2]
+        assert np.isnan(df["b"][0]) and list(df["b"][1:]) == [10, 10, 20]
+
+    def test_fixed_grid_in_chunks(self, mock_get_datapoints):
+        frames = client.datapoints.iter_aligned_datapoints_frames(
+            ["a", "b"], start=0, end=4000, granularity="1s", fill="linear", chunk_size=3
+        )
+        df = pd.concat(list(frames), ignore_index=True)
+        assert list(df["timestamp"]) == [0, 1000, 2000, 3000]
+        assert list(df["a"]) == [1, 2, 3, 4]
+        assert list(df["b"][1:3]) == [12.5, 17.5]
+
+    def test_series_are_fetched_in_parallel(self, mock_get_datapoints):
+        barrier = threading.Barrier(2, timeout=10)
+        get_datapoints = mock_get_datapoints.side_effect
+
+        def wait_for_other_series(name, *args, **kwargs):
+            barrier.wait()
+            return get_datapoints(name, *args, **kwargs)
+
+        mock_get_datapoints.side_effect = wait_for_other_series
+        df = client.datapoints.get_aligned_datapoints_frame(["a", "b"], start=0, end=3000, workers=2)
+        assert list(df.columns) == ["timestamp", "a", "b"]
+        assert mock_get_datapoints.call_count == 2
+
+    def test_string_series_are_rejected(self):
+        res = DatapointsResponse({"data": {"items": [{"name": "s", "datapoints": [{"timestamp": 0, "value": "on"}]}]}})
+        with mock.patch.object(DatapointsClient, "get_datapoints", return_value=res):
+            with pytest.raises(ValueError, match="string datapoints"):
+                client.datapoints.get_aligned_datapoints_frame(["s"], start=0, end=3000)
+
+
+class TestDatapointBatch:
+    def test_datapoint_has_slots(self):
+        dp = Datapoint(datetime(2018, 1, 1), 1)
+        assert not hasattr(dp, "__dict__")
+        assert dp.to_json() == {"timestamp": 1514764800000, "value": 1}
+
+    def test_timestamp_conversion(self):
+        expected = [1514764800000, 1514764860000]
+        index = pd.date_range("2018-01-01", periods=2, freq="1min")
+        assert list(DatapointBatch(index, [1, 2]).timestamps) == expected
+        assert list(DatapointBatch(index.tz_localize("UTC").tz_convert("Europe/Oslo"), [1, 2]).timestamps) == expected
+        assert list(DatapointBatch(index.values.astype("datetime64[s]"), [1, 2]).timestamps) == expected
+        assert list(DatapointBatch(pd.Series(index), [1, 2]).timestamps) == expected
+        assert list(DatapointBatch([datetime(2018, 1, 1), expected[1]], [1, 2]).timestamps) == expected
+        assert DatapointBatch(np.array(expected), [1, 2]).timestamps.dtype == np.int64
+
+    def test_values(self):
+        assert DatapointBatch([0, 1], np.array([1, 2], dtype=np.int32)).to_json() == [
+            {"timestamp": 0, "value": 1.0},
+            {"timestamp": 1, "value": 2.0},
+        ]
+        assert DatapointBatch([0], pd.Series(["on"])).to_json() == [{"timestamp": 0, "value": "on"}]
+        assert DatapointBatch([0, 1], ["1", "2"]).to_json() == [
+            {"timestamp": 0, "value": "1"},
+            {"timestamp": 1, "value": "2"},
+        ]
+        with pytest.raises(ValueError):
+            DatapointBatch([0, 1], [1.0])
+
+    def test_from_pandas(self):
+        series = pd.Series([1.5, 2.5], index=pd.date_range("2018-01-01", periods=2, freq="1s"))
+        batch = DatapointBatch.from_pandas(series)
+        assert batch.to_json() == [
+            {"timestamp": 1514764800000, "value": 1.5},
+            {"timestamp": 1514764801000, "value": 2.5},
+        ]
+
+    def test_slicing_and_iteration(self):
+        batch = DatapointBatch(range(10), range(10))
+        assert len(batch[2:5]) == 3
+        assert batch[3].to_json() == {"timestamp": 3, "value": 3.0}
+        assert [dp.timestamp for dp in batch[8:]] == [8, 9]
+
+    def test_post_datapoints(self):
+        batch = DatapointBatch(np.arange(150001), np.arange(150001))
+        with mock.patch.object(APIClient, "_post") as post_mock:
+            client.datapoints.post_datapoints("test", batch)
+        assert post_mock.call_count == 2
+        items = post_mock.call_args_list[1][1]["body"]["items"]
+        assert len(items) == 50001
+        assert items[0].to_json() == {"timestamp": 100000, "value": 100000.0}
+
+    def test_post_multi_time_series_datapoints(self):
+        timeseries_with_datapoints = [
+            TimeseriesWithDatapoints("a", DatapointBatch(np.arange(100001), np.zeros(100001))),
+            TimeseriesWithDatapoints("b", [Datapoint(0, 1)]),
+        ]
+        with mock.patch.object(APIClient, "_post") as post_mock:
+            client.datapoints.post_multi_time_series_datapoints(timeseries_with_datapoints)
+        items = [item for call in post_mock.call_args_list for item in call[1]["body"]["items"]]
+        assert sorted((item["name"], len(item["datapoints"])) for item in items) == [("a", 1), ("a", 100000), ("b", 1)]
+
+    def test_post_datapoints_frame(self):
+        df = pd.DataFrame({"timestamp": [0, 1000], "a": [1.0, 2.0], "b": [3, 4]})
+        with mock.patch.object(APIClient, "_post") as post_mock:
+            client.datapoints.post_datapoints_frame(df)
+        assert [call[1]["body"]["items"].to_json() for call in post_mock.call_args_list] == [
+            [{"timestamp": 0, "value": 1.0}, {"timestamp": 1000, "value": 2.0}],
+            [{"timestamp": 0, "value": 3.0}, {"timestamp": 1000, "value": 4.0}],
+        ]
+
+
+class TestProtobufInserts:
+    @pytest.fixture
+    def insert_server(self):
+        def handler(method, path, headers, body):
+            body = gzip.decompress(body)
+            if headers["content-type"] == "application/protobuf":
+                if not server.accepts_protobuf:
+                    return 415, {"error": {"code": 415, "message": "Unsupported media type"}}
+                message = _api_timeseries_data_v2_pb2.TimeseriesData()
+                if path.endswith("/timeseries/data"):
+                    message = _api_timeseries_data_v2_pb2.MultiNamedTimeseriesData()
+                message.ParseFromString(body)
+                server.received.append(message)
+            else:
+                server.received.append(json.loads(body))
+            return 200, {}
+
+        with StubServer(handler) as server:
+            server.accepts_protobuf = True
+            server.received = []
+            yield server
+
+    @pytest.fixture
+    def insert_client(self, insert_server):
+        yield DatapointsClient(
+            request_session=Session(),
+            project="test",
+            base_url=insert_server.url,
+            num_of_workers=1,
+            cookies={},
+            headers={"content-type": "application/json"},
+            timeout=10,
+        )
+
+    def test_post_datapoints(self, insert_client, insert_server):
+        batch = DatapointBatch(1514764800000 + np.arange(1000) * 1000, np.random.randn(1000))
+        insert_client.post_datapoints("my ts", batch, protobuf=True)
+        insert_client.post_datapoints("my ts", [Datapoint(0, "on"), Datapoint(1, "off")], protobuf=True)
+        numeric, strings = insert_server.received
+        expected = [(dp["timestamp"], dp["value"]) for dp in batch.to_json()]
+        assert [(p.timestamp, p.value) for p in numeric.numericData.points] == expected
+        assert [(p.timestamp, p.value) for p in strings.stringData.points] == [(0, "on"), (1, "off")]
+        assert insert_server.requests[0][1] == "/api/0.5/projects/test/timeseries/data/my%20ts"
+
+    def test_post_multi_time_series_datapoints(self, insert_client, insert_server):
+        insert_client.post_multi_time_series_datapoints(
+            [
+                TimeseriesWithDatapoints("a", DatapointBatch([1, 2], [1.5, 2.5])),
+                TimeseriesWithDatapoints("b", [Datapoint(3, 3)]),
+            ],
+            protobuf=True,
+        )
+        (message,) = insert_server.received
+        a, b = message.namedTimeseriesData
+        assert (a.name, b.name) == ("a", "b")
+        assert [(p.timestamp, p.value) for p in a.numericData.points] == [(1, 1.5), (2, 2.5)]
+        assert [(p.timestamp, p.value) for p in b.numericData.points] == [(3, 3.0)]
+
+    def test_falls_back_to_json(self, insert_client, insert_server):
+        insert_server.accepts_protobuf = False
+        for _ in range(2):
+            insert_client.post_datapoints("ts", DatapointBatch([1], [1.0]), protobuf=True)
+        assert insert_server.received == [{"items": [{"timestamp": 1, "value": 1.0}]}] * 2
+        content_types = [request[2]["content-type"] for request in insert_server.requests]
+        assert content_types == ["application/protobuf", "application/json", "application/json"]
+
+    def test_does_not_fall_back_once_protobuf_is_accepted(self, insert_client, insert_server):
+        insert_client.post_datapoints("ts", DatapointBatch([1], [1.0]), protobuf=True)
+        insert_server.accepts_protobuf = False
+        with pytest.raises(APIError):
+            insert_client.post_datapoints("ts", DatapointBatch([1], [1.0]), protobuf=True)
+        assert len(insert_server.requests) == 2
+
+
+class TestDatapointsWriter:
+    @pytest.fixture
+    def writer_server(self):
+        def handler(method, path, headers, body):
+            if server.fails:
+                return 400, {"error": {"code": 400, "message": "Bad request"}}
+            for item in json.loads(gzip.decompress(body))["items"]:
+                server.received.extend((item["name"], dp["timestamp"], dp["value"]) for dp in item["datapoints"])
+            return 200, {}
+
+        with StubServer(handler) as server:
+            server.fails = False
+            server.received = []
+            yield server
+
+    @pytest.fixture
+    def writer_client(self, writer_server):
+        yield DatapointsClient(
+            request_session=Session(),
+            project="test",
+            base_url=writer_server.url,
+            num_of_workers=1,
+            cookies={},
+            headers={},
+            timeout=10,
+        )
+
+    @staticmethod
+    def wait_for(condition):
+        deadline = time.time() + 5
+        while not condition():
+            assert time.time() < deadline
+            time.sleep(0.01)
+
+    def test_flush_packs_time_series_into_one_request(self, writer_client, writer_server):
+        with writer_client.writer(max_age=60) as writer:
+            writer.write("a", [Datapoint(1, 1.0)])
+            writer.write("b", DatapointBatch([2, 3], [2.0, 3.0]))
+            writer.write("a", [Datapoint(4, 4.0)])
+            assert writer.metrics()["buffered"] == 4
+            assert writer.metrics()["buffered_time_series"] == 2
+            writer.flush()
+            assert len(writer_server.requests) == 1
+            assert writer_server.received == [("a", 1, 1.0), ("a", 4, 4.0), ("b", 2, 2.0), ("b", 3, 3.0)]
+            metrics = writer.metrics()
+        assert (metrics["buffered"], metrics["inserted"], metrics["flushes"]) == (0, 4, 1)
+        assert metrics["last_flush_latency"] > 0
+
+    def test_flushes_on_size_and_age(self, writer_client, writer_server):
+        with writer_client.writer(max_buffer_size=3, max_age=60) as writer:
+            writer.write("a", DatapointBatch([1, 2], [1.0, 2.0]))
+            time.sleep(0.1)
+            assert writer_server.received == []
+            writer.write("a", [Datapoint(3, 3.0)])
+            self.wait_for(lambda: len(writer_server.received) == 3)
+        with writer_client.writer(max_age=0.05) as writer:
+            writer.write("b", [Datapoint(1, 1.0)])
+            self.wait_for(lambda: len(writer_server.received) == 4)
+
+    def test_failed_flush_keeps_datapoints(self, writer_client, writer_server):
+        writer_server.fails = True
+        writer = writer_client.writer(max_age=60)
+        writer.write("a", [Datapoint(1, 1.0)])
+        with pytest.raises(APIError):
+            writer.flush()
+        writer.write("a", [Datapoint(2, 2.0)])
+        assert writer.metrics()["failed_flushes"] == 1
+        assert writer.metrics()["buffered"] == 2
+        writer_server.fails = False
+        writer.close()
+        assert writer_server.received == [("a", 1, 1.0), ("a", 2, 2.0)]
+
+    def test_drops_datapoints_beyond_max_queue_size(self, writer_client, writer_server):
+        with writer_client.writer(max_age=60, max_queue_size=3) as writer:
+            writer.write("a", DatapointBatch([1, 2], [1.0, 2.0]))
+            writer.write("b", DatapointBatch([1, 2], [1.0, 2.0]))
+            assert (writer.metrics()["written"], writer.metrics()["dropped"]) == (4, 1)
+        assert writer_server.received == [("a", 1, 1.0), ("a", 2, 2.0), ("b", 1, 1.0)]
+
+    def test_spool_survives_restart(self, writer_client, writer_server, tmpdir):
+        spool_path = str(tmpdir.join("datapoints.spool"))
+        writer_server.fails = True
+        writer = writer_client.writer(spool_path=spool_path, max_age=60)
+        writer.write("a", [Datapoint(1, 1.0)])
+        with pytest.raises(APIError):
+            writer.flush()
+        writer.write("b", [Datapoint(2, "on")])
+        with pytest.raises(APIError):
+            writer.close()
+        with open(spool_path, "a") as f:
+            f.write('{"name": "a", "timest')
+
+        writer_server.fails = False
+        with writer_client.writer(spool_path=spool_path, max_age=60) as writer:
+            assert writer.metrics()["buffered"] == 2
+            writer.write("a", [Datapoint(3, 3.0)])
+        assert writer_server.received == [("a", 1, 1.0), ("a", 3, 3.0), ("b", 2, "on")]
+        with writer_client.writer(spool_path=spool_path, max_age=60) as writer:
+            assert writer.metrics()["buffered"] == 0
+
+    def test_recovered_spool_respects_max_queue_size(self, writer_client, writer_server, tmpdir):
+        spool_path = str(tmpdir.join("datapoints.spool"))
+        with open(spool_path, "w") as f:
+            f.write('{"name": "a", "timestamps": [1, 2], "values": [1.0, 2.0]}\n')
+            f.write('{"name": "b", "timestamps": [1, 2], "values": [1.0, 2.0]}\n')
+        with writer_client.writer(spool_path=spool_path, max_age=60, max_queue_size=3) as writer:
+            metrics = writer.metrics()
+            assert (metrics["buffered"], metrics["written"], metrics["dropped"]) == (3, 0, 1)
+        assert writer_server.received == [("a", 1, 1.0), ("a", 2, 2.0), ("b", 1, 1.0)]
+
+    def test_rejects_mixed_values(self, writer_client):
+        with writer_client.writer(max_age=60) as writer:
+            writer.write("a", [Datapoint(1, 1.0)])
+            with pytest.raises(ValueError):
+                writer.write("a", [Datapoint(2, "on")])
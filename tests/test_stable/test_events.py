@@ -1,8 +1,15 @@
+import gzip
+import json
+from urllib.parse import parse_qs, urlparse
+
 import pandas as pd
 import pytest
+from requests import Session
 
 import cognite.client.stable.events
 from cognite import APIError, CogniteClient
+from cognite.client.stable.events import EventsClient
+from tests.conftest import StubServer
 
 events = CogniteClient().events
 
@@ -69,3 +76,86 @@ def test_delete_event(post_event):
 
 def test_search_for_events(get_post_event_obj):
     events.search_for_events(description="hahaha")
+
+
+class TestEventsFrame:
+    @pytest.fixture
+    def search_server(self):
+        def handler(method, path, headers, body):
+            params = parse_qs(urlparse(path).query)
+            first, last = int(params["minStartTime"][0]), int(params["maxStartTime"][0])
+            items = [event for event in server.events if first <= event["startTime"] <= last]
+            return 200, {"data": {"items": items[: int(params["limit"][0])]}}
+
+        with StubServer(handler) as server:
+            server.events = [
+                {"id": i, "startTime": 1000 + (i * 7919) % 5000, "type": "alarm", "metadata": {"level": str(i % 3)}}
+                for i in range(2500)
+            ]
+            yield server
+
+    @pytest.fixture
+    def events_client(self, search_server):
+        yield EventsClient(
+            request_session=Session(),
+            project="test",
+            base_url=search_server.url,
+            num_of_workers=4,
+            cookies={},
+            headers={},
+            timeout=10,
+        )
+
+    def test_get_events_frame(self, events_client, search_server):
+        df = events_client.get_events_frame(start=0, end=10000, partitions=2, type="alarm")
+        assert len(df) == 2500
+        assert sorted(df["id"]) == list(range(2500))
+        assert list(df["startTime"]) == sorted(df["startTime"])
+        assert set(df["level"]) == {"0", "1", "2"}
+        # Both partitions are full at first, so they are split until every partition fits in one search
+        assert len(search_server.requests) > 2
+        assert all("type=alarm" in request[1] for request in search_server.requests)
+
+    def test_get_events_frame_empty(self, events_client, search_server):
+        assert events_client.get_events_frame(start=20000, end=30000).empty
+
+    def test_get_events_frame_too_many_events_at_once(self, events_client, search_server):
+        search_server.events = [{"id": i, "startTime": 1000} for i in range(1000)]
+        with pytest.raises(ValueError):
+            events_client.get_events_frame(start=0, end=2000)
+
+
+class TestBulkEvents:
+    @pytest.fixture
+    def bulk_server(self):
+        def handler(method, path, headers, body):
+            items = json.loads(gzip.decompress(body))["items"]
+            if path.endswith("/delete"):
+                return 200, {}
+            return 200, {"data": {"items": [dict(item, id=item["startTime"]) for item in items]}}
+
+        with StubServer(handler) as server:
+            yield server
+
+    @pytest.fixture
+    def events_client(self, bulk_server):
+        yield EventsClient(
+            request_session=Session(),
+            project="test",
+            base_url=bulk_server.url,
+            num_of_workers=4,
+            cookies={},
+            headers={},
+            timeout=10,
+        )
+
+    def test_post_events_bulk(self, events_client, bulk_server):
+        events = [cognite.client.stable.events.Event(start_time=i, end_time=i + 1) for i in range(2500)]
+        res = events_client.post_events_bulk(events)
+        assert [event["id"] for event in res.to_json()] == list(range(2500))
+        assert len(bulk_server.requests) == 3
+
+    def test_delete_events_bulk(self, events_client, bulk_server):
+        events_client.delete_events_bulk(list(range(10)), chunk_size=4)
+        bodies = sorted(json.loads(gzip.decompress(request[3]))["items"] for request in bulk_server.requests)
+        assert bodies == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]